@@ -0,0 +1,233 @@
+# Auto Trade Bot/backtest/engine.py
+"""
+Backtest strategi sinyal terhadap data OHLCV historis.
+
+Setiap sinyal dievaluasi dengan aturan yang sama seperti bot live:
+- Entry: `TradingStrategy.evaluate_new_signal` dengan harga open candle pertama setelah sinyal.
+- OCO awal: TP = target ke-4, SL = stop loss ke-1 (seperti `Trader.execute_trade`).
+- Trailing SL & posisi macet: aturan `TRAILING_*` / `STUCK_TRADE_*` dari rutinitas manajemen posisi.
+
+Jalur harga setiap trade dihitung dengan operasi NumPy di atas array candle (tanpa loop per candle),
+sehingga satu tahun sinyal bisa diputar ulang dalam hitungan detik.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+import config
+from binance.klines_store import INTERVAL_MS, Candles
+from binance.strategy import TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BacktestParams:
+    """Parameter strategi yang diuji. Default-nya sama dengan konfigurasi bot live (lihat `from_config`)."""
+    usdt_per_trade: float = 11.0
+    trailing_enabled: bool = False
+    min_trailing_tp_level: int = 1
+    trailing_trigger_percentage: float = 0.005
+    stuck_trade_enabled: bool = False
+    stuck_trade_duration_hours: float = 6
+    fee_rate: float = 0.001  # Biaya per sisi (0.1% spot).
+    max_hold_hours: float = 168  # Trade yang masih terbuka setelah ini dicatat sebagai OPEN.
+    interval: str = "1m"
+
+    @classmethod
+    def from_config(cls, **overrides) -> "BacktestParams":
+        params = cls(
+            usdt_per_trade=config.USDT_AMOUNT_PER_TRADE,
+            trailing_enabled=config.TRAILING_ENABLED,
+            min_trailing_tp_level=config.MIN_TRAILING_TP_LEVEL,
+            trailing_trigger_percentage=config.TRAILING_TRIGGER_PERCENTAGE,
+            stuck_trade_enabled=config.STUCK_TRADE_ENABLED,
+            stuck_trade_duration_hours=config.STUCK_TRADE_DURATION_HOURS,
+            fee_rate=config.BACKTEST_FEE_RATE,
+            max_hold_hours=config.BACKTEST_MAX_HOLD_HOURS,
+            interval=config.BACKTEST_KLINE_INTERVAL,
+        )
+        for key, value in overrides.items():
+            setattr(params, key, value)
+        return params
+
+    @property
+    def interval_ms(self) -> int:
+        return INTERVAL_MS[self.interval]
+
+@dataclass(slots=True)
+class TradeResult:
+    """Hasil simulasi satu sinyal. `exit_reason`: TP, SL, TRAILING_SL, STUCK, atau OPEN (belum tertutup)."""
+    coin_pair: str
+    decision: str
+    reason: str
+    signal_time: Optional[int] = None
+    entry_time: Optional[int] = None
+    entry_price: Optional[float] = None
+    exit_time: Optional[int] = None
+    exit_price: Optional[float] = None
+    exit_reason: Optional[str] = None
+    stop_loss_moves: int = 0
+    pnl_usdt: float = 0.0
+    return_pct: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "coin_pair": self.coin_pair, "decision": self.decision, "reason": self.reason,
+            "signal_time": self.signal_time, "entry_time": self.entry_time, "entry_price": self.entry_price,
+            "exit_time": self.exit_time, "exit_price": self.exit_price, "exit_reason": self.exit_reason,
+            "stop_loss_moves": self.stop_loss_moves, "pnl_usdt": self.pnl_usdt, "return_pct": self.return_pct,
+        }
+
+@dataclass
+class BacktestResult:
+    params: BacktestParams
+    trades: List[TradeResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Statistik agregat: jumlah keputusan, win rate, total PnL, profit factor, dan max drawdown."""
+        decisions: Dict[str, int] = {}
+        exit_reasons: Dict[str, int] = {}
+        for trade in self.trades:
+            decisions[trade.decision] = decisions.get(trade.decision, 0) + 1
+            if trade.exit_reason:
+                exit_reasons[trade.exit_reason] = exit_reasons.get(trade.exit_reason, 0) + 1
+
+        closed = sorted((t for t in self.trades if t.exit_reason and t.exit_reason != "OPEN"), key=lambda t: t.exit_time)
+        pnl = np.array([t.pnl_usdt for t in closed], dtype=np.float64)
+        gains, losses = pnl[pnl > 0].sum(), -pnl[pnl < 0].sum()
+        equity = np.cumsum(pnl)
+        drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity if len(pnl) else np.zeros(1)
+        return {
+            "signals": len(self.trades),
+            "decisions": decisions,
+            "exit_reasons": exit_reasons,
+            "closed_trades": len(pnl),
+            "win_rate": round(float((pnl > 0).mean()), 4) if len(pnl) else 0.0,
+            "total_pnl_usdt": round(float(pnl.sum()), 4),
+            "avg_return_pct": round(float(np.mean([t.return_pct for t in closed])), 4) if closed else 0.0,
+            "profit_factor": round(float(gains / losses), 4) if losses else None,
+            "max_drawdown_usdt": round(float(drawdown.max()), 4),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+def signal_time_ms(signal: Dict[str, Any]) -> Optional[int]:
+    """Timestamp sinyal (datetime atau string ISO dari log/Mongo) dalam epoch ms."""
+    timestamp = signal.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+    if not isinstance(timestamp, datetime):
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1000)
+
+# Sumber candle: (symbol, start_ms, end_ms) -> Candles untuk rentang [start_ms, end_ms), misal KlineStore.candle_source.
+CandleSource = Callable[[str, int, int], Optional[Candles]]
+
+class BacktestEngine:
+    """Memutar ulang sinyal terhadap candle historis dengan aturan entry, OCO, trailing, dan posisi macet bot live."""
+
+    def __init__(self, candle_source: CandleSource, params: Optional[BacktestParams] = None):
+        self.candle_source = candle_source
+        self.params = params or BacktestParams.from_config()
+        # Dengan price_snapshot, evaluate_new_signal tidak pernah memanggil klien Binance.
+        self.strategy = TradingStrategy(None)
+
+    def run(self, signals: Iterable[Dict[str, Any]]) -> BacktestResult:
+        started = time.perf_counter()
+        horizon_ms = int(self.params.max_hold_hours * 3_600_000)
+        result = BacktestResult(self.params)
+        for signal in sorted(signals, key=lambda s: signal_time_ms(s) or 0):
+            coin_pair, start_ms = signal.get("coin_pair"), signal_time_ms(signal)
+            if not coin_pair or start_ms is None:
+                result.trades.append(TradeResult(coin_pair or "N/A", "FAIL", "Sinyal tanpa coin_pair atau timestamp."))
+                continue
+            candles = self.candle_source(coin_pair, start_ms, start_ms + horizon_ms)
+            result.trades.append(self.simulate(signal, candles, start_ms))
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
+
+    def simulate(self, signal: Dict[str, Any], candles: Optional[Candles], start_ms: int) -> TradeResult:
+        """Mensimulasikan satu sinyal. Candle pertama yang dibuka pada/atau setelah `start_ms` menjadi titik entry."""
+        params = self.params
+        coin_pair = signal["coin_pair"]
+        if candles is None or not len(candles):
+            return TradeResult(coin_pair, "FAIL", "Data candle tidak tersedia.", signal_time=start_ms)
+
+        first = int(np.searchsorted(candles.open_time, start_ms, side="left"))
+        last = int(np.searchsorted(candles.open_time, start_ms + int(params.max_hold_hours * 3_600_000), side="left"))
+        if first >= last:
+            return TradeResult(coin_pair, "FAIL", "Tidak ada candle setelah waktu sinyal.", signal_time=start_ms)
+
+        entry_price = float(candles.open[first])
+        decision = self.strategy.evaluate_new_signal(signal, {coin_pair: entry_price})
+        trade = TradeResult(coin_pair, decision.decision, decision.reason, signal_time=start_ms)
+        if decision.decision != "BUY":
+            return trade
+        try:
+            tp_price = decision.targets[3].price
+            sl_price = decision.stop_losses[0].price
+        except IndexError:
+            trade.decision, trade.reason = "FAIL", "Data TP4 atau SL1 tidak ditemukan pada sinyal."
+            return trade
+
+        open_time = candles.open_time[first:last]
+        opens, highs, lows, closes = (a[first:last] for a in (candles.open, candles.high, candles.low, candles.close))
+        trade.entry_time, trade.entry_price = int(open_time[0]), entry_price
+
+        # --- Trailing SL: SL naik ke TP tertinggi yang pemicunya sudah dilewati harga penutupan tertinggi sejauh ini.
+        # Seperti rutinitas manage, SL baru berlaku mulai candle berikutnya dan TP OCO baru memakai target terakhir.
+        stop_loss = np.full(len(closes), sl_price)
+        take_profit = np.full(len(closes), tp_price)
+        if params.trailing_enabled:
+            levels = [t for t in decision.targets if t.level >= params.min_trailing_tp_level]
+            if levels:
+                trail_prices = np.array([t.price for t in levels], dtype=np.float64)
+                triggers = trail_prices * (1 + params.trailing_trigger_percentage)
+                order = np.argsort(triggers)
+                best_tp = np.concatenate(([-np.inf], np.maximum.accumulate(trail_prices[order])))
+                reached = np.searchsorted(triggers[order], np.maximum.accumulate(closes), side="right")
+                after_close = np.maximum(sl_price, best_tp[reached])
+                stop_loss[1:] = after_close[:-1]
+                take_profit[stop_loss > sl_price] = decision.targets[-1].price
+
+        sl_hit = lows <= stop_loss
+        tp_hit = highs >= take_profit
+        exits = sl_hit | tp_hit
+        if params.stuck_trade_enabled:
+            tp1_price = decision.targets[0].price if decision.targets else None
+            if tp1_price:
+                # Dicek saat candle ditutup, seperti rutinitas manage yang memakai harga terkini.
+                age_ms = open_time + params.interval_ms - trade.entry_time
+                exits = exits | ((age_ms >= params.stuck_trade_duration_hours * 3_600_000) & (closes < tp1_price))
+
+        if not exits.any():
+            exit_index, trade.exit_reason = len(closes) - 1, "OPEN"
+            trade.exit_price = float(closes[exit_index])
+        else:
+            exit_index = int(np.argmax(exits))
+            if sl_hit[exit_index]:
+                # Jika TP dan SL tersentuh di candle yang sama, urutan intrabar tidak diketahui: anggap SL (konservatif).
+                trade.exit_price = float(min(opens[exit_index], stop_loss[exit_index]))
+                trade.exit_reason = "TRAILING_SL" if stop_loss[exit_index] > sl_price else "SL"
+            elif tp_hit[exit_index]:
+                trade.exit_price, trade.exit_reason = float(take_profit[exit_index]), "TP"
+            else:
+                trade.exit_price, trade.exit_reason = float(closes[exit_index]), "STUCK"
+        trade.stop_loss_moves = int(np.count_nonzero(np.diff(stop_loss[:exit_index + 1])))
+        trade.exit_time = int(open_time[exit_index])
+
+        quantity = params.usdt_per_trade / entry_price
+        proceeds = quantity * trade.exit_price
+        fees = params.fee_rate * (params.usdt_per_trade + proceeds)
+        trade.pnl_usdt = round(proceeds - params.usdt_per_trade - fees, 6)
+        trade.return_pct = round(trade.pnl_usdt / params.usdt_per_trade * 100, 4)
+        return trade
@@ -0,0 +1,154 @@
+# Auto Trade Bot/backtest/sweep.py
+"""
+Pencarian parameter (grid atau random) untuk aturan trailing & posisi macet, dijalankan paralel di semua core.
+
+Data harga tidak dikirim per task: candle diunduh sekali ke KlineStore oleh proses utama, lalu setiap worker
+membuka file memmap yang sama (halaman file dibagi lewat page cache OS). Sinyal dikirim sekali per worker
+lewat initializer ProcessPoolExecutor, sehingga setiap task hanya membawa satu set parameter kecil.
+"""
+import csv
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from typing import Any, Dict, List, Optional, Sequence
+
+import config
+from binance.klines_store import KlineDownloader, KlineStore
+from telegram.utils import JsonWriter
+from .engine import BacktestEngine, BacktestParams, signal_time_ms
+
+logger = logging.getLogger(__name__)
+
+# Ruang parameter default. Nilai list = pilihan diskret; tuple (min, max) = rentang kontinu (hanya untuk random search).
+DEFAULT_SPACE: Dict[str, Any] = {
+    "trailing_enabled": [True],
+    "stuck_trade_enabled": [True],
+    "min_trailing_tp_level": [1, 2, 3],
+    "trailing_trigger_percentage": [0.0, 0.0025, 0.005, 0.01, 0.02],
+    "stuck_trade_duration_hours": [3, 6, 12, 24, 48],
+    "usdt_per_trade": [config.USDT_AMOUNT_PER_TRADE],
+}
+
+RANK_METRICS = ("total_pnl_usdt", "avg_return_pct", "win_rate", "profit_factor")
+
+def _validate_space(space: Dict[str, Any]):
+    valid = {f.name for f in fields(BacktestParams)}
+    unknown = set(space) - valid
+    if unknown:
+        raise ValueError(f"Parameter tidak dikenal: {', '.join(sorted(unknown))}. Pilihan: {', '.join(sorted(valid))}.")
+
+def grid_search(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Semua kombinasi nilai diskret di `space`."""
+    _validate_space(space)
+    names = list(space)
+    for name in names:
+        if not isinstance(space[name], (list, set)):
+            raise ValueError(f"Grid search butuh daftar nilai untuk '{name}', bukan rentang.")
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+def load_space(path: str) -> Dict[str, Any]:
+    """Membaca ruang parameter dari file JSON. Rentang ditulis sebagai {"min": .., "max": ..}."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return {name: (values["min"], values["max"]) if isinstance(values, dict) else values for name, values in raw.items()}
+
+def random_search(space: Dict[str, Any], samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`samples` kombinasi acak: list dipilih acak, tuple (min, max) diambil seragam (int jika kedua batas int)."""
+    _validate_space(space)
+    rnd = random.Random(seed)
+    candidates, seen = [], set()
+    for _ in range(samples * 20):
+        if len(candidates) >= samples:
+            break
+        candidate = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                candidate[name] = rnd.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rnd.uniform(low, high)
+            else:
+                candidate[name] = rnd.choice(list(values))
+        key = tuple(sorted(candidate.items()))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(candidate)
+    return candidates
+
+def prefetch_candles(signals: List[Dict[str, Any]], store: KlineStore, downloader: KlineDownloader, interval: str, max_hold_hours: float):
+    """Memastikan semua rentang candle yang dibutuhkan sudah ada di store sebelum worker dijalankan."""
+    horizon_ms = int(max_hold_hours * 3_600_000)
+    ranges: Dict[str, List[int]] = {}
+    for signal in signals:
+        start_ms = signal_time_ms(signal)
+        if signal.get("coin_pair") and start_ms is not None:
+            bounds = ranges.setdefault(signal["coin_pair"], [start_ms, start_ms])
+            bounds[0], bounds[1] = min(bounds[0], start_ms), max(bounds[1], start_ms)
+    for symbol, (first_ms, last_ms) in sorted(ranges.items()):
+        downloader.update(symbol, interval, first_ms, last_ms + horizon_ms)
+
+# --- Worker ---
+_worker_signals: List[Dict[str, Any]] = []
+_worker_store: Optional[KlineStore] = None
+
+def _init_worker(signals: List[Dict[str, Any]], store_directory: str):
+    global _worker_signals, _worker_store
+    _worker_signals = signals
+    _worker_store = KlineStore(store_directory)
+
+def _run_candidate(params: BacktestParams) -> Dict[str, Any]:
+    engine = BacktestEngine(_worker_store.candle_source(params.interval), params)
+    return engine.run(_worker_signals).summary()
+
+def _rank_value(row: Dict[str, Any], rank_by: str) -> float:
+    """Nilai urut satu baris. profit_factor None berarti tidak ada trade rugi: terbaik jika ada trade untung, tanpa data jika tidak."""
+    value = row[rank_by]
+    if value is not None:
+        return value
+    if rank_by == "profit_factor" and row.get("win_rate"):
+        return float("inf")
+    return float("-inf")
+
+# --- Runner ---
+def run_sweep(signals: List[Dict[str, Any]], candidates: List[Dict[str, Any]], store: KlineStore,
+              rank_by: str = "total_pnl_usdt", workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Menjalankan backtest untuk setiap kandidat parameter di process pool. Parameter yang tidak ada di kandidat
+    diambil dari konfigurasi bot. Mengembalikan baris hasil terurut dari yang terbaik menurut `rank_by`.
+    """
+    if rank_by not in RANK_METRICS:
+        raise ValueError(f"rank_by harus salah satu dari: {', '.join(RANK_METRICS)}.")
+    started = time.perf_counter()
+    rows: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(signals, store.directory)) as executor:
+        futures = {executor.submit(_run_candidate, BacktestParams.from_config(**candidate)): candidate for candidate in candidates}
+        for done, future in enumerate(as_completed(futures), start=1):
+            candidate = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                logger.error("Backtest gagal untuk %s: %s", candidate, e)
+                continue
+            rows.append({**candidate, **{key: value for key, value in summary.items() if not isinstance(value, dict)}})
+            if done % 25 == 0 or done == len(futures):
+                logger.info("Sweep: %d/%d kandidat selesai (%.1f detik).", done, len(futures), time.perf_counter() - started)
+
+    rows.sort(key=lambda row: _rank_value(row, rank_by), reverse=True)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+def write_results(rows: List[Dict[str, Any]], file_name: str = "sweep_results", directory: str = "data"):
+    """Menyimpan tabel peringkat sebagai CSV (untuk spreadsheet) dan JSON."""
+    if not rows:
+        return
+    JsonWriter(f"{file_name}.json", directory).write(rows)
+    columns = ["rank"] + [key for key in rows[0] if key != "rank"]
+    with open(os.path.join(directory, f"{file_name}.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
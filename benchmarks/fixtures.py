@@ -0,0 +1,137 @@
+# Auto Trade Bot/benchmarks/fixtures.py
+"""Data palsu untuk benchmark: korpus pesan Telegram, payload ticker/exchangeInfo, dan klien Binance offline."""
+import random
+import tempfile
+import os
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional
+
+from binance.client import BinanceClient
+from binance.exchange_info import SymbolRulesCache
+from binance.market_data import PriceCache
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+class CorpusGenerator:
+    """Menghasilkan pesan realistis dengan format yang sama seperti channel sinyal."""
+
+    def __init__(self, seed: int = 42, symbol_count: int = 200):
+        self.rnd = random.Random(seed)
+        self.coins = sorted({self._random_coin() for _ in range(symbol_count)})
+
+    def _random_coin(self) -> str:
+        return ''.join(self.rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(self.rnd.randint(3, 5)))
+
+    def new_signal(self) -> str:
+        coin = self.rnd.choice(self.coins)
+        entry = self.rnd.uniform(0.001, 500)
+        targets = '\n'.join(f"Target {i}  {entry * (1 + 0.02 * i):.6f}  +{2 * i:.2f}%" for i in range(1, 5))
+        stop_losses = '\n'.join(f"Stop Loss {i}  {entry * (1 - 0.05 * i):.6f}  -{5 * i:.2f}%" for i in range(1, 3))
+        return (
+            f"🆕 NEW SIGNAL: {coin}USDT 🆕\n"
+            f"Volume(24H) Ranked: #{self.rnd.randint(1, 400)}\n"
+            f"Risk Level: {self.rnd.choice(['🟢', '⚠️'])} {self.rnd.choice(['Low', 'Medium', 'High'])}\n"
+            "---\n"
+            f"Entry: {entry:.6f}\n"
+            "---\n"
+            f"{targets}\n{stop_losses}\n"
+            "---\n"
+            "📊 Social: https://example.com/social\n📈 Analysis: https://example.com/analysis"
+        )
+
+    def signal_update(self) -> str:
+        coin = self.rnd.choice(self.coins)
+        if self.rnd.random() < 0.7:
+            hits = '\n'.join(f"🎯 Target {i} ({self.rnd.uniform(0.01, 100):.4f}) HIT!" for i in range(1, self.rnd.randint(2, 5)))
+            return f"✅ SIGNAL UPDATE: {coin}USDT ✅\n{hits}\nProfit: +{self.rnd.uniform(1, 20):.2f}%"
+        return f"🔴 SIGNAL UPDATE: {coin}USDT 🔴\n⚠️ Stop Loss 1 ({self.rnd.uniform(0.01, 100):.4f}) TRIGGERED!\nLoss: -{self.rnd.uniform(1, 10):.2f}%"
+
+    def market_alert(self) -> str:
+        coin = self.rnd.choice(self.coins)
+        if self.rnd.random() < 0.5:
+            return f"⚡⚡⚡ {coin} price {self.rnd.choice(['increased', 'decreased'])} {self.rnd.uniform(1, 15):.2f}% in the last {self.rnd.choice([5, 15, 30])} minutes"
+        return f"🆕 NEW SIGNAL 🆕\n❗❗❗ {coin} price amplitude is {self.rnd.uniform(1, 15):.2f}% in the last {self.rnd.choice([5, 15, 30])} minutes"
+
+    def daily_recap(self) -> str:
+        pick = lambda n: ', '.join(self.rnd.sample(self.coins, n))
+        return (
+            "📊 DAILY RECAP 01/01-02/01 📊\n"
+            f"✅ Hitted target 1: {pick(5)}\n✅ Hitted target 2: {pick(3)}\n"
+            f"✅ Hitted target 3: {pick(2)}\n✅ Hitted target 4: {pick(1)}\n"
+            f"➡️ Running: {pick(4)}\n🛑 Hitted stop loss: {pick(2)}\n"
+            f"Total Signals: {self.rnd.randint(5, 30)}\nHitted Take-Profits: {self.rnd.randint(1, 20)}\nHitted Stop-Losses: {self.rnd.randint(0, 10)}"
+        )
+
+    def unstructured(self) -> str:
+        return self.rnd.choice([
+            "Selamat pagi semua! Pasar terlihat bullish hari ini.\nSource: Admin",
+            "Jangan lupa pasang stop loss ya.",
+            "🚀 Promo VIP bulan ini, hubungi admin.",
+            "Market update: BTC dominance naik.\nsource: research team",
+        ])
+
+    def messages(self, count: int, weights: Optional[Dict[str, float]] = None) -> List[SimpleNamespace]:
+        """Menghasilkan objek mirip pesan Telethon (raw_text, date, sender_id, id)."""
+        generators = {
+            "NewSignal": self.new_signal, "SignalUpdate": self.signal_update, "MarketAlert": self.market_alert,
+            "DailyRecap": self.daily_recap, "UnstructuredMessage": self.unstructured,
+        }
+        weights = weights or {"NewSignal": 0.3, "SignalUpdate": 0.35, "MarketAlert": 0.2, "DailyRecap": 0.05, "UnstructuredMessage": 0.1}
+        names = list(weights)
+        chosen = self.rnd.choices(names, weights=[weights[n] for n in names], k=count)
+        return [
+            SimpleNamespace(raw_text=generators[name](), date=BASE_TIME + timedelta(minutes=i), sender_id=1000, id=i + 1)
+            for i, name in enumerate(chosen)
+        ]
+
+    def tickers(self) -> List[Dict[str, str]]:
+        return [{"symbol": f"{coin}USDT", "price": f"{self.rnd.uniform(0.001, 500):.6f}"} for coin in self.coins]
+
+    def exchange_info(self) -> Dict[str, Any]:
+        symbols = []
+        for coin in self.coins:
+            symbols.append({
+                "symbol": f"{coin}USDT", "status": "TRADING", "baseAsset": coin, "quoteAsset": "USDT",
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": "0.00000100", "maxPrice": "1000000.00", "tickSize": "0.00000100"},
+                    {"filterType": "LOT_SIZE", "minQty": "0.01000000", "maxQty": "9000000.00", "stepSize": "0.01000000"},
+                    {"filterType": "MIN_NOTIONAL", "minNotional": "5.00000000"},
+                ],
+            })
+        return {"timezone": "UTC", "serverTime": 0, "symbols": symbols}
+
+    def account_info(self, asset_count: int = 50) -> Dict[str, Any]:
+        balances = [{"asset": "USDT", "free": "1000.00", "locked": "0.00"}]
+        for coin in self.rnd.sample(self.coins, min(asset_count, len(self.coins))):
+            balances.append({"asset": coin, "free": f"{self.rnd.uniform(0, 100):.4f}", "locked": f"{self.rnd.uniform(0, 10):.4f}"})
+        # Akun Binance asli juga memuat ratusan aset bersaldo nol.
+        balances.extend({"asset": f"ZERO{i}", "free": "0.00000000", "locked": "0.00000000"} for i in range(300))
+        return {"balances": balances}
+
+
+class OfflineBinanceClient(BinanceClient):
+    """BinanceClient yang menjawab request dari payload palsu, tanpa jaringan maupun kredensial asli."""
+
+    def __init__(self, corpus: CorpusGenerator):
+        super().__init__("benchmark-key", "benchmark-secret")
+        self._tickers = corpus.tickers()
+        self._ticker_map = {t['symbol']: t for t in self._tickers}
+        self._account_info = corpus.account_info()
+        # Cache terpisah agar benchmark tidak menyentuh data/ milik bot; harga cache selalu basi sehingga jalur REST teruji.
+        cache_dir = tempfile.mkdtemp(prefix="bench-")
+        self.symbol_rules = SymbolRulesCache(os.path.join(cache_dir, "exchange_info.json"), ttl_seconds=float('inf'))
+        self.symbol_rules.update(corpus.exchange_info())
+        self.price_cache = PriceCache(max_age_seconds=-1)
+
+    def _send_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Optional[Any]:
+        params = params or {}
+        if endpoint == "/ticker/price":
+            if 'symbol' in params:
+                return self._ticker_map.get(params['symbol'])
+            return self._tickers
+        if endpoint == "/account":
+            return self._account_info
+        if endpoint == "/openOrders":
+            return []
+        return None
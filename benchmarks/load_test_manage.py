@@ -0,0 +1,111 @@
+# Auto Trade Bot/benchmarks/load_test_manage.py
+"""
+Uji beban rutinitas manajemen posisi terhadap bursa simulasi (tanpa jaringan, tanpa MongoDB).
+Membuka ratusan posisi lewat Trader, lalu menjalankan run_manage_positions_routine beberapa siklus
+sambil menggerakkan harga sehingga trailing SL, TP, dan SL benar-benar terjadi di matching engine.
+
+Contoh:
+    python -m benchmarks.load_test_manage --positions 500 --cycles 10
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+import config
+from binance.async_client import create_async_client
+from binance.client import create_client
+from binance.simulated import shared_simulated_exchange
+from binance.trader import Trader
+from binance.user_stream import shared_account_state
+from core.logging_config import setup_logging
+
+def _build_signal(symbol: str, entry: float) -> Dict[str, Any]:
+    return {
+        "coin_pair": symbol,
+        "entry_price": entry,
+        "targets": [{"level": level, "price": round(entry * (1 + 0.02 * level), 4)} for level in range(1, 5)],
+        "stop_losses": [{"level": 1, "price": round(entry * 0.95, 4)}],
+    }
+
+def open_positions(count: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """Mendaftarkan `count` simbol di bursa simulasi dan membuka satu posisi OCO per simbol lewat Trader."""
+    rnd = random.Random(seed)
+    exchange = shared_simulated_exchange
+    exchange.deposit("USDT", count * config.USDT_AMOUNT_PER_TRADE * 2)
+    exchange.attach_account_state(shared_account_state)
+    trader = Trader(create_client(), config.USDT_AMOUNT_PER_TRADE, shared_account_state)
+    account_summary = {"held_assets": [{"asset": "USDT", "free_balance": float("inf")}]}
+
+    signals = {}
+    for i in range(count):
+        symbol = f"SIM{i}USDT"
+        entry = round(rnd.uniform(0.5, 50), 4)
+        exchange.add_symbol(symbol, entry, tick_size="0.00010000", step_size="0.01000000")
+        signals[symbol] = _build_signal(symbol, entry)
+        result = trader.execute_trade(signals[symbol], account_summary)
+        if result["status"] != "SUCCESS":
+            raise RuntimeError(f"Gagal membuka posisi {symbol}: {result['reason']}")
+    return signals
+
+def move_prices(signals: Dict[str, Dict[str, Any]], rnd: random.Random, drift: float, volatility: float):
+    """Random walk per simbol; candle-nya diputar lewat matching engine sehingga OCO bisa terisi."""
+    for symbol in signals:
+        price = shared_simulated_exchange.price_cache.get_price(symbol)
+        path = [price * (1 + rnd.gauss(drift, volatility)) for _ in range(4)]
+        shared_simulated_exchange.replay(symbol, path)
+
+async def run(positions: int, cycles: int, seed: int, drift: float, volatility: float) -> List[Dict[str, Any]]:
+    from core.routines import run_manage_positions_routine
+    rnd = random.Random(seed)
+    started = time.perf_counter()
+    signals = open_positions(positions, seed)
+    print(f"{positions} posisi dibuka dalam {time.perf_counter() - started:.2f} detik.")
+
+    def lookup(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {symbol: signals[symbol] for symbol in symbols if symbol in signals}
+
+    # Seperti listen/autoloop: satu klien async berumur panjang dipakai oleh semua siklus.
+    client = create_async_client(max_concurrency=config.BINANCE_MAX_CONCURRENT_REQUESTS)
+    stats = shared_simulated_exchange.stats
+    rows = []
+    print(f"\n{'Siklus':>6} {'OCO aktif':>10} {'Durasi (ms)':>12} {'Trailing':>9} {'Terisi':>7} {'Ditolak':>8}")
+    for cycle in range(1, cycles + 1):
+        before = dict(stats)
+        move_prices(signals, rnd, drift, volatility)
+        active = len({o['orderListId'] for o in shared_account_state.get_open_orders()})
+        cycle_started = time.perf_counter()
+        await run_manage_positions_routine(client=client, signal_lookup=lookup)
+        elapsed_ms = (time.perf_counter() - cycle_started) * 1000
+        row = {"cycle": cycle, "active_oco": active, "duration_ms": elapsed_ms,
+               "trailing_moves": stats["cancels"] - before["cancels"], "fills": stats["fills"] - before["fills"],
+               "rejects": stats["rejects"] - before["rejects"]}
+        rows.append(row)
+        print(f"{cycle:>6} {active:>10} {elapsed_ms:>12.1f} {row['trailing_moves']:>9} {row['fills']:>7} {row['rejects']:>8}")
+
+    await client.close()
+
+    durations = [row["duration_ms"] for row in rows if row["active_oco"]]
+    if durations:
+        print(f"\nMedian durasi siklus: {statistics.median(durations):.1f} ms, maksimum: {max(durations):.1f} ms")
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban manajemen posisi terhadap bursa simulasi.")
+    parser.add_argument('--positions', type=int, default=300, help="Jumlah posisi OCO yang dibuka (default: 300).")
+    parser.add_argument('--cycles', type=int, default=10, help="Jumlah siklus manajemen posisi (default: 10).")
+    parser.add_argument('--seed', type=int, default=42, help="Seed harga agar hasil dapat diulang (default: 42).")
+    parser.add_argument('--drift', type=float, default=0.004, help="Rata-rata perubahan harga per langkah (default: 0.004).")
+    parser.add_argument('--volatility', type=float, default=0.01, help="Simpangan perubahan harga per langkah (default: 0.01).")
+    parser.add_argument('--log-level', default="WARNING", help="Level log selama uji beban (default: WARNING).")
+    args = parser.parse_args()
+
+    config.BINANCE_MODE = "simulated"
+    config.TRAILING_ENABLED = True  # Tanpa trailing, siklus manajemen hanya membaca posisi.
+    setup_logging(level=args.log_level)
+    asyncio.run(run(args.positions, args.cycles, args.seed, args.drift, args.volatility))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Auto Trade Bot/benchmarks/run_benchmarks.py
+"""
+Micro-benchmark untuk jalur panas bot (parser, strategi, format order, ringkasan akun, serializer).
+Berjalan sepenuhnya offline. Hasil disimpan sebagai baseline JSON dan bisa dibandingkan antar run.
+
+Contoh:
+    python -m benchmarks.run_benchmarks --save benchmarks/baselines/main.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baselines/main.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, Tuple
+
+from binance.account import AccountManager
+from binance.strategy import TradingStrategy
+from telegram.parser import TelegramMessageParser
+from .fixtures import CorpusGenerator, OfflineBinanceClient
+
+def _time_it(func: Callable[[], Any], operations: int, repeat: int) -> Dict[str, float]:
+    """Menjalankan `func` sebanyak `repeat` kali; setiap panggilan mewakili `operations` operasi."""
+    func()  # pemanasan
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "operations": operations,
+        "best_seconds": best,
+        "median_seconds": statistics.median(timings),
+        "best_us_per_op": best / operations * 1e6,
+    }
+
+def build_benchmarks(corpus_size: int, seed: int) -> List[Tuple[str, Callable[[], Any], int]]:
+    corpus = CorpusGenerator(seed=seed)
+    messages = corpus.messages(corpus_size)
+    parser = TelegramMessageParser()
+    parsed = [parser.parse_message(m) for m in messages]
+    by_type: Dict[str, list] = {}
+    for message, result in zip(messages, parsed):
+        by_type.setdefault(result.message_type, []).append(message)
+
+    client = OfflineBinanceClient(corpus)
+    strategy = TradingStrategy(client)
+    manager = AccountManager(client)
+    signals = [p.to_dict() for p in parsed if p.message_type == "NewSignal"]
+    decisions = [strategy.evaluate_new_signal(s) for s in signals]
+    values = [(corpus.rnd.uniform(0.0001, 1000), corpus.rnd.choice(["0.00000100", "0.01000000", "1.00000000"])) for _ in range(10000)]
+
+    benchmarks = [
+        ("parser.parse_message[corpus]", lambda: [parser.parse_message(m) for m in messages], len(messages)),
+    ]
+    for message_type, items in sorted(by_type.items()):
+        benchmarks.append((f"parser.parse_message[{message_type}]", lambda items=items: [parser.parse_message(m) for m in items], len(items)))
+    benchmarks += [
+        ("models.to_dict[parsed]", lambda: [p.to_dict() for p in parsed], len(parsed)),
+        ("models.TradeDecision.to_dict", lambda: [d.to_dict() for d in decisions], len(decisions)),
+        ("strategy.evaluate_new_signal", lambda: [strategy.evaluate_new_signal(s) for s in signals], len(signals)),
+        ("strategy.evaluate_signals", lambda: strategy.evaluate_signals(signals), len(signals)),
+        ("client._format_value", lambda: [client._format_value(v, step) for v, step in values], len(values)),
+        ("account.get_account_summary", lambda: [manager.get_account_summary() for _ in range(20)], 20),
+    ]
+    return benchmarks
+
+def run(corpus_size: int, repeat: int, seed: int, name_filter: str = "") -> Dict[str, Any]:
+    results = {}
+    # Fungsi yang dibenchmark menulis log lewat logging; matikan selama pengukuran (kecuali ERROR ke atas).
+    logging.disable(logging.WARNING)
+    try:
+        for name, func, operations in build_benchmarks(corpus_size, seed):
+            if name_filter in name and operations:
+                results[name] = _time_it(func, operations, repeat)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus_size": corpus_size,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Mencetak perbandingan dengan baseline. Mengembalikan True jika ada regresi melewati ambang batas."""
+    regressed = False
+    print(f"\n{'Benchmark':<40} {'Baseline (us/op)':>17} {'Sekarang (us/op)':>17} {'Rasio':>8}")
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            print(f"{name:<40} {'-':>17} {result['best_us_per_op']:>17.3f} {'baru':>8}")
+            continue
+        ratio = result['best_us_per_op'] / base['best_us_per_op']
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, regressed = "  << REGRESI", True
+        print(f"{name:<40} {base['best_us_per_op']:>17.3f} {result['best_us_per_op']:>17.3f} {ratio:>7.2f}x{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark offline untuk jalur panas bot.")
+    parser.add_argument('--size', type=int, default=5000, help="Jumlah pesan dalam korpus (default: 5000).")
+    parser.add_argument('--repeat', type=int, default=7, help="Jumlah pengulangan per benchmark (default: 7).")
+    parser.add_argument('--seed', type=int, default=42, help="Seed korpus agar hasil dapat dibandingkan (default: 42).")
+    parser.add_argument('--filter', default="", help="Hanya jalankan benchmark yang namanya mengandung teks ini.")
+    parser.add_argument('--save', help="Path file JSON untuk menyimpan hasil sebagai baseline.")
+    parser.add_argument('--compare', help="Path baseline JSON untuk dibandingkan.")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Ambang regresi relatif (default: 0.10 = 10%%).")
+    args = parser.parse_args()
+
+    current = run(args.size, args.repeat, args.seed, args.filter)
+    for name, result in current['results'].items():
+        print(f"{name:<40} {result['best_us_per_op']:>12.3f} us/op  ({result['operations']} ops, best {result['best_seconds'] * 1000:.2f} ms)")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=4)
+        print(f"\nHasil disimpan ke {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
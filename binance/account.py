@@ -1,65 +1,64 @@
 # Auto Trade Bot/binance/account.py
+import logging
+import time
 from typing import Dict, Any, Optional
+import config
 from .client import BinanceClient
+from .user_stream import AccountState
+from .valuation import PortfolioValuation, shared_portfolio_valuation
+
+logger = logging.getLogger(__name__)
 
 class AccountManager:
     """
     Mengelola fungsionalitas terkait akun Binance.
     """
-    STABLECOINS = {'USDT', 'BUSD', 'USDC', 'DAI', 'TUSD'}
 
-    def __init__(self, client: BinanceClient):
+    def __init__(self, client: BinanceClient, account_state: Optional[AccountState] = None,
+                 valuation: Optional[PortfolioValuation] = None):
         self.client = client
+        self.account_state = account_state
+        self.valuation = valuation or shared_portfolio_valuation
 
     def get_account_summary(self) -> Optional[Dict[str, Any]]:
         """
         Menghasilkan ringkasan akun, termasuk aset yang dipegang dan total nilai dalam USDT.
+        Penilaian bersifat inkremental: hanya aset yang saldo atau harga jalurnya berubah yang dihitung ulang.
         """
-        print("Mengambil informasi akun dari Binance...")
-        account_info = self.client.get_account_info()
+        if self.account_state and self.account_state.is_live:
+            account_info = {"balances": self.account_state.get_balances()}
+        else:
+            logger.debug("Mengambil informasi akun dari Binance...")
+            account_info = self.client.get_account_info()
         if not account_info or 'balances' not in account_info:
-            print("Gagal mendapatkan informasi akun atau 'balances' tidak ditemukan.")
+            logger.error("Gagal mendapatkan informasi akun atau 'balances' tidak ditemukan.")
             return None
-            
-        print("Mengambil semua harga ticker untuk kalkulasi nilai...")
-        all_tickers = self.client.get_all_tickers()
-        if not all_tickers:
-            print("Gagal mengambil harga ticker. Tidak dapat menghitung total nilai.")
-            return {"held_assets": [], "total_balance_usdt": 0.0, "error": "Gagal mengambil harga ticker."}
 
-        held_assets = []
-        total_balance_usdt = 0.0
+        valuation = self.valuation
+        valuation.update_balances(account_info['balances'])
+        # Aset baru mendapat jalur harga dari indeks yang sudah ada, sehingga simbolnya ikut diperbarui di bawah.
+        valuation.revalue()
 
-        print("Menghitung nilai aset yang dipegang...")
-        for asset in account_info['balances']:
-            asset_name = asset['asset']
-            total_balance = float(asset['free']) + float(asset['locked'])
+        # Hanya simbol pada jalur harga aset yang dipegang yang diperbarui (cache websocket dulu, lalu satu request REST).
+        symbols = valuation.required_symbols()
+        if symbols:
+            prices = self.client.get_price_map(symbols)
+            if not prices:
+                logger.error("Gagal mengambil harga ticker. Tidak dapat menghitung total nilai.")
+                return {"held_assets": [], "total_balance_usdt": 0.0, "error": "Gagal mengambil harga ticker."}
+            valuation.update_prices(prices)
 
-            if total_balance > 0:
-                asset_value_usdt = 0.0
-                if asset_name in self.STABLECOINS:
-                    asset_value_usdt = total_balance
-                else:
-                    ticker_usdt = f"{asset_name}USDT"
-                    if ticker_usdt in all_tickers:
-                        price_usdt = all_tickers[ticker_usdt]
-                        asset_value_usdt = total_balance * price_usdt
-                
-                # Hanya tambahkan ke ringkasan jika nilainya signifikan (di atas $0.01)
-                if asset_value_usdt > 0.01:
-                    held_assets.append({
-                        "asset": asset_name,
-                        "total_balance": total_balance,
-                        "free_balance": float(asset['free']),
-                        "locked_balance": float(asset['locked']),
-                        "value_in_usdt": round(asset_value_usdt, 2)
-                    })
-                    total_balance_usdt += asset_value_usdt
-        
-        # Urutkan aset berdasarkan nilai dari yang terbesar
-        held_assets.sort(key=lambda x: x['value_in_usdt'], reverse=True)
+        # Snapshot semua ticker hanya untuk mencari jalur aset yang belum bisa dinilai, dan dibatasi TTL.
+        unpriced = valuation.unpriced_assets()
+        if unpriced and time.time() - valuation.full_snapshot_at > config.ACCOUNT_PRICE_SNAPSHOT_TTL_SECONDS:
+            logger.debug("Mengambil semua harga ticker untuk menilai %s...", ", ".join(unpriced))
+            rest_prices = self.client.get_price_map()
+            if not rest_prices:
+                logger.error("Gagal mengambil harga ticker. Tidak dapat menghitung total nilai.")
+                return {"held_assets": [], "total_balance_usdt": 0.0, "error": "Gagal mengambil harga ticker."}
+            valuation.update_prices(rest_prices)
+            valuation.mark_full_snapshot()
 
-        return {
-            "total_balance_usdt": round(total_balance_usdt, 2),
-            "held_assets": held_assets
-        }
\ No newline at end of file
+        recalculated = valuation.revalue()
+        logger.debug("Menilai ulang %d aset.", recalculated)
+        return valuation.summary()
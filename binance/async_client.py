@@ -0,0 +1,208 @@
+# Auto Trade Bot/binance/async_client.py
+import asyncio
+import json
+import logging
+import time
+import aiohttp
+from typing import Optional, Dict, Any, List
+import config
+from .client import BaseBinanceClient, is_simulated
+
+logger = logging.getLogger(__name__)
+
+class AsyncBinanceClient(BaseBinanceClient):
+    """
+    Versi asinkron dari BinanceClient untuk dipakai di dalam rutinitas asyncio.
+    Menggunakan satu sesi aiohttp dengan koneksi keep-alive yang di-pool, timeout per request,
+    dan semaphore untuk membatasi jumlah request yang berjalan bersamaan.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, max_concurrency: int = 10, timeout_seconds: float = 10.0):
+        super().__init__(api_key, api_secret)
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._exchange_info_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Sesi dibuat secara lazy agar terikat ke event loop yang sedang berjalan.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, headers=self._default_headers())
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._exchange_info_lock = asyncio.Lock()
+        return self._session
+
+    async def close(self):
+        """Menutup sesi HTTP dan semua koneksi di pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _send_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Optional[Any]:
+        if params is None:
+            params = {}
+
+        url = f"{self.BASE_API_URL}{endpoint}"
+        session = self._get_session()
+        req_method = method.upper()
+
+        if signed:
+            if not self.api_key or not self.api_secret:
+                logger.error("Error: API Key dan Secret Key diperlukan.")
+                return None
+            if req_method not in ('GET', 'POST', 'DELETE'):
+                logger.error("Metode HTTP tidak didukung: %s", req_method)
+                return None
+            if self.server_clock.needs_sync():
+                await self.sync_server_time()
+
+        if not await self.rate_limiter.acquire_async(req_method, endpoint, params):
+            return None
+
+        async with self._semaphore:
+            try:
+                started = time.perf_counter()
+                if signed:
+                    query_string = self._build_signed_query(params)
+                    if req_method == 'POST':
+                        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+                        request = session.post(url, data=query_string, headers=headers)
+                    else:
+                        request = session.request(req_method, f"{url}?{query_string}")
+                else:
+                    request = session.get(url, params=params)
+
+                async with request as response:
+                    self.latency.observe(f"{req_method} {endpoint}", time.perf_counter() - started)
+                    self.rate_limiter.record_response(response.status, response.headers)
+                    if response.status >= 400:
+                        if signed:
+                            error_body = await response.text()
+                            logger.error("Error saat request ke %s: HTTP %s", url, response.status)
+                            logger.error("Error Body dari Binance: %s", error_body)
+                            try:
+                                self._check_time_error(json.loads(error_body))
+                            except json.JSONDecodeError:
+                                pass
+                        return None
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if signed:
+                    logger.error("Error saat request ke %s: %r", url, e)
+                return None
+
+    async def sync_server_time(self) -> bool:
+        """Memperbarui offset jam lokal terhadap server Binance via GET /time."""
+        sent_at = time.time()
+        data = await self._send_request("GET", "/time")
+        received_at = time.time()
+        if not data or 'serverTime' not in data:
+            return False
+        self.server_clock.update(data['serverTime'], sent_at, received_at)
+        return True
+
+    async def warm_up(self):
+        """Membuka koneksi keep-alive ke host API dan menyinkronkan jam sebelum order pertama."""
+        if await self.sync_server_time():
+            logger.info("Koneksi Binance siap (offset jam: %s ms, RTT: %.0f ms).", self.server_clock.offset_ms, self.server_clock.round_trip_ms)
+
+    async def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Mengambil aturan trading simbol dari cache bersama; hanya request ke jaringan jika cache kosong."""
+        if not self.symbol_rules.ensure_loaded():
+            self._get_session()
+            async with self._exchange_info_lock:
+                if not self.symbol_rules.ensure_loaded():
+                    logger.info("Mengambil exchange info (aturan trading)...")
+                    self.symbol_rules.update(await self._send_request("GET", "/exchangeInfo"))
+        elif self.symbol_rules.is_stale():
+            self.symbol_rules.refresh_in_background(self._fetch_exchange_info_blocking)
+        return self.symbol_rules.get(symbol)
+
+    async def place_market_buy_order(self, symbol: str, quote_order_qty: float) -> Optional[Dict[str, Any]]:
+        params = {"symbol": symbol, "side": "BUY", "type": "MARKET", "quoteOrderQty": quote_order_qty}
+        return await self._send_request("POST", "/order", params, signed=True)
+
+    async def place_market_sell_order(self, symbol: str, quantity: float) -> Optional[Dict[str, Any]]:
+        """Menempatkan order MARKET SELL untuk sejumlah kuantitas tertentu."""
+        params = self._build_market_sell_params(symbol, await self.get_symbol_info(symbol), quantity)
+        if not params:
+            return None
+        return await self._send_request("POST", "/order", params, signed=True)
+
+    async def place_oco_sell_order(self, symbol: str, quantity: float, take_profit_price: float, stop_loss_price: float) -> Optional[Dict[str, Any]]:
+        params = self._build_oco_sell_params(symbol, await self.get_symbol_info(symbol), quantity, take_profit_price, stop_loss_price)
+        if not params:
+            return None
+        return await self._send_request("POST", "/order/oco", params, signed=True)
+
+    async def cancel_oco_order(self, symbol: str, order_list_id: int) -> Optional[Dict[str, Any]]:
+        logger.info("Membatalkan OCO orderListId: %s untuk %s...", order_list_id, symbol, extra={"symbol": symbol})
+        params = {"symbol": symbol, "orderListId": order_list_id}
+        return await self._send_request("DELETE", "/orderList", params, signed=True)
+
+    async def get_current_price(self, symbol: str) -> Optional[float]:
+        """Membaca harga dari cache websocket lebih dulu; REST hanya dipakai jika data basi atau tidak ada."""
+        cached_price = self.price_cache.get_price(symbol)
+        if cached_price is not None:
+            return cached_price
+        params = {"symbol": symbol}
+        data = await self._send_request("GET", "/ticker/price", params)
+        if not data or 'price' not in data:
+            return None
+        price = float(data['price'])
+        self.price_cache.update(symbol, price=price)
+        return price
+
+    async def get_current_prices(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        """Mengambil harga beberapa simbol secara paralel."""
+        prices = await asyncio.gather(*(self.get_current_price(symbol) for symbol in symbols))
+        return dict(zip(symbols, prices))
+
+    async def get_all_tickers(self) -> Optional[List[Dict[str, Any]]]:
+        return await self._send_request("GET", "/ticker/price")
+
+    async def get_price_map(self, symbols: Optional[List[str]] = None) -> Dict[str, float]:
+        """Mengambil harga beberapa simbol sekaligus sebagai dict symbol -> harga."""
+        if symbols:
+            price_map = self.price_cache.get_prices(symbols)
+            missing = [s for s in symbols if s not in price_map]
+            if not missing:
+                return price_map
+            params = {"symbols": json.dumps(missing, separators=(',', ':'))}
+            tickers = await self._send_request("GET", "/ticker/price", params)
+            if tickers:
+                price_map.update(self._build_price_map(tickers))
+                return price_map
+        return self._build_price_map(await self.get_all_tickers())
+
+    async def get_account_info(self) -> Optional[Dict[str, Any]]:
+        return await self._send_request("GET", "/account", signed=True)
+
+    async def get_klines(self, symbol: str, interval: str, start_time: Optional[int] = None,
+                         end_time: Optional[int] = None, limit: int = 1000) -> Optional[List[List[Any]]]:
+        return await self._send_request("GET", "/klines", self._build_klines_params(symbol, interval, start_time, end_time, limit))
+
+    async def get_open_orders(self, symbol: str = None) -> Optional[list]:
+        params = {}
+        if symbol:
+            params['symbol'] = symbol
+        return await self._send_request("GET", "/openOrders", params, signed=True)
+
+
+# --- BARU: Pemilihan klien live / simulasi ---
+def create_async_client(api_key: Optional[str] = None, api_secret: Optional[str] = None, max_concurrency: int = 10,
+                        timeout_seconds: float = 10.0) -> AsyncBinanceClient:
+    """AsyncBinanceClient untuk mode yang dipilih lewat BINANCE_MODE ("live" atau "simulated")."""
+    if is_simulated():
+        from .simulated import SimulatedAsyncBinanceClient
+        return SimulatedAsyncBinanceClient(api_key, api_secret, max_concurrency, timeout_seconds,
+                                           latency_seconds=config.SIMULATED_LATENCY_MS / 1000)
+    return AsyncBinanceClient(api_key, api_secret, max_concurrency, timeout_seconds)
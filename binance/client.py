@@ -1,32 +1,138 @@
 # Auto Trade Bot/binance/client.py
+import logging
 import time
 import hmac
 import hashlib
 import requests
 import math
 import json
+import config
+from urllib.parse import urlencode
 from typing import Optional, Dict, Any, List
+from .exchange_info import shared_symbol_rules
+from .market_data import shared_price_cache
+from .rate_limiter import shared_rate_limiter
+from .timing import shared_server_clock, shared_latency
 
-class BinanceClient:
+logger = logging.getLogger(__name__)
+
+class BaseBinanceClient:
     """
-    Klien untuk berinteraksi dengan API Binance, mendukung endpoint publik dan privat.
+    Logika bersama klien sinkron dan asinkron: penandatanganan, format nilai, dan penyusunan parameter order.
     """
     BASE_API_URL = "https://api.binance.com/api/v3"
+    DEFAULT_HEADERS = {
+        'Accept': 'application/json',
+        'User-Agent': 'AutoTradeBot/1.0'
+    }
 
     def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Accept': 'application/json',
-            'User-Agent': 'AutoTradeBot/1.0'
-        })
+        self.symbol_rules = shared_symbol_rules
+        self.price_cache = shared_price_cache
+        self.rate_limiter = shared_rate_limiter
+        self.server_clock = shared_server_clock
+        self.latency = shared_latency
+        # Kunci HMAC disiapkan sekali; setiap tanda tangan cukup menyalin state-nya.
+        self._hmac_key = hmac.new(api_secret.encode('utf-8'), digestmod=hashlib.sha256) if api_secret else None
+
+    def _default_headers(self) -> Dict[str, str]:
+        headers = dict(self.DEFAULT_HEADERS)
         if self.api_key:
-            self.session.headers.update({'X-MBX-APIKEY': self.api_key})
-        self.exchange_info = None
+            headers['X-MBX-APIKEY'] = self.api_key
+        return headers
 
     def _generate_signature(self, data: str) -> str:
-        return hmac.new(self.api_secret.encode('utf-8'), data.encode('utf-8'), hashlib.sha256).hexdigest()
+        mac = self._hmac_key.copy()
+        mac.update(data.encode('utf-8'))
+        return mac.hexdigest()
+
+    def _build_signed_query(self, params: Dict[str, Any]) -> str:
+        params['timestamp'] = self.server_clock.now_ms()
+        params['recvWindow'] = config.BINANCE_RECV_WINDOW_MS
+
+        query_string = urlencode(params)
+        return f"{query_string}&signature={self._generate_signature(query_string)}"
+
+    def _check_time_error(self, error_data: Any):
+        """Kode -1021 berarti timestamp di luar recvWindow; paksa sinkronisasi jam server berikutnya."""
+        if isinstance(error_data, dict) and error_data.get('code') == -1021:
+            self.server_clock.invalidate()
+
+    def _build_price_map(self, tickers: Optional[List[Dict[str, Any]]]) -> Dict[str, float]:
+        """Mengubah list ticker [{'symbol', 'price'}] menjadi dict symbol -> harga."""
+        return {t['symbol']: float(t['price']) for t in tickers or [] if 'price' in t}
+
+    def _build_klines_params(self, symbol: str, interval: str, start_time: Optional[int], end_time: Optional[int], limit: int) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return params
+
+    def _fetch_exchange_info_blocking(self) -> Optional[Dict[str, Any]]:
+        """Mengambil /exchangeInfo dengan request terpisah, dipakai oleh refresh cache di background."""
+        if not self.rate_limiter.acquire("GET", "/exchangeInfo"):
+            return None
+        try:
+            response = requests.get(f"{self.BASE_API_URL}/exchangeInfo", headers=self.DEFAULT_HEADERS, timeout=30)
+            self.rate_limiter.record_response(response.status_code, response.headers)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error("Gagal mengambil exchange info: %s", e)
+            return None
+
+    def _format_value(self, value, step_size_str: str):
+        step_size = float(step_size_str)
+        if step_size == 1.0:
+            return str(int(float(value)))
+        
+        precision = abs(int(round(math.log(step_size, 10), 0)))
+        factor = 10 ** precision
+        floored_value = math.floor(float(value) * factor) / factor
+        return f"{floored_value:.{precision}f}"
+
+    def _build_market_sell_params(self, symbol: str, symbol_info: Optional[Dict[str, Any]], quantity: float) -> Optional[Dict[str, Any]]:
+        if not symbol_info:
+            logger.error("Gagal menempatkan Market Sell: tidak ditemukan info untuk %s", symbol)
+            return None
+        
+        lot_size_filter = symbol_info['filters_by_type'].get('LOT_SIZE')
+        if not lot_size_filter:
+            logger.warning("Filter LOT_SIZE tidak ditemukan untuk %s", symbol)
+            return None
+
+        formatted_quantity = self._format_value(quantity, lot_size_filter['stepSize'])
+        return {"symbol": symbol, "side": "SELL", "type": "MARKET", "quantity": formatted_quantity}
+
+    def _build_oco_sell_params(self, symbol: str, symbol_info: Optional[Dict[str, Any]], quantity: float, take_profit_price: float, stop_loss_price: float) -> Optional[Dict[str, Any]]:
+        if not symbol_info:
+            logger.error("Gagal menempatkan OCO: tidak ditemukan info untuk %s", symbol)
+            return None
+            
+        filters = symbol_info['filters_by_type']
+        
+        formatted_quantity = self._format_value(float(quantity), filters['LOT_SIZE']['stepSize'])
+        formatted_tp_price = self._format_value(take_profit_price, filters['PRICE_FILTER']['tickSize'])
+        formatted_sl_price = self._format_value(stop_loss_price, filters['PRICE_FILTER']['tickSize'])
+        stop_limit_price_val = stop_loss_price * 0.995 
+        formatted_sl_limit_price = self._format_value(stop_limit_price_val, filters['PRICE_FILTER']['tickSize'])
+
+        return {"symbol": symbol, "side": "SELL", "quantity": formatted_quantity, "price": formatted_tp_price, "stopPrice": formatted_sl_price, "stopLimitPrice": formatted_sl_limit_price, "stopLimitTimeInForce": "GTC"}
+
+
+class BinanceClient(BaseBinanceClient):
+    """
+    Klien untuk berinteraksi dengan API Binance, mendukung endpoint publik dan privat.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+        super().__init__(api_key, api_secret)
+        self.session = requests.Session()
+        self.session.headers.update(self._default_headers())
 
     def _send_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Optional[Any]:
         if params is None:
@@ -36,19 +142,19 @@ class BinanceClient:
         
         if signed:
             if not self.api_key or not self.api_secret:
-                print("Error: API Key dan Secret Key diperlukan.")
+                logger.error("Error: API Key dan Secret Key diperlukan.")
+                return None
+            if self.server_clock.needs_sync():
+                self.sync_server_time()
+            if not self.rate_limiter.acquire(method, endpoint, params):
                 return None
             
-            params['timestamp'] = int(time.time() * 1000)
-            params['recvWindow'] = 5000 
-            
-            query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-            signature = self._generate_signature(query_string)
-            query_string += f"&signature={signature}"
+            query_string = self._build_signed_query(params)
             
             try:
                 # Perbaikan: Menggunakan method.upper() untuk konsistensi
                 req_method = method.upper()
+                started = time.perf_counter()
                 if req_method == 'GET':
                     response = self.session.get(f"{url}?{query_string}")
                 elif req_method == 'POST':
@@ -57,51 +163,90 @@ class BinanceClient:
                 elif req_method == 'DELETE':
                     response = self.session.delete(f"{url}?{query_string}")
                 else:
-                    print(f"Metode HTTP tidak didukung: {req_method}")
+                    logger.error("Metode HTTP tidak didukung: %s", req_method)
                     return None
 
+                self.latency.observe(f"{req_method} {endpoint}", time.perf_counter() - started)
+                self.rate_limiter.record_response(response.status_code, response.headers)
                 response.raise_for_status()
                 return response.json()
             except requests.exceptions.RequestException as e:
-                print(f"Error saat request ke {url}: {e}")
+                logger.error("Error saat request ke %s: %s", url, e)
                 if e.response is not None:
                     try:
                         error_data = e.response.json()
-                        print(f"Error Body dari Binance: {error_data}")
+                        logger.error("Error Body dari Binance: %s", error_data)
+                        self._check_time_error(error_data)
                     except json.JSONDecodeError:
-                        print(f"Error Body: {e.response.text}")
+                        logger.error("Error Body: %s", e.response.text)
                 return None
         
+        if not self.rate_limiter.acquire(method, endpoint, params):
+            return None
         try:
+            started = time.perf_counter()
             response = self.session.get(url, params=params)
+            self.latency.observe(f"GET {endpoint}", time.perf_counter() - started)
+            self.rate_limiter.record_response(response.status_code, response.headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return None
 
-    def _get_exchange_info(self):
-        if self.exchange_info is None:
-            print("Mengambil exchange info (aturan trading)...")
-            self.exchange_info = self._send_request("GET", "/exchangeInfo")
-        return self.exchange_info
+    # --- BARU: Endpoint user data stream (hanya butuh API key, tanpa signature) ---
+    def _send_api_key_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        if not self.api_key:
+            logger.error("Error: API Key diperlukan.")
+            return None
+        url = f"{self.BASE_API_URL}{endpoint}"
+        if not self.rate_limiter.acquire(method, endpoint, params):
+            return None
+        try:
+            response = self.session.request(method.upper(), url, params=params)
+            self.rate_limiter.record_response(response.status_code, response.headers)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error("Error saat request ke %s: %s", url, e)
+            return None
 
-    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
-        info = self._get_exchange_info()
-        if info:
-            for symbol_info in info['symbols']:
-                if symbol_info['symbol'] == symbol:
-                    return symbol_info
-        return None
+    # --- BARU: Sinkronisasi jam server & pemanasan koneksi ---
+    def sync_server_time(self) -> bool:
+        """Memperbarui offset jam lokal terhadap server Binance via GET /time."""
+        sent_at = time.time()
+        data = self._send_request("GET", "/time")
+        received_at = time.time()
+        if not data or 'serverTime' not in data:
+            return False
+        self.server_clock.update(data['serverTime'], sent_at, received_at)
+        return True
 
-    def _format_value(self, value, step_size_str: str):
-        step_size = float(step_size_str)
-        if step_size == 1.0:
-            return str(int(float(value)))
-        
-        precision = abs(int(round(math.log(step_size, 10), 0)))
-        factor = 10 ** precision
-        floored_value = math.floor(float(value) * factor) / factor
-        return f"{floored_value:.{precision}f}"
+    def warm_up(self):
+        """
+        Membuka koneksi keep-alive ke host API (dipakai juga oleh endpoint order) dan menyinkronkan jam,
+        sehingga order pertama tidak perlu membayar DNS + TCP + TLS handshake.
+        """
+        if self.sync_server_time():
+            logger.info("Koneksi Binance siap (offset jam: %s ms, RTT: %.0f ms).", self.server_clock.offset_ms, self.server_clock.round_trip_ms)
+
+    def create_listen_key(self) -> Optional[str]:
+        data = self._send_api_key_request("POST", "/userDataStream")
+        return data.get('listenKey') if data else None
+
+    def keepalive_listen_key(self, listen_key: str) -> Optional[Dict[str, Any]]:
+        return self._send_api_key_request("PUT", "/userDataStream", {"listenKey": listen_key})
+
+    def close_listen_key(self, listen_key: str) -> Optional[Dict[str, Any]]:
+        return self._send_api_key_request("DELETE", "/userDataStream", {"listenKey": listen_key})
+
+    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Mengambil aturan trading simbol dari cache bersama (lookup O(1), filter sudah diindeks di 'filters_by_type')."""
+        if not self.symbol_rules.ensure_loaded():
+            logger.info("Mengambil exchange info (aturan trading)...")
+            self.symbol_rules.update(self._send_request("GET", "/exchangeInfo"))
+        elif self.symbol_rules.is_stale():
+            self.symbol_rules.refresh_in_background(self._fetch_exchange_info_blocking)
+        return self.symbol_rules.get(symbol)
         
     def place_market_buy_order(self, symbol: str, quote_order_qty: float) -> Optional[Dict[str, Any]]:
         params = {"symbol": symbol, "side": "BUY", "type": "MARKET", "quoteOrderQty": quote_order_qty}
@@ -110,50 +255,62 @@ class BinanceClient:
     # --- BARU: Fungsi untuk menjual pada harga pasar ---
     def place_market_sell_order(self, symbol: str, quantity: float) -> Optional[Dict[str, Any]]:
         """Menempatkan order MARKET SELL untuk sejumlah kuantitas tertentu."""
-        symbol_info = self.get_symbol_info(symbol)
-        if not symbol_info:
-            print(f"Gagal menempatkan Market Sell: tidak ditemukan info untuk {symbol}")
-            return None
-        
-        lot_size_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE'), None)
-        if not lot_size_filter:
-            print(f"Filter LOT_SIZE tidak ditemukan untuk {symbol}")
+        params = self._build_market_sell_params(symbol, self.get_symbol_info(symbol), quantity)
+        if not params:
             return None
-
-        formatted_quantity = self._format_value(quantity, lot_size_filter['stepSize'])
-        params = {"symbol": symbol, "side": "SELL", "type": "MARKET", "quantity": formatted_quantity}
         return self._send_request("POST", "/order", params, signed=True)
 
     def place_oco_sell_order(self, symbol: str, quantity: float, take_profit_price: float, stop_loss_price: float) -> Optional[Dict[str, Any]]:
-        symbol_info = self.get_symbol_info(symbol)
-        if not symbol_info:
-            print(f"Gagal menempatkan OCO: tidak ditemukan info untuk {symbol}")
+        params = self._build_oco_sell_params(symbol, self.get_symbol_info(symbol), quantity, take_profit_price, stop_loss_price)
+        if not params:
             return None
-            
-        filters = {f['filterType']: f for f in symbol_info['filters']}
-        
-        formatted_quantity = self._format_value(float(quantity), filters['LOT_SIZE']['stepSize'])
-        formatted_tp_price = self._format_value(take_profit_price, filters['PRICE_FILTER']['tickSize'])
-        formatted_sl_price = self._format_value(stop_loss_price, filters['PRICE_FILTER']['tickSize'])
-        stop_limit_price_val = stop_loss_price * 0.995 
-        formatted_sl_limit_price = self._format_value(stop_limit_price_val, filters['PRICE_FILTER']['tickSize'])
-
-        params = {"symbol": symbol, "side": "SELL", "quantity": formatted_quantity, "price": formatted_tp_price, "stopPrice": formatted_sl_price, "stopLimitPrice": formatted_sl_limit_price, "stopLimitTimeInForce": "GTC"}
         return self._send_request("POST", "/order/oco", params, signed=True)
     
     def cancel_oco_order(self, symbol: str, order_list_id: int) -> Optional[Dict[str, Any]]:
-        print(f"Membatalkan OCO orderListId: {order_list_id} untuk {symbol}...")
+        logger.info("Membatalkan OCO orderListId: %s untuk %s...", order_list_id, symbol, extra={"symbol": symbol})
         params = {"symbol": symbol, "orderListId": order_list_id}
         return self._send_request("DELETE", "/orderList", params, signed=True)
 
     def get_current_price(self, symbol: str) -> Optional[float]:
+        """Membaca harga dari cache websocket lebih dulu; REST hanya dipakai jika data basi atau tidak ada."""
+        cached_price = self.price_cache.get_price(symbol)
+        if cached_price is not None:
+            return cached_price
         params = {"symbol": symbol}
         data = self._send_request("GET", "/ticker/price", params)
-        return float(data['price']) if data and 'price' in data else None
+        if not data or 'price' not in data:
+            return None
+        price = float(data['price'])
+        self.price_cache.update(symbol, price=price)
+        return price
         
     def get_all_tickers(self) -> Optional[List[Dict[str, Any]]]:
         return self._send_request("GET", "/ticker/price")
 
+    # --- BARU: Snapshot harga banyak simbol dalam satu request ---
+    def get_price_map(self, symbols: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Mengambil harga beberapa simbol sekaligus sebagai dict symbol -> harga.
+        Jika request multi-simbol ditolak (misal ada simbol tidak valid), jatuh ke snapshot semua ticker.
+        """
+        if symbols:
+            price_map = self.price_cache.get_prices(symbols)
+            missing = [s for s in symbols if s not in price_map]
+            if not missing:
+                return price_map
+            params = {"symbols": json.dumps(missing, separators=(',', ':'))}
+            tickers = self._send_request("GET", "/ticker/price", params)
+            if tickers:
+                price_map.update(self._build_price_map(tickers))
+                return price_map
+        return self._build_price_map(self.get_all_tickers())
+
+    # --- BARU: Candle historis (OHLCV) ---
+    def get_klines(self, symbol: str, interval: str, start_time: Optional[int] = None,
+                   end_time: Optional[int] = None, limit: int = 1000) -> Optional[List[List[Any]]]:
+        """Mengambil hingga `limit` candle [open_time, open, high, low, close, volume, ...] dari /klines."""
+        return self._send_request("GET", "/klines", self._build_klines_params(symbol, interval, start_time, end_time, limit))
+
     def get_account_info(self) -> Optional[Dict[str, Any]]:
         return self._send_request("GET", "/account", signed=True)
 
@@ -161,4 +318,20 @@ class BinanceClient:
         params = {}
         if symbol:
             params['symbol'] = symbol
-        return self._send_request("GET", "/openOrders", params, signed=True)
\ No newline at end of file
+        return self._send_request("GET", "/openOrders", params, signed=True)
+
+
+# --- BARU: Pemilihan klien live / simulasi ---
+def is_simulated() -> bool:
+    return config.BINANCE_MODE == "simulated"
+
+def can_trade() -> bool:
+    """Order hanya bisa dikirim jika API key tersedia, atau bot berjalan terhadap bursa simulasi."""
+    return is_simulated() or bool(config.BINANCE_API_KEY and config.BINANCE_API_SECRET)
+
+def create_client(api_key: Optional[str] = None, api_secret: Optional[str] = None) -> BinanceClient:
+    """BinanceClient untuk mode yang dipilih lewat BINANCE_MODE ("live" atau "simulated")."""
+    if is_simulated():
+        from .simulated import SimulatedBinanceClient
+        return SimulatedBinanceClient(api_key, api_secret, latency_seconds=config.SIMULATED_LATENCY_MS / 1000)
+    return BinanceClient(api_key, api_secret)
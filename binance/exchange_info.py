@@ -0,0 +1,108 @@
+# Auto Trade Bot/binance/exchange_info.py
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, Callable
+
+import config
+from core.serialization import atomic_write_bytes, dumps_json
+
+logger = logging.getLogger(__name__)
+
+class SymbolRulesCache:
+    """
+    Cache aturan trading (exchangeInfo) yang diindeks per simbol dan dipakai bersama oleh semua klien.
+    Filter setiap simbol sudah dipecah per `filterType`, disimpan ke disk dengan TTL,
+    dan diperbarui di background saat sudah kedaluwarsa.
+    """
+
+    def __init__(self, cache_path: str, ttl_seconds: float):
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self._rules: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._disk_checked = False
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index_symbols(symbols: list) -> Dict[str, Dict[str, Any]]:
+        rules = {}
+        for symbol_info in symbols:
+            entry = dict(symbol_info)
+            entry['filters_by_type'] = {f['filterType']: f for f in symbol_info.get('filters', [])}
+            rules[symbol_info['symbol']] = entry
+        return rules
+
+    def _load_from_disk(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            self._rules = self._index_symbols(cached['symbols'])
+            self._fetched_at = float(cached['fetched_at'])
+            logger.info("Aturan trading dimuat dari cache disk (%s simbol).", len(self._rules))
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            pass
+
+    def _save_to_disk(self, symbols: list):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            atomic_write_bytes(self.cache_path, dumps_json({"fetched_at": self._fetched_at, "symbols": symbols}))
+        except (OSError, TypeError) as e:
+            logger.error("Gagal menyimpan cache exchange info ke %s: %s", self.cache_path, e)
+
+    def ensure_loaded(self) -> bool:
+        """Memuat cache dari disk pada pemanggilan pertama. Mengembalikan True jika aturan tersedia."""
+        if not self._rules and not self._disk_checked:
+            with self._lock:
+                if not self._disk_checked:
+                    self._load_from_disk()
+                    self._disk_checked = True
+        return bool(self._rules)
+
+    def is_stale(self) -> bool:
+        return time.time() - self._fetched_at > self.ttl_seconds
+
+    def update(self, exchange_info: Optional[Dict[str, Any]]):
+        """Mengganti seluruh indeks dengan payload /exchangeInfo terbaru dan menyimpannya ke disk."""
+        if not exchange_info or 'symbols' not in exchange_info:
+            return
+        symbols = [{"symbol": s['symbol'], "status": s.get('status'), "baseAsset": s.get('baseAsset'),
+                    "quoteAsset": s.get('quoteAsset'), "filters": s.get('filters', [])}
+                   for s in exchange_info['symbols']]
+        rules = self._index_symbols(symbols)
+        with self._lock:
+            self._rules = rules
+            self._fetched_at = time.time()
+            self._disk_checked = True
+        self._save_to_disk(symbols)
+
+    def refresh_in_background(self, fetcher: Callable[[], Optional[Dict[str, Any]]]):
+        """Memperbarui cache di thread terpisah; data lama tetap dipakai selama proses berjalan."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _refresh():
+            try:
+                self.update(fetcher())
+            except Exception as e:
+                logger.error("Gagal memperbarui exchange info di background: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_refresh, name="exchange-info-refresh", daemon=True).start()
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self._rules.get(symbol)
+
+    def get_filters(self, symbol: str) -> Dict[str, Dict[str, Any]]:
+        entry = self._rules.get(symbol)
+        return entry['filters_by_type'] if entry else {}
+
+
+shared_symbol_rules = SymbolRulesCache(config.EXCHANGE_INFO_CACHE_FILE, config.EXCHANGE_INFO_TTL_SECONDS)
@@ -0,0 +1,223 @@
+# Auto Trade Bot/binance/klines_store.py
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
+
+# Satu file biner per kolom; open_time int64 (ms), harga & volume float64. Indeks baris sama di semua kolom.
+COLUMNS = (
+    ("open_time", np.dtype("<i8")),
+    ("open", np.dtype("<f8")),
+    ("high", np.dtype("<f8")),
+    ("low", np.dtype("<f8")),
+    ("close", np.dtype("<f8")),
+    ("volume", np.dtype("<f8")),
+)
+
+@dataclass(slots=True)
+class Candles:
+    """Array OHLCV satu simbol, terurut berdasarkan `open_time` (ms). Bisa berupa view memmap dari KlineStore."""
+    open_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    def slice(self, start_ms: int, end_ms: int) -> "Candles":
+        """Candle dengan open_time di [start_ms, end_ms), dicari dengan binary search (tanpa menyalin data)."""
+        start = int(np.searchsorted(self.open_time, start_ms, side="left"))
+        end = int(np.searchsorted(self.open_time, end_ms, side="left"))
+        return Candles(*(None if column is None else column[start:end] for column in self._columns()))
+
+    def _columns(self) -> Tuple[Optional[np.ndarray], ...]:
+        return self.open_time, self.open, self.high, self.low, self.close, self.volume
+
+    @classmethod
+    def empty(cls) -> "Candles":
+        return cls(*(np.empty(0, dtype=dtype) for _, dtype in COLUMNS))
+
+    @classmethod
+    def from_klines(cls, klines: List[List[Any]]) -> "Candles":
+        """Membuat Candles dari respons /klines Binance ([open_time, open, high, low, close, volume, ...])."""
+        if not klines:
+            return cls.empty()
+        rows = np.array([k[:6] for k in klines], dtype=np.float64)
+        return cls(rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2], rows[:, 3], rows[:, 4], rows[:, 5])
+
+class KlineStore:
+    """
+    Penyimpanan candle lokal per simbol & interval dalam format kolom: `<dir>/<SYMBOL>/<interval>/<kolom>.bin`.
+    File hanya ditambah di ujungnya (append-only) dan dibaca lewat np.memmap, sehingga potongan rentang waktu
+    bisa diambil tanpa memuat seluruh file ke RAM. Bisa dipakai sepenuhnya offline dari direktori yang sudah terisi.
+    """
+
+    def __init__(self, directory: str = "data/klines"):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._maps: Dict[Tuple[str, str], Tuple[int, Candles]] = {}  # (symbol, interval) -> (panjang, view memmap)
+
+    def _series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.directory, symbol.upper(), interval)
+
+    @staticmethod
+    def _column_path(series_dir: str, column: str) -> str:
+        return os.path.join(series_dir, f"{column}.bin")
+
+    def _committed_length(self, series_dir: str) -> int:
+        """Jumlah baris utuh: kolom terpendek menentukan, sehingga penulisan yang terputus di tengah diabaikan."""
+        lengths = []
+        for column, dtype in COLUMNS:
+            try:
+                lengths.append(os.path.getsize(self._column_path(series_dir, column)) // dtype.itemsize)
+            except FileNotFoundError:
+                return 0
+        return min(lengths)
+
+    def load(self, symbol: str, interval: str) -> Candles:
+        """Seluruh riwayat candle sebagai view memmap (read-only). Dibuka ulang hanya jika file bertambah."""
+        key = (symbol.upper(), interval)
+        series_dir = self._series_dir(symbol, interval)
+        length = self._committed_length(series_dir)
+        cached = self._maps.get(key)
+        if cached and cached[0] == length:
+            return cached[1]
+        if length == 0:
+            candles = Candles.empty()
+        else:
+            candles = Candles(*(np.memmap(self._column_path(series_dir, column), dtype=dtype, mode="r", shape=(length,))
+                                for column, dtype in COLUMNS))
+        self._maps[key] = (length, candles)
+        return candles
+
+    def slice(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> Candles:
+        """Candle dengan open_time di [start_ms, end_ms)."""
+        return self.load(symbol, interval).slice(start_ms, end_ms)
+
+    def time_range(self, symbol: str, interval: str) -> Optional[Tuple[int, int]]:
+        """(open_time pertama, open_time terakhir) yang tersimpan, atau None jika belum ada data."""
+        candles = self.load(symbol, interval)
+        if not len(candles):
+            return None
+        return int(candles.open_time[0]), int(candles.open_time[-1])
+
+    def append(self, symbol: str, interval: str, klines: List[List[Any]]) -> int:
+        """Menambahkan candle yang lebih baru dari candle terakhir tersimpan. Mengembalikan jumlah baris baru."""
+        candles = Candles.from_klines(klines)
+        with self._lock:
+            series_dir = self._series_dir(symbol, interval)
+            os.makedirs(series_dir, exist_ok=True)
+            length = self._committed_length(series_dir)
+            current = self.load(symbol, interval)
+            if length:
+                candles = candles.slice(int(current.open_time[-1]) + 1, np.iinfo(np.int64).max)
+            if not len(candles):
+                return 0
+            for (column, dtype), values in zip(COLUMNS, candles._columns()):
+                with open(self._column_path(series_dir, column), "ab") as f:
+                    # Buang sisa penulisan yang terputus sebelum menambah, agar semua kolom tetap sejajar.
+                    f.truncate(length * dtype.itemsize)
+                    f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            return len(candles)
+
+    def prepend(self, symbol: str, interval: str, klines: List[List[Any]]) -> int:
+        """
+        Menambahkan candle yang lebih lama dari candle pertama tersimpan (backfill). File kolom ditulis ulang
+        di direktori sementara lalu ditukar sekaligus; hanya terjadi saat rentang historis diperluas ke belakang.
+        """
+        candles = Candles.from_klines(klines)
+        with self._lock:
+            current = self.load(symbol, interval)
+            if len(current):
+                candles = candles.slice(np.iinfo(np.int64).min, int(current.open_time[0]))
+            if not len(candles):
+                return 0
+            series_dir = self._series_dir(symbol, interval)
+            tmp_dir, old_dir = f"{series_dir}.tmp", f"{series_dir}.old"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            for (column, dtype), new_values, old_values in zip(COLUMNS, candles._columns(), current._columns()):
+                with open(self._column_path(tmp_dir, column), "wb") as f:
+                    f.write(np.ascontiguousarray(new_values, dtype=dtype).tobytes())
+                    f.write(np.ascontiguousarray(old_values, dtype=dtype).tobytes())
+            self._maps.pop((symbol.upper(), interval), None)
+            if os.path.isdir(series_dir):
+                os.replace(series_dir, old_dir)
+            os.replace(tmp_dir, series_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+            return len(candles)
+
+    def candle_source(self, interval: str, downloader: Optional["KlineDownloader"] = None) -> Callable[[str, int, int], Candles]:
+        """Sumber candle untuk backtest. Dengan `downloader`, rentang yang belum tersimpan diunduh lebih dulu."""
+        def source(symbol: str, start_ms: int, end_ms: int) -> Candles:
+            if downloader is not None:
+                downloader.update(symbol, interval, start_ms, end_ms)
+            return self.slice(symbol, interval, start_ms, end_ms)
+        return source
+
+class KlineDownloader:
+    """Mengisi KlineStore dari endpoint /klines. Hanya candle yang sudah ditutup yang disimpan."""
+    PAGE_LIMIT = 1000
+
+    def __init__(self, client, store: KlineStore):
+        self.client = client
+        self.store = store
+
+    def _pages(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> Iterator[List[List[Any]]]:
+        """Mengunduh [start_ms, end_ms) per halaman 1000 candle, dibatasi pada candle yang sudah ditutup."""
+        interval_ms = INTERVAL_MS[interval]
+        end_ms = min(end_ms, self.client.server_clock.now_ms() - interval_ms + 1)
+        cursor = start_ms
+        while cursor < end_ms:
+            page = self.client.get_klines(symbol, interval, start_time=cursor, end_time=end_ms - 1, limit=self.PAGE_LIMIT)
+            if page is None:
+                logger.error("Gagal mengunduh kline %s %s mulai %d.", symbol, interval, cursor)
+                return
+            if not page:
+                return
+            yield page
+            if len(page) < self.PAGE_LIMIT:
+                return
+            cursor = int(page[-1][0]) + interval_ms
+
+    def update(self, symbol: str, interval: str, start_ms: int, end_ms: Optional[int] = None) -> int:
+        """Memastikan rentang [start_ms, end_ms) tersedia di store. Mengembalikan jumlah candle baru."""
+        interval_ms = INTERVAL_MS[interval]
+        now_ms = self.client.server_clock.now_ms()
+        end_ms = min(end_ms or now_ms, now_ms)
+        written = 0
+        stored = self.store.time_range(symbol, interval)
+        if stored is None:
+            next_open = start_ms
+        else:
+            first, last = stored
+            if start_ms < first:
+                backfill = [row for page in self._pages(symbol, interval, start_ms, first) for row in page]
+                written += self.store.prepend(symbol, interval, backfill)
+            next_open = last + interval_ms
+        if next_open < end_ms and next_open + interval_ms <= now_ms:
+            # Setiap halaman langsung ditulis, sehingga unduhan panjang yang terputus tetap tersimpan sebagian.
+            for page in self._pages(symbol, interval, next_open, end_ms):
+                written += self.store.append(symbol, interval, page)
+        if written:
+            logger.debug("Menyimpan %d candle baru untuk %s %s.", written, symbol, interval)
+        return written
+
+shared_kline_store = KlineStore(config.KLINES_DIRECTORY)
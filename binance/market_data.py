@@ -0,0 +1,175 @@
+# Auto Trade Bot/binance/market_data.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, Iterable, Callable, Set
+
+import websockets
+
+import config
+
+logger = logging.getLogger(__name__)
+
+class PriceCache:
+    """
+    Tabel harga terakhir dan best bid/ask per simbol di memori.
+    Diisi oleh MarketDataStream dan dibaca lebih dulu oleh klien sebelum jatuh ke REST.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        # symbol -> (last_price, bid, ask, updated_at). Tuple diganti utuh sehingga aman dibaca dari thread lain.
+        self._quotes: Dict[str, tuple] = {}
+
+    def update(self, symbol: str, price: Optional[float] = None, bid: Optional[float] = None, ask: Optional[float] = None, updated_at: Optional[float] = None):
+        old_price, old_bid, old_ask, _ = self._quotes.get(symbol, (None, None, None, 0.0))
+        self._quotes[symbol] = (
+            price if price is not None else old_price,
+            bid if bid is not None else old_bid,
+            ask if ask is not None else old_ask,
+            updated_at if updated_at is not None else time.time(),
+        )
+
+    def get_quote(self, symbol: str, max_age_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Mengembalikan quote yang masih segar, atau None jika tidak ada / sudah basi."""
+        quote = self._quotes.get(symbol)
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        if not quote or time.time() - quote[3] > max_age:
+            return None
+        return {"price": quote[0], "bid": quote[1], "ask": quote[2], "updated_at": quote[3]}
+
+    def get_price(self, symbol: str, max_age_seconds: Optional[float] = None) -> Optional[float]:
+        """Harga terakhir jika segar; jika hanya ada data book ticker, memakai harga tengah bid/ask."""
+        quote = self.get_quote(symbol, max_age_seconds)
+        if not quote:
+            return None
+        if quote['price'] is not None:
+            return quote['price']
+        if quote['bid'] is not None and quote['ask'] is not None:
+            return (quote['bid'] + quote['ask']) / 2
+        return None
+
+    def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Mengambil semua harga segar untuk simbol yang diminta; simbol basi tidak disertakan."""
+        prices = {}
+        for symbol in symbols:
+            price = self.get_price(symbol)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+
+class MarketDataStream:
+    """
+    Berlangganan stream bookTicker dan miniTicker Binance untuk simbol yang sedang dipantau
+    (posisi OCO terbuka dan sinyal tertunda), lalu memperbarui PriceCache.
+    URL dan fungsi koneksi bisa diganti agar dapat dijalankan terhadap server websocket lokal.
+    """
+    STREAM_SUFFIXES = ("bookTicker", "miniTicker")
+
+    def __init__(self, price_cache: PriceCache, url: str, connect: Optional[Callable] = None, reconnect_delay_seconds: float = 5.0):
+        self.price_cache = price_cache
+        self.url = url
+        self._connect = connect or websockets.connect
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self._watch_groups: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._request_id = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(self, group: str, symbols: Iterable[str]):
+        """Mengganti daftar simbol untuk satu grup (misal 'positions' atau 'signals')."""
+        with self._lock:
+            self._watch_groups[group] = {s.upper() for s in symbols if s}
+
+    def _desired_streams(self) -> Set[str]:
+        with self._lock:
+            symbols = set().union(*self._watch_groups.values()) if self._watch_groups else set()
+        return {f"{symbol.lower()}@{suffix}" for symbol in symbols for suffix in self.STREAM_SUFFIXES}
+
+    def handle_message(self, raw: Any):
+        """Memproses satu pesan websocket (string JSON atau dict) dan memperbarui cache harga."""
+        data = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        if 'data' in data and 'stream' in data:
+            data = data['data']
+
+        symbol = data.get('s')
+        if not symbol:
+            return
+        if data.get('e') == '24hrMiniTicker':
+            self.price_cache.update(symbol, price=float(data['c']))
+        elif 'b' in data and 'a' in data:
+            self.price_cache.update(symbol, bid=float(data['b']), ask=float(data['a']))
+
+    async def _send_subscription(self, ws, method: str, streams: Set[str]):
+        self._request_id += 1
+        await ws.send(json.dumps({"method": method, "params": sorted(streams), "id": self._request_id}))
+
+    async def _consume(self, ws):
+        subscribed: Set[str] = set()
+        while not self._stop_event.is_set():
+            desired = self._desired_streams()
+            if desired - subscribed:
+                await self._send_subscription(ws, "SUBSCRIBE", desired - subscribed)
+            if subscribed - desired:
+                await self._send_subscription(ws, "UNSUBSCRIBE", subscribed - desired)
+            subscribed = desired
+
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            try:
+                self.handle_message(raw)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("Pesan market data tidak valid diabaikan: %s", e)
+
+    async def run(self):
+        """Menjaga koneksi websocket tetap hidup dan tersambung ulang otomatis jika terputus."""
+        while not self._stop_event.is_set():
+            try:
+                async with self._connect(self.url) as ws:
+                    logger.info("Market data stream terhubung ke %s.", self.url)
+                    await self._consume(ws)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning("Market data stream terputus: %s. Menyambung ulang dalam %s detik...", e, self.reconnect_delay_seconds)
+                await asyncio.sleep(self.reconnect_delay_seconds)
+
+    def start_in_thread(self):
+        """Menjalankan stream di thread daemon dengan event loop sendiri."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="market-data-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def replay_ticks(path: str, stream: MarketDataStream) -> int:
+    """
+    Memutar ulang rekaman pesan websocket (satu JSON per baris) ke dalam stream tanpa jaringan.
+    Mengembalikan jumlah pesan yang diproses.
+    """
+    count = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                stream.handle_message(line)
+                count += 1
+    return count
+
+
+shared_price_cache = PriceCache(config.PRICE_CACHE_MAX_AGE_SECONDS)
+shared_market_stream = MarketDataStream(shared_price_cache, config.BINANCE_WS_URL)
@@ -1,9 +1,11 @@
 # Auto Trade Bot/binance/models.py
 import json
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 
-@dataclass
+from core.serialization import dumps_json
+
+@dataclass(slots=True)
 class TargetInfo:
     """Mewakili informasi target harga."""
     level: int
@@ -11,8 +13,11 @@ class TargetInfo:
     percentage_change: Optional[float] = None
     status: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"level": self.level, "price": self.price, "percentage_change": self.percentage_change, "status": self.status}
+
 
-@dataclass
+@dataclass(slots=True)
 class StopLossInfo:
     """Mewakili informasi stop-loss."""
     level: int
@@ -20,8 +25,11 @@ class StopLossInfo:
     percentage_change: Optional[float] = None
     status: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"level": self.level, "price": self.price, "percentage_change": self.percentage_change, "status": self.status}
+
 
-@dataclass
+@dataclass(slots=True)
 class TradeDecision:
     """Mewakili keputusan trading berdasarkan sinyal."""
     decision: str  # "BUY", "SKIP", atau "FAIL"
@@ -33,9 +41,21 @@ class TradeDecision:
     stop_losses: List[StopLossInfo] = field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Mengonversi dataclass menjadi dictionary."""
-        return asdict(self)
+        """Mengonversi dataclass menjadi dictionary tanpa deep copy (berbeda dengan dataclasses.asdict)."""
+        return {
+            "decision": self.decision,
+            "coin_pair": self.coin_pair,
+            "reason": self.reason,
+            "current_price": self.current_price,
+            "entry_price": self.entry_price,
+            "targets": [t.to_dict() for t in self.targets],
+            "stop_losses": [sl.to_dict() for sl in self.stop_losses],
+        }
 
     def to_json(self) -> str:
         """Mengonversi dataclass menjadi string JSON."""
-        return json.dumps(self.to_dict(), indent=4)
\ No newline at end of file
+        return json.dumps(self.to_dict(), indent=4)
+
+    def to_json_bytes(self) -> bytes:
+        """Mengonversi dataclass menjadi JSON ringkas (bytes) memakai encoder tercepat yang tersedia."""
+        return dumps_json(self.to_dict())
@@ -0,0 +1,168 @@
+# Auto Trade Bot/binance/rate_limiter.py
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+class RequestWeightLimiter:
+    """
+    Pembatas request bersama untuk klien sinkron dan asinkron berdasarkan aturan rate limit Binance.
+
+    - Setiap request "dibayar" lebih dulu memakai tabel bobot per endpoint, lalu angka dari header
+      `X-MBX-USED-WEIGHT-1M` / `X-MBX-ORDER-COUNT-10S` menyelaraskan hitungan lokal dengan server.
+    - Sebagian bobot per menit dicadangkan untuk order (buy, OCO, cancel); query harga/status harus
+      menunggu menit berikutnya lebih dulu, dan tidak boleh menyalip order yang sedang antre.
+    - Respons 429/418 menghentikan semua request sampai `Retry-After` berlalu, agar IP tidak di-ban lebih lama.
+    """
+    # Bobot request (REQUEST_WEIGHT) menurut dokumentasi Binance Spot API.
+    ENDPOINT_WEIGHTS = {
+        ("GET", "/exchangeInfo"): 20,
+        ("GET", "/account"): 20,
+        ("GET", "/time"): 1,
+        ("GET", "/klines"): 2,
+        ("POST", "/order"): 1,
+        ("POST", "/order/oco"): 1,
+        ("DELETE", "/orderList"): 1,
+        ("POST", "/userDataStream"): 2,
+        ("PUT", "/userDataStream"): 2,
+        ("DELETE", "/userDataStream"): 2,
+    }
+    ORDER_ENDPOINTS = {("POST", "/order"), ("POST", "/order/oco"), ("DELETE", "/orderList")}
+    DEFAULT_WEIGHT = 2
+
+    def __init__(self, weight_limit_per_minute: int = 6000, order_reserved_weight: int = 600,
+                 order_limit_per_10s: int = 50, max_wait_seconds: float = 60.0):
+        self.weight_limit = weight_limit_per_minute
+        self.order_reserved_weight = order_reserved_weight
+        self.order_limit_per_10s = order_limit_per_10s
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._weight_window = 0
+        self._used_weight = 0
+        self._order_window = 0
+        self._order_count = 0
+        self._blocked_until = 0.0
+        self._waiting_orders = 0
+
+    # --- Klasifikasi request ---
+    def weight_for(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+        method = method.upper()
+        params = params or {}
+        if endpoint == "/ticker/price":
+            return 2 if "symbol" in params else 4
+        if endpoint == "/openOrders":
+            return 6 if "symbol" in params else 80
+        return self.ENDPOINT_WEIGHTS.get((method, endpoint), self.DEFAULT_WEIGHT)
+
+    def is_order(self, method: str, endpoint: str) -> bool:
+        return (method.upper(), endpoint) in self.ORDER_ENDPOINTS
+
+    # --- Reservasi ---
+    def _roll_windows(self, now: float):
+        weight_window = int(now // 60)
+        if weight_window != self._weight_window:
+            self._weight_window, self._used_weight = weight_window, 0
+        order_window = int(now // 10)
+        if order_window != self._order_window:
+            self._order_window, self._order_count = order_window, 0
+
+    def _try_reserve(self, weight: int, is_order: bool, now: float) -> float:
+        """Membayar bobot request bila kuota cukup (mengembalikan 0), atau mengembalikan lama waktu tunggu."""
+        with self._lock:
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._roll_windows(now)
+            next_minute = (self._weight_window + 1) * 60 - now
+            if is_order:
+                if self._order_count >= self.order_limit_per_10s:
+                    return (self._order_window + 1) * 10 - now
+                if self._used_weight + weight > self.weight_limit:
+                    return next_minute
+                self._order_count += 1
+            elif self._waiting_orders:
+                return 0.05  # Beri jalan order yang sedang antre lebih dulu.
+            elif self._used_weight + weight > self.weight_limit - self.order_reserved_weight:
+                return next_minute
+            self._used_weight += weight
+            return 0.0
+
+    def _on_wait_state(self, is_order: bool, waiting: bool):
+        if is_order:
+            with self._lock:
+                self._waiting_orders += 1 if waiting else -1
+
+    def acquire(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> bool:
+        """Versi sinkron: menunggu (blocking) sampai kuota tersedia. False jika waktu tunggu melebihi batas."""
+        weight, is_order = self.weight_for(method, endpoint, params), self.is_order(method, endpoint)
+        deadline = time.time() + self.max_wait_seconds
+        self._on_wait_state(is_order, True)
+        try:
+            while True:
+                now = time.time()
+                wait = self._try_reserve(weight, is_order, now)
+                if wait <= 0:
+                    return True
+                if now + wait > deadline:
+                    logger.warning("Rate limit: request %s %s dibatalkan, kuota baru tersedia dalam %.1f detik.", method.upper(), endpoint, wait)
+                    return False
+                time.sleep(wait)
+        finally:
+            self._on_wait_state(is_order, False)
+
+    async def acquire_async(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> bool:
+        """Versi asinkron dari `acquire`; menunggu dengan asyncio.sleep agar event loop tidak terblokir."""
+        weight, is_order = self.weight_for(method, endpoint, params), self.is_order(method, endpoint)
+        deadline = time.time() + self.max_wait_seconds
+        self._on_wait_state(is_order, True)
+        try:
+            while True:
+                now = time.time()
+                wait = self._try_reserve(weight, is_order, now)
+                if wait <= 0:
+                    return True
+                if now + wait > deadline:
+                    logger.warning("Rate limit: request %s %s dibatalkan, kuota baru tersedia dalam %.1f detik.", method.upper(), endpoint, wait)
+                    return False
+                await asyncio.sleep(wait)
+        finally:
+            self._on_wait_state(is_order, False)
+
+    # --- Sinkronisasi dari respons ---
+    def record_response(self, status: int, headers: Mapping[str, str]):
+        """Menyelaraskan hitungan lokal dengan header Binance dan menerapkan backoff untuk 429/418."""
+        now = time.time()
+        with self._lock:
+            self._roll_windows(now)
+            used_weight = headers.get("X-MBX-USED-WEIGHT-1M")
+            if used_weight is not None:
+                self._used_weight = max(self._used_weight, int(used_weight))
+            order_count = headers.get("X-MBX-ORDER-COUNT-10S")
+            if order_count is not None:
+                self._order_count = max(self._order_count, int(order_count))
+
+            if status in (418, 429):
+                try:
+                    retry_after = float(headers.get("Retry-After", 60))
+                except ValueError:
+                    retry_after = 60.0
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                label = "IP di-ban sementara" if status == 418 else "Rate limit terlampaui"
+                logger.warning("%s (HTTP %s). Semua request ke Binance ditunda selama %g detik.", label, status, retry_after)
+
+    @property
+    def used_weight(self) -> int:
+        with self._lock:
+            self._roll_windows(time.time())
+            return self._used_weight
+
+shared_rate_limiter = RequestWeightLimiter(
+    weight_limit_per_minute=config.BINANCE_WEIGHT_LIMIT_PER_MINUTE,
+    order_reserved_weight=config.BINANCE_ORDER_RESERVED_WEIGHT,
+    order_limit_per_10s=config.BINANCE_ORDER_LIMIT_PER_10S,
+    max_wait_seconds=config.BINANCE_RATE_LIMIT_MAX_WAIT_SECONDS,
+)
@@ -0,0 +1,430 @@
+# Auto Trade Bot/binance/simulated.py
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import config
+from .async_client import AsyncBinanceClient
+from .client import BinanceClient
+from .exchange_info import SymbolRulesCache
+from .klines_store import INTERVAL_MS, Candles, KlineStore
+from .market_data import PriceCache
+from .user_stream import AccountState
+
+logger = logging.getLogger(__name__)
+
+class SimulatedOrderError(Exception):
+    """Penolakan order dengan kode & pesan seperti error body Binance."""
+
+    def __init__(self, code: int, msg: str):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+
+class _MemoryRulesCache(SymbolRulesCache):
+    """Aturan trading bursa simulasi: hanya di memori, tidak membaca/menulis cache exchange info milik bot."""
+
+    def _load_from_disk(self):
+        pass
+
+    def _save_to_disk(self, symbols: list):
+        pass
+
+def _fmt(value: float) -> str:
+    return f"{value:.8f}"
+
+class SimulatedExchange:
+    """
+    Bursa spot tiruan di dalam proses, menjawab endpoint REST yang dipakai bot (order MARKET, OCO,
+    pembatalan OCO, open orders, akun, ticker, exchangeInfo) dengan format respons Binance.
+
+    Harga digerakkan dari luar lewat `set_price` / `replay` / `replay_candles`; setiap perubahan harga
+    mencocokkan order yang menunggu (LIMIT_MAKER & STOP_LOSS_LIMIT) pada simbol tersebut. Jika AccountState
+    dipasang, bursa mengirim event executionReport / listStatus / outboundAccountPosition seperti user data stream.
+    """
+    QUOTE_ASSET = "USDT"
+
+    def __init__(self, balances: Optional[Dict[str, float]] = None, fee_rate: float = 0.001,
+                 kline_store: Optional[KlineStore] = None, kline_interval: str = "1m"):
+        self.fee_rate = fee_rate
+        self.kline_store = kline_store
+        self.kline_interval = kline_interval
+        self.symbol_rules = _MemoryRulesCache("", float("inf"))
+        self.price_cache = PriceCache(max_age_seconds=float("inf"))
+        self.account_state: Optional[AccountState] = None
+        self._lock = threading.RLock()
+        self._symbols: Dict[str, Dict[str, Any]] = {}
+        self._prices: Dict[str, float] = {}
+        self._balances: Dict[str, List[float]] = {asset: [float(free), 0.0] for asset, free in (balances or {}).items()}
+        self._orders: Dict[int, Dict[str, Any]] = {}
+        self._open_by_symbol: Dict[str, Set[int]] = {}
+        self._triggered: Set[int] = set()  # STOP_LOSS_LIMIT yang stop-nya sudah tersentuh dan kini menunggu sebagai limit.
+        self._order_lists: Dict[int, Dict[str, Any]] = {}
+        self._next_order_id = 1
+        self._next_order_list_id = 1
+        self._replay_thread: Optional[threading.Thread] = None
+        self._replay_stop = threading.Event()
+        self.stats = {"orders": 0, "fills": 0, "cancels": 0, "rejects": 0}
+
+    # --- Pasar ---
+    def add_symbol(self, symbol: str, price: Optional[float] = None, tick_size: str = "0.00000001",
+                   step_size: str = "0.00000001", min_notional: str = "5.00000000"):
+        """Mendaftarkan simbol beserta filter PRICE_FILTER, LOT_SIZE, dan MIN_NOTIONAL-nya."""
+        base_asset = symbol[:-len(self.QUOTE_ASSET)] if symbol.endswith(self.QUOTE_ASSET) else symbol
+        with self._lock:
+            self._symbols[symbol] = {
+                "symbol": symbol, "status": "TRADING", "baseAsset": base_asset, "quoteAsset": self.QUOTE_ASSET,
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": tick_size, "maxPrice": "1000000.00000000", "tickSize": tick_size},
+                    {"filterType": "LOT_SIZE", "minQty": step_size, "maxQty": "90000000.00000000", "stepSize": step_size},
+                    {"filterType": "MIN_NOTIONAL", "minNotional": min_notional},
+                ],
+            }
+            self.symbol_rules.update(self._exchange_info())
+        if price is not None:
+            self.set_price(symbol, price)
+
+    def _ensure_symbol(self, symbol: str) -> bool:
+        """Simbol yang belum terdaftar diambil otomatis dari KlineStore (harga = close terakhir) bila tersedia."""
+        if symbol in self._symbols:
+            return True
+        if self.kline_store is None:
+            return False
+        candles = self.kline_store.load(symbol, self.kline_interval)
+        if not len(candles):
+            return False
+        self.add_symbol(symbol, float(candles.close[-1]))
+        return True
+
+    def _exchange_info(self) -> Dict[str, Any]:
+        return {"timezone": "UTC", "serverTime": self.now_ms(), "symbols": list(self._symbols.values())}
+
+    def now_ms(self) -> int:
+        return int(time.time() * 1000)
+
+    def set_price(self, symbol: str, price: float):
+        """Memperbarui harga terakhir lalu mencocokkan order yang menunggu pada simbol ini."""
+        with self._lock:
+            self._prices[symbol] = price
+            self.price_cache.update(symbol, price=price)
+            for order_id in sorted(self._open_by_symbol.get(symbol, ())):
+                order = self._orders.get(order_id)
+                if order is None or order['status'] != 'NEW':
+                    continue
+                if order['type'] == 'LIMIT_MAKER' and price >= float(order['price']):
+                    self._fill_oco_leg(order, float(order['price']))
+                elif order['type'] == 'STOP_LOSS_LIMIT':
+                    if order_id not in self._triggered and price <= float(order['stopPrice']):
+                        self._triggered.add(order_id)
+                    # Setelah terpicu, order menjadi limit sell: terisi di harga pasar selama tidak di bawah limit.
+                    if order_id in self._triggered and price >= float(order['price']):
+                        self._fill_oco_leg(order, price)
+
+    def replay(self, symbol: str, prices: Iterable[float]):
+        for price in prices:
+            self.set_price(symbol, float(price))
+
+    def replay_candles(self, symbol: str, candles: Candles):
+        """Memutar candle sebagai jalur harga open -> low/high -> high/low -> close (arah sesuai warna candle)."""
+        for o, h, l, c in zip(candles.open.tolist(), candles.high.tolist(), candles.low.tolist(), candles.close.tolist()):
+            self.replay(symbol, (o, l, h, c) if c >= o else (o, h, l, c))
+
+    def start_replay(self, start_ms: int, step_seconds: float = 1.0, end_ms: Optional[int] = None):
+        """
+        Memutar ulang candle dari KlineStore di thread latar: setiap `step_seconds`, waktu simulasi maju satu
+        interval dan semua simbol terdaftar menerima candle berikutnya. Simbol yang ditambahkan belakangan ikut diputar.
+        """
+        if self.kline_store is None or (self._replay_thread and self._replay_thread.is_alive()):
+            return
+        interval_ms = INTERVAL_MS[self.kline_interval]
+
+        def loop():
+            cursor = start_ms
+            while not self._replay_stop.is_set() and (end_ms is None or cursor < end_ms):
+                for symbol in list(self._symbols):
+                    self.replay_candles(symbol, self.kline_store.slice(symbol, self.kline_interval, cursor, cursor + interval_ms))
+                cursor += interval_ms
+                self._replay_stop.wait(step_seconds)
+            logger.info("Replay harga simulasi selesai.")
+
+        self._replay_stop.clear()
+        self._replay_thread = threading.Thread(target=loop, name="simulated-replay", daemon=True)
+        self._replay_thread.start()
+
+    def stop_replay(self):
+        self._replay_stop.set()
+
+    # --- Akun ---
+    def attach_account_state(self, account_state: AccountState):
+        """Mengisi AccountState dari bursa ini dan menandainya live, seolah user data stream tersambung."""
+        with self._lock:
+            self.account_state = account_state
+            account_state.seed(self._account(), self._open_orders(None))
+        account_state.set_live(True)
+
+    def deposit(self, asset: str, amount: float):
+        """Menambah saldo free suatu aset (misal modal awal uji beban)."""
+        with self._lock:
+            self._balance(asset)[0] += amount
+            self._emit_balances(asset)
+
+    def _balance(self, asset: str) -> List[float]:
+        return self._balances.setdefault(asset, [0.0, 0.0])
+
+    def _account(self) -> Dict[str, Any]:
+        return {"canTrade": True, "balances": [{"asset": asset, "free": _fmt(free), "locked": _fmt(locked)}
+                                               for asset, (free, locked) in self._balances.items()]}
+
+    def _emit(self, event: Dict[str, Any]):
+        if self.account_state is not None:
+            self.account_state.apply_event(event)
+
+    def _emit_balances(self, *assets: str):
+        self._emit({"e": "outboundAccountPosition", "E": self.now_ms(),
+                    "B": [{"a": a, "f": _fmt(self._balance(a)[0]), "l": _fmt(self._balance(a)[1])} for a in assets]})
+
+    def _emit_order(self, order: Dict[str, Any]):
+        self._emit({"e": "executionReport", "E": self.now_ms(), "s": order['symbol'], "i": order['orderId'],
+                    "g": order['orderListId'], "c": order['clientOrderId'], "p": order['price'], "q": order['origQty'],
+                    "z": order['executedQty'], "Z": order['cummulativeQuoteQty'], "X": order['status'],
+                    "o": order['type'], "S": order['side'], "P": order['stopPrice'], "O": order['time']})
+
+    # --- Order ---
+    def _new_order(self, symbol: str, side: str, order_type: str, quantity: float, price: float = 0.0,
+                   stop_price: float = 0.0, order_list_id: int = -1) -> Dict[str, Any]:
+        order_id = self._next_order_id
+        self._next_order_id += 1
+        self.stats["orders"] += 1
+        now = self.now_ms()
+        order = {
+            "symbol": symbol, "orderId": order_id, "orderListId": order_list_id, "clientOrderId": f"sim-{order_id}",
+            "price": _fmt(price), "origQty": _fmt(quantity), "executedQty": _fmt(0), "cummulativeQuoteQty": _fmt(0),
+            "status": "NEW", "timeInForce": "GTC", "type": order_type, "side": side, "stopPrice": _fmt(stop_price),
+            "time": now, "updateTime": now, "isWorking": order_type != "STOP_LOSS_LIMIT",
+        }
+        self._orders[order_id] = order
+        return order
+
+    def _step(self, symbol: str) -> float:
+        return float(self.symbol_rules.get_filters(symbol)['LOT_SIZE']['stepSize'])
+
+    def _check_symbol(self, symbol: str) -> float:
+        if not self._ensure_symbol(symbol):
+            raise SimulatedOrderError(-1121, "Invalid symbol.")
+        price = self._prices.get(symbol)
+        if price is None:
+            raise SimulatedOrderError(-1013, "Market is closed.")
+        return price
+
+    def _market_order(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        symbol, side = params['symbol'], params['side']
+        price = self._check_symbol(symbol)
+        base = self._symbols[symbol]['baseAsset']
+        step = self._step(symbol)
+        if side == 'BUY':
+            quote_qty = float(params['quoteOrderQty'])
+            quantity = math.floor(quote_qty / price / step) * step
+        else:
+            quantity = float(params['quantity'])
+        notional = quantity * price
+        if notional < float(self.symbol_rules.get_filters(symbol)['MIN_NOTIONAL']['minNotional']):
+            raise SimulatedOrderError(-1013, "Filter failure: NOTIONAL")
+
+        if side == 'BUY':
+            if self._balance(self.QUOTE_ASSET)[0] < notional:
+                raise SimulatedOrderError(-2010, "Account has insufficient balance for requested action.")
+            self._balance(self.QUOTE_ASSET)[0] -= notional
+            self._balance(base)[0] += quantity * (1 - self.fee_rate)  # Komisi dipotong dari aset yang diterima.
+        else:
+            if self._balance(base)[0] + 1e-12 < quantity:
+                raise SimulatedOrderError(-2010, "Account has insufficient balance for requested action.")
+            self._balance(base)[0] = max(0.0, self._balance(base)[0] - quantity)
+            self._balance(self.QUOTE_ASSET)[0] += notional * (1 - self.fee_rate)
+
+        order = self._new_order(symbol, side, "MARKET", quantity)
+        order.update(status="FILLED", executedQty=_fmt(quantity), cummulativeQuoteQty=_fmt(notional))
+        self.stats["fills"] += 1
+        self._emit_order(order)
+        self._emit_balances(self.QUOTE_ASSET, base)
+        return {**order, "transactTime": order['updateTime'],
+                "fills": [{"price": _fmt(price), "qty": _fmt(quantity), "commission": _fmt(0), "commissionAsset": base}]}
+
+    def _oco_order(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = params['symbol']
+        price = self._check_symbol(symbol)
+        base = self._symbols[symbol]['baseAsset']
+        quantity = float(params['quantity'])
+        take_profit, stop_price, stop_limit = float(params['price']), float(params['stopPrice']), float(params['stopLimitPrice'])
+        if not stop_price < price < take_profit:
+            raise SimulatedOrderError(-2010, "The relationship of the prices for the orders is not correct.")
+        free = self._balance(base)
+        if free[0] + 1e-12 < quantity:
+            raise SimulatedOrderError(-2010, "Account has insufficient balance for requested action.")
+        free[0] = max(0.0, free[0] - quantity)
+        free[1] += quantity
+
+        order_list_id = self._next_order_list_id
+        self._next_order_list_id += 1
+        stop_leg = self._new_order(symbol, "SELL", "STOP_LOSS_LIMIT", quantity, stop_limit, stop_price, order_list_id)
+        limit_leg = self._new_order(symbol, "SELL", "LIMIT_MAKER", quantity, take_profit, 0.0, order_list_id)
+        legs = [stop_leg, limit_leg]
+        self._order_lists[order_list_id] = {"symbol": symbol, "orderIds": [o['orderId'] for o in legs], "status": "EXECUTING"}
+        self._open_by_symbol.setdefault(symbol, set()).update(o['orderId'] for o in legs)
+        for leg in legs:
+            self._emit_order(leg)
+        self._emit({"e": "listStatus", "s": symbol, "g": order_list_id, "c": "OCO", "l": "EXEC_STARTED", "L": "EXECUTING"})
+        self._emit_balances(base)
+        return self._order_list_response(order_list_id, "EXEC_STARTED", "EXECUTING")
+
+    def _order_list_response(self, order_list_id: int, list_status: str, order_status: str) -> Dict[str, Any]:
+        order_list = self._order_lists[order_list_id]
+        reports = [dict(self._orders[order_id]) for order_id in order_list['orderIds']]
+        return {"orderListId": order_list_id, "contingencyType": "OCO", "listStatusType": list_status,
+                "listOrderStatus": order_status, "listClientOrderId": f"sim-list-{order_list_id}",
+                "transactionTime": self.now_ms(), "symbol": order_list['symbol'],
+                "orders": [{"symbol": o['symbol'], "orderId": o['orderId'], "clientOrderId": o['clientOrderId']} for o in reports],
+                "orderReports": reports}
+
+    def _close_order_list(self, order_list_id: int, filled_order_id: Optional[int] = None):
+        """Menutup OCO: kaki yang tidak terisi menjadi EXPIRED (atau CANCELED saat dibatalkan) dan saldo terkunci dilepas."""
+        order_list = self._order_lists[order_list_id]
+        symbol = order_list['symbol']
+        base = self._symbols[symbol]['baseAsset']
+        for order_id in order_list['orderIds']:
+            order = self._orders[order_id]
+            self._open_by_symbol.get(symbol, set()).discard(order_id)
+            self._triggered.discard(order_id)
+            if order_id != filled_order_id and order['status'] == 'NEW':
+                order['status'] = 'CANCELED' if filled_order_id is None else 'EXPIRED'
+                order['updateTime'] = self.now_ms()
+                self._emit_order(order)
+        quantity = float(self._orders[order_list['orderIds'][0]]['origQty'])
+        locked = self._balance(base)
+        locked[1] = max(0.0, locked[1] - quantity)
+        if filled_order_id is None:
+            locked[0] += quantity
+        order_list['status'] = 'ALL_DONE'
+        self._emit({"e": "listStatus", "s": symbol, "g": order_list_id, "c": "OCO", "l": "ALL_DONE", "L": "ALL_DONE"})
+        self._emit_balances(self.QUOTE_ASSET, base)
+
+    def _fill_oco_leg(self, order: Dict[str, Any], fill_price: float):
+        quantity = float(order['origQty'])
+        notional = quantity * fill_price
+        order.update(status="FILLED", executedQty=order['origQty'], cummulativeQuoteQty=_fmt(notional), updateTime=self.now_ms())
+        self._balance(self.QUOTE_ASSET)[0] += notional * (1 - self.fee_rate)
+        self.stats["fills"] += 1
+        self._emit_order(order)
+        self._close_order_list(order['orderListId'], filled_order_id=order['orderId'])
+
+    def _cancel_order_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        order_list_id = int(params['orderListId'])
+        order_list = self._order_lists.get(order_list_id)
+        if order_list is None or order_list['symbol'] != params['symbol'] or order_list['status'] == 'ALL_DONE':
+            raise SimulatedOrderError(-2011, "Unknown order list sent.")
+        self._close_order_list(order_list_id)
+        self.stats["cancels"] += 1
+        return self._order_list_response(order_list_id, "ALL_DONE", "ALL_DONE")
+
+    def _open_orders(self, symbol: Optional[str]) -> List[Dict[str, Any]]:
+        symbols = [symbol] if symbol else list(self._open_by_symbol)
+        return [dict(self._orders[order_id]) for s in symbols for order_id in sorted(self._open_by_symbol.get(s, ()))]
+
+    def _ticker(self, params: Dict[str, Any]) -> Any:
+        if 'symbol' in params:
+            symbol = params['symbol']
+            if not self._ensure_symbol(symbol) or symbol not in self._prices:
+                raise SimulatedOrderError(-1121, "Invalid symbol.")
+            return {"symbol": symbol, "price": _fmt(self._prices[symbol])}
+        if 'symbols' in params:
+            symbols = json.loads(params['symbols'])
+            for symbol in symbols:
+                self._ensure_symbol(symbol)
+            return [{"symbol": s, "price": _fmt(self._prices[s])} for s in symbols if s in self._prices]
+        return [{"symbol": s, "price": _fmt(p)} for s, p in self._prices.items()]
+
+    # --- REST ---
+    def handle(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Menjawab satu request REST. Penolakan dicatat seperti error body Binance dan mengembalikan None."""
+        params = params or {}
+        route = (method.upper(), endpoint)
+        try:
+            with self._lock:
+                if route == ("GET", "/time"):
+                    return {"serverTime": self.now_ms()}
+                if route == ("GET", "/exchangeInfo"):
+                    return self._exchange_info()
+                if route == ("GET", "/ticker/price"):
+                    return self._ticker(params)
+                if route == ("GET", "/account"):
+                    return self._account()
+                if route == ("GET", "/openOrders"):
+                    return self._open_orders(params.get('symbol'))
+                if route == ("POST", "/order") and params.get('type') == "MARKET":
+                    return self._market_order(params)
+                if route == ("POST", "/order/oco"):
+                    return self._oco_order(params)
+                if route == ("DELETE", "/orderList"):
+                    return self._cancel_order_list(params)
+                if route == ("GET", "/klines"):
+                    return []
+                if endpoint == "/userDataStream":
+                    return {"listenKey": "simulated"} if route[0] == "POST" else {}
+            raise SimulatedOrderError(-1100, f"Endpoint tidak didukung bursa simulasi: {method.upper()} {endpoint}")
+        except SimulatedOrderError as e:
+            self.stats["rejects"] += 1
+            logger.error("Error Body dari bursa simulasi: %s", {"code": e.code, "msg": e.msg}, extra={"symbol": params.get('symbol')})
+            return None
+
+class SimulatedBinanceClient(BinanceClient):
+    """BinanceClient yang mengirim semua request ke SimulatedExchange di dalam proses, tanpa jaringan."""
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 exchange: Optional[SimulatedExchange] = None, latency_seconds: float = 0.0):
+        super().__init__(api_key or "simulated-key", api_secret or "simulated-secret")
+        self.exchange = exchange or shared_simulated_exchange
+        self.latency_seconds = latency_seconds
+        self.symbol_rules = self.exchange.symbol_rules
+        self.price_cache = self.exchange.price_cache
+
+    def _send_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Optional[Any]:
+        started = time.perf_counter()
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        result = self.exchange.handle(method, endpoint, dict(params or {}))
+        self.latency.observe(f"{method.upper()} {endpoint}", time.perf_counter() - started)
+        return result
+
+    def _send_api_key_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        return self._send_request(method, endpoint, params)
+
+    def _fetch_exchange_info_blocking(self) -> Optional[Dict[str, Any]]:
+        return self.exchange.handle("GET", "/exchangeInfo")
+
+class SimulatedAsyncBinanceClient(AsyncBinanceClient):
+    """Versi asinkron SimulatedBinanceClient; setiap request tetap memberi giliran ke event loop."""
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, max_concurrency: int = 10,
+                 timeout_seconds: float = 10.0, exchange: Optional[SimulatedExchange] = None, latency_seconds: float = 0.0):
+        super().__init__(api_key or "simulated-key", api_secret or "simulated-secret", max_concurrency, timeout_seconds)
+        self.exchange = exchange or shared_simulated_exchange
+        self.latency_seconds = latency_seconds
+        self.symbol_rules = self.exchange.symbol_rules
+        self.price_cache = self.exchange.price_cache
+
+    async def _send_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Optional[Any]:
+        started = time.perf_counter()
+        await asyncio.sleep(self.latency_seconds)
+        result = self.exchange.handle(method, endpoint, dict(params or {}))
+        self.latency.observe(f"{method.upper()} {endpoint}", time.perf_counter() - started)
+        return result
+
+shared_simulated_exchange = SimulatedExchange(
+    balances={SimulatedExchange.QUOTE_ASSET: config.SIMULATED_USDT_BALANCE},
+    fee_rate=config.SIMULATED_FEE_RATE,
+    kline_store=KlineStore(config.KLINES_DIRECTORY),
+    kline_interval=config.BACKTEST_KLINE_INTERVAL,
+)
@@ -1,5 +1,5 @@
 # Auto Trade Bot/binance/strategy.py
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .client import BinanceClient
 from .models import TradeDecision, TargetInfo, StopLossInfo
 
@@ -10,12 +10,23 @@ class TradingStrategy:
     def __init__(self, binance_client: BinanceClient):
         self.client = binance_client
 
-    def evaluate_new_signal(self, signal: Dict[str, Any]) -> TradeDecision:
+    def evaluate_signals(self, signals: List[Dict[str, Any]]) -> List[TradeDecision]:
+        """
+        Mengevaluasi banyak sinyal sekaligus menggunakan satu snapshot harga,
+        sehingga hanya ada satu request harga berapapun jumlah sinyalnya.
+        """
+        symbols = sorted({s.get("coin_pair") for s in signals if s.get("coin_pair")})
+        price_snapshot = self.client.get_price_map(symbols) if symbols else {}
+        return [self.evaluate_new_signal(signal, price_snapshot) for signal in signals]
+
+    def evaluate_new_signal(self, signal: Dict[str, Any], price_snapshot: Optional[Dict[str, float]] = None) -> TradeDecision:
         """
         Mengevaluasi sinyal baru dan memutuskan apakah akan membeli.
         - BUY: Sinyal valid dan harga di bawah entry price.
         - SKIP: Harga di atas entry price.
         - FAIL: Sinyal sudah tidak valid atau data kurang.
+
+        Jika `price_snapshot` diberikan, harga diambil dari snapshot tersebut tanpa request tambahan.
         """
         coin_pair = signal.get("coin_pair")
         entry_price = signal.get("entry_price")
@@ -23,7 +34,10 @@ class TradingStrategy:
         if not coin_pair or entry_price is None:
             return TradeDecision(decision="FAIL", coin_pair=coin_pair or "N/A", reason="Sinyal tidak valid: 'coin_pair' atau 'entry_price' tidak ditemukan.")
 
-        current_price = self.client.get_current_price(coin_pair)
+        if price_snapshot is not None:
+            current_price = price_snapshot.get(coin_pair)
+        else:
+            current_price = self.client.get_current_price(coin_pair)
         if current_price is None:
             return TradeDecision(decision="FAIL", coin_pair=coin_pair, entry_price=entry_price, reason=f"Gagal mendapatkan harga terkini untuk {coin_pair}.")
 
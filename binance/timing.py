@@ -0,0 +1,52 @@
+# Auto Trade Bot/binance/timing.py
+import threading
+import time
+from typing import Dict, Optional
+
+import config
+from core.metrics import metrics
+
+class ServerClock:
+    """
+    Menyimpan selisih jam lokal terhadap jam server Binance, agar `timestamp` pada request bertanda tangan
+    tidak ditolak (-1021) ketika jam mesin bergeser. Offset diperbarui berkala dari GET /time.
+    """
+
+    def __init__(self, sync_interval_seconds: float = 300.0):
+        self.sync_interval_seconds = sync_interval_seconds
+        self.offset_ms = 0
+        self.round_trip_ms: Optional[float] = None
+        self._last_sync: Optional[float] = None  # None = belum pernah sinkron; time.monotonic() bisa dimulai dari ~0 saat boot.
+        self._lock = threading.Lock()
+
+    def needs_sync(self) -> bool:
+        return self._last_sync is None or time.monotonic() - self._last_sync >= self.sync_interval_seconds
+
+    def invalidate(self):
+        """Memaksa sinkronisasi ulang pada request bertanda tangan berikutnya."""
+        self._last_sync = None
+
+    def update(self, server_time_ms: int, sent_at: float, received_at: float):
+        """Menghitung offset dari titik tengah perjalanan request (waktu epoch dalam detik)."""
+        with self._lock:
+            midpoint_ms = (sent_at + received_at) * 500
+            self.offset_ms = int(server_time_ms - midpoint_ms)
+            self.round_trip_ms = (received_at - sent_at) * 1000
+            self._last_sync = time.monotonic()
+
+    def now_ms(self) -> int:
+        return int(time.time() * 1000) + self.offset_ms
+
+class LatencyRecorder:
+    """Latensi per endpoint, dicatat sebagai histogram `binance_request_duration_seconds` di registry metrik bersama."""
+    METRIC_NAME = "binance_request_duration_seconds"
+
+    def observe(self, name: str, seconds: float):
+        metrics.observe(self.METRIC_NAME, seconds, endpoint=name)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Ringkasan per endpoint: jumlah, rata-rata, dan batas atas bucket p50/p95/p99 (ms)."""
+        return {labels["endpoint"]: summary for labels, summary in metrics.histogram_summary(self.METRIC_NAME)}
+
+shared_server_clock = ServerClock(config.BINANCE_TIME_SYNC_INTERVAL_SECONDS)
+shared_latency = LatencyRecorder()
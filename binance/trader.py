@@ -1,15 +1,44 @@
 # Auto Trade Bot/binance/trader.py
+import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from core.logging_config import get_logger
 from .client import BinanceClient
+from .user_stream import AccountState
+
+logger = logging.getLogger(__name__)
 
 class Trader:
     """
     Bertanggung jawab untuk mengeksekusi trade berdasarkan keputusan yang sudah dianalisis.
     """
-    def __init__(self, client: BinanceClient, usdt_per_trade: float):
+    BALANCE_EVENT_TIMEOUT_SECONDS = 5.0
+
+    def __init__(self, client: BinanceClient, usdt_per_trade: float, account_state: Optional[AccountState] = None):
         self.client = client
         self.usdt_per_trade = usdt_per_trade
+        self.account_state = account_state
+
+    def _get_filled_balance(self, base_asset: str, balance_before: float) -> Optional[float]:
+        """
+        Mengambil saldo aset setelah market buy. Jika user data stream aktif, cukup menunggu event saldo;
+        jika tidak, jatuh ke cara lama (jeda lalu GET /account).
+        """
+        if self.account_state and self.account_state.is_live:
+            balance = self.account_state.wait_for_free_balance_above(base_asset, balance_before, self.BALANCE_EVENT_TIMEOUT_SECONDS)
+            if balance is not None:
+                return balance
+            logger.info("Event saldo tidak diterima tepat waktu. Mengambil saldo via REST...")
+        else:
+            time.sleep(2)
+
+        updated_account_info = self.client.get_account_info()
+        if not updated_account_info:
+            return None
+        for balance in updated_account_info.get('balances', []):
+            if balance['asset'] == base_asset:
+                return float(balance['free'])
+        return 0.0
 
     def execute_trade(self, decision: Dict[str, Any], account_summary: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -17,11 +46,16 @@ class Trader:
         """
         coin_pair = decision["coin_pair"]
         base_asset = coin_pair.replace("USDT", "")
+        # Konteks symbol: pesan per koin tidak saling meredam di RateLimitFilter dan tetap bisa difilter per koin.
+        log = get_logger(__name__, symbol=coin_pair)
 
         # --- PENGECEKAN PRIORITAS 1: ORDER AKTIF ---
         # Cek apakah sudah ada order yang aktif untuk koin ini (termasuk OCO)
-        print(f"Memeriksa order aktif untuk {coin_pair}...")
-        open_orders = self.client.get_open_orders(symbol=coin_pair)
+        log.info("Memeriksa order aktif untuk %s...", coin_pair)
+        if self.account_state and self.account_state.is_live:
+            open_orders = self.account_state.get_open_orders(symbol=coin_pair)
+        else:
+            open_orders = self.client.get_open_orders(symbol=coin_pair)
         if open_orders: # Jika list tidak kosong, berarti ada order aktif
             return {"status": "SKIP", "reason": f"Ditemukan {len(open_orders)} order aktif untuk {coin_pair}. Pembelian dilewati untuk mencegah duplikasi."}
 
@@ -38,37 +72,33 @@ class Trader:
         if not symbol_info:
             return {"status": "FAIL", "reason": f"Tidak dapat menemukan aturan trading untuk {coin_pair}."}
         
-        min_notional_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'MIN_NOTIONAL'), None)
+        min_notional_filter = symbol_info['filters_by_type'].get('MIN_NOTIONAL')
         if min_notional_filter and self.usdt_per_trade < float(min_notional_filter['minNotional']):
             reason = f"Jumlah trade (${self.usdt_per_trade}) di bawah minimum (${float(min_notional_filter['minNotional'])}) untuk {coin_pair}."
             return {"status": "FAIL", "reason": reason}
 
-        print(f"Memulai proses pembelian untuk {coin_pair}...")
+        log.info("Memulai proses pembelian untuk %s...", coin_pair)
+        balance_before = self.account_state.get_free_balance(base_asset) if self.account_state else 0.0
         
+        buy_started = time.perf_counter()
         buy_order = self.client.place_market_buy_order(symbol=coin_pair, quote_order_qty=self.usdt_per_trade)
+        buy_latency = time.perf_counter() - buy_started
         if not buy_order or buy_order.get('status') != 'FILLED':
             return {"status": "FAIL", "reason": "Market buy order gagal dieksekusi atau tidak terisi penuh.", "details": buy_order}
 
         initial_filled_qty = float(buy_order['executedQty'])
         avg_price = float(buy_order['cummulativeQuoteQty']) / initial_filled_qty
-        print(f"Berhasil membeli {initial_filled_qty:.6f} {base_asset} @ ~${avg_price:.4f}")
+        log.info("Berhasil membeli %.6f %s @ ~$%.4f", initial_filled_qty, base_asset, avg_price)
         
-        print("Menunggu & mengambil saldo aktual untuk menempatkan OCO...")
-        time.sleep(2) 
-        updated_account_info = self.client.get_account_info()
-        if not updated_account_info:
+        log.info("Menunggu & mengambil saldo aktual untuk menempatkan OCO...")
+        actual_balance = self._get_filled_balance(base_asset, balance_before)
+        if actual_balance is None:
              return {"status": "CRITICAL_FAIL", "reason": "Aset dibeli tetapi GAGAL mengambil saldo terbaru untuk OCO.", "buy_order": buy_order}
-
-        actual_balance = 0.0
-        for balance in updated_account_info.get('balances', []):
-            if balance['asset'] == base_asset:
-                actual_balance = float(balance['free'])
-                break
         
         if actual_balance <= 0:
             return {"status": "CRITICAL_FAIL", "reason": f"Aset dibeli tetapi saldo {base_asset} tidak ditemukan atau nol.", "buy_order": buy_order}
         
-        print(f"Saldo aktual terdeteksi: {actual_balance} {base_asset}. Menggunakan jumlah ini untuk OCO.")
+        log.info("Saldo aktual terdeteksi: %s %s. Menggunakan jumlah ini untuk OCO.", actual_balance, base_asset)
 
         try:
             tp_price = decision['targets'][3]['price']
@@ -76,7 +106,7 @@ class Trader:
         except (IndexError, KeyError):
             return {"status": "CRITICAL_FAIL", "reason": "Data TP4 atau SL1 tidak ditemukan pada sinyal.", "buy_order": buy_order}
             
-        print(f"Menempatkan OCO Order: TP=${tp_price}, SL=${sl_price}")
+        log.info("Menempatkan OCO Order: TP=$%s, SL=$%s", tp_price, sl_price)
         oco_order = self.client.place_oco_sell_order(
             symbol=coin_pair,
             quantity=actual_balance,
@@ -84,7 +114,14 @@ class Trader:
             stop_loss_price=sl_price
         )
 
+        # Waktu dari kirim market buy sampai OCO terpasang = lama aset berada tanpa proteksi.
+        buy_to_oco = time.perf_counter() - buy_started
+        self.client.latency.observe("trade.market_buy", buy_latency)
+        self.client.latency.observe("trade.buy_to_oco", buy_to_oco)
+        latency_ms = {"market_buy": round(buy_latency * 1000, 1), "buy_to_oco": round(buy_to_oco * 1000, 1)}
+        log.info("Latensi: market buy %s ms, market buy -> OCO %s ms", latency_ms['market_buy'], latency_ms['buy_to_oco'])
+
         if not oco_order:
-            return {"status": "CRITICAL_FAIL", "reason": "Aset berhasil dibeli tetapi GAGAL menempatkan OCO order.", "buy_order": buy_order, "details": "Cek error body dari Binance."}
+            return {"status": "CRITICAL_FAIL", "reason": "Aset berhasil dibeli tetapi GAGAL menempatkan OCO order.", "buy_order": buy_order, "details": "Cek error body dari Binance.", "latency_ms": latency_ms}
         
-        return {"status": "SUCCESS", "reason": "Pembelian dan penempatan OCO berhasil.", "buy_order": buy_order, "oco_order": oco_order}
\ No newline at end of file
+        return {"status": "SUCCESS", "reason": "Pembelian dan penempatan OCO berhasil.", "buy_order": buy_order, "oco_order": oco_order, "latency_ms": latency_ms}
\ No newline at end of file
@@ -0,0 +1,205 @@
+# Auto Trade Bot/binance/user_stream.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+import websockets
+
+import config
+from .client import BinanceClient, is_simulated
+
+logger = logging.getLogger(__name__)
+
+OPEN_ORDER_STATUSES = {'NEW', 'PARTIALLY_FILLED'}
+
+class AccountState:
+    """
+    Tampilan live saldo dan status order/OCO di memori, diisi dari user data stream.
+    Aman dibaca dari thread lain; pembaca bisa menunggu perubahan tanpa polling REST.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._balances: Dict[str, Dict[str, float]] = {}
+        self._open_orders: Dict[int, Dict[str, Any]] = {}
+        self._order_lists: Dict[int, str] = {}
+        self.is_live = False
+        self.last_event_at = 0.0
+
+    def seed(self, account_info: Optional[Dict[str, Any]], open_orders: Optional[List[Dict[str, Any]]]):
+        """Mengisi keadaan awal dari REST sebelum event stream diterapkan."""
+        with self._condition:
+            self._balances = {b['asset']: {"free": float(b['free']), "locked": float(b['locked'])}
+                              for b in (account_info or {}).get('balances', [])}
+            self._open_orders = {o['orderId']: dict(o) for o in open_orders or []}
+            self._order_lists = {o['orderListId']: 'EXECUTING' for o in open_orders or [] if o.get('orderListId', -1) != -1}
+            self._condition.notify_all()
+
+    def set_live(self, live: bool):
+        with self._condition:
+            self.is_live = live
+            self._condition.notify_all()
+
+    def apply_event(self, event: Dict[str, Any]):
+        """Menerapkan satu event executionReport, listStatus, atau outboundAccountPosition."""
+        event_type = event.get('e')
+        with self._condition:
+            if event_type == 'outboundAccountPosition':
+                for b in event.get('B', []):
+                    self._balances[b['a']] = {"free": float(b['f']), "locked": float(b['l'])}
+            elif event_type == 'executionReport':
+                order_id = event['i']
+                if event['X'] in OPEN_ORDER_STATUSES:
+                    previous = self._open_orders.get(order_id, {})
+                    self._open_orders[order_id] = {
+                        "symbol": event['s'], "orderId": order_id, "orderListId": event.get('g', -1),
+                        "clientOrderId": event.get('c'), "price": event.get('p'), "origQty": event.get('q'),
+                        "executedQty": event.get('z'), "cummulativeQuoteQty": event.get('Z'),
+                        "status": event['X'], "type": event.get('o'), "side": event.get('S'),
+                        "stopPrice": event.get('P'), "time": previous.get('time', event.get('O')),
+                    }
+                else:
+                    self._open_orders.pop(order_id, None)
+            elif event_type == 'listStatus':
+                self._order_lists[event['g']] = event.get('L')
+            else:
+                return
+            self.last_event_at = time.time()
+            self._condition.notify_all()
+
+    def get_free_balance(self, asset: str) -> float:
+        return self._balances.get(asset, {}).get('free', 0.0)
+
+    def get_balances(self) -> List[Dict[str, Any]]:
+        """Saldo dalam format yang sama dengan field 'balances' pada GET /account."""
+        with self._condition:
+            return [{"asset": asset, "free": str(b['free']), "locked": str(b['locked'])} for asset, b in self._balances.items()]
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Order terbuka dalam format yang sama dengan GET /openOrders."""
+        with self._condition:
+            return [dict(o) for o in self._open_orders.values() if symbol is None or o['symbol'] == symbol]
+
+    def wait_for_free_balance_above(self, asset: str, threshold: float, timeout: float) -> Optional[float]:
+        """Menunggu sampai saldo free aset melebihi `threshold`. Mengembalikan saldo, atau None jika timeout."""
+        with self._condition:
+            if self._condition.wait_for(lambda: self.get_free_balance(asset) > threshold or not self.is_live, timeout=timeout) and self.is_live:
+                return self.get_free_balance(asset)
+        return None
+
+    def wait_for_order_list_done(self, order_list_id: int, timeout: float) -> bool:
+        """Menunggu sampai OCO berstatus ALL_DONE (misal setelah dibatalkan)."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._order_lists.get(order_list_id) == 'ALL_DONE', timeout=timeout)
+
+
+class UserDataStream:
+    """
+    Konsumen user data stream Binance: membuat listenKey, menjaganya tetap aktif (keepalive),
+    dan meneruskan setiap event ke AccountState.
+    """
+
+    def __init__(self, client: BinanceClient, account_state: AccountState, ws_base_url: str, keepalive_interval_seconds: float = 1800,
+                 connect: Optional[Callable] = None, reconnect_delay_seconds: float = 5.0):
+        self.client = client
+        self.account_state = account_state
+        self.ws_base_url = ws_base_url.rstrip('/')
+        self.keepalive_interval_seconds = keepalive_interval_seconds
+        self._connect = connect or websockets.connect
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    async def _keepalive(self, listen_key: str):
+        while True:
+            await asyncio.sleep(self.keepalive_interval_seconds)
+            if await asyncio.to_thread(self.client.keepalive_listen_key, listen_key) is None:
+                logger.error("Gagal memperpanjang listenKey. Stream akan disambung ulang.")
+                return
+
+    async def _consume(self, ws):
+        while not self._stop_event.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            event = json.loads(raw)
+            if event.get('e') == 'listenKeyExpired':
+                logger.warning("listenKey kedaluwarsa. Menyambung ulang user data stream...")
+                return
+            self.account_state.apply_event(event)
+
+    async def _run_session(self):
+        listen_key = await asyncio.to_thread(self.client.create_listen_key)
+        if not listen_key:
+            raise ConnectionError("Gagal membuat listenKey.")
+
+        async with self._connect(f"{self.ws_base_url}/{listen_key}") as ws:
+            # Seed dari REST setelah websocket terbuka, sehingga event yang tiba selama seeding tetap diterapkan sesudahnya.
+            account_info, open_orders = await asyncio.gather(
+                asyncio.to_thread(self.client.get_account_info),
+                asyncio.to_thread(self.client.get_open_orders),
+            )
+            if account_info is None or open_orders is None:
+                raise ConnectionError("Gagal mengambil keadaan awal akun.")
+            self.account_state.seed(account_info, open_orders)
+            self.account_state.set_live(True)
+            logger.info("User data stream terhubung. Saldo dan status order kini diperbarui secara live.")
+
+            consume_task = asyncio.ensure_future(self._consume(ws))
+            keepalive_task = asyncio.ensure_future(self._keepalive(listen_key))
+            try:
+                await asyncio.wait({consume_task, keepalive_task}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                self.account_state.set_live(False)
+                for task in (consume_task, keepalive_task):
+                    task.cancel()
+                await asyncio.gather(consume_task, keepalive_task, return_exceptions=True)
+                if consume_task.done() and not consume_task.cancelled() and consume_task.exception():
+                    raise consume_task.exception()
+
+    async def run(self):
+        """Menjaga user data stream tetap hidup dan tersambung ulang otomatis jika terputus."""
+        while not self._stop_event.is_set():
+            try:
+                await self._run_session()
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning("User data stream terputus: %s. Menyambung ulang dalam %s detik...", e, self.reconnect_delay_seconds)
+                await asyncio.sleep(self.reconnect_delay_seconds)
+
+    def start_in_thread(self):
+        """Menjalankan stream di thread daemon dengan event loop sendiri."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="user-data-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.account_state.set_live(False)
+
+
+shared_account_state = AccountState()
+
+def start_user_data_stream() -> Optional[UserDataStream]:
+    """Memulai user data stream bersama jika API key tersedia."""
+    if is_simulated():
+        # Bursa simulasi mengirim event langsung ke AccountState; tidak ada websocket yang perlu dibuka.
+        from .simulated import shared_simulated_exchange
+        shared_simulated_exchange.attach_account_state(shared_account_state)
+        return None
+    if not config.BINANCE_API_KEY or not config.BINANCE_API_SECRET:
+        return None
+    stream = UserDataStream(BinanceClient(config.BINANCE_API_KEY, config.BINANCE_API_SECRET), shared_account_state, config.BINANCE_WS_URL)
+    stream.start_in_thread()
+    return stream
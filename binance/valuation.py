@@ -0,0 +1,179 @@
+# Auto Trade Bot/binance/valuation.py
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Satu langkah konversi harga: (simbol, dibalik). Dibalik berarti aset adalah quote pada simbol itu, sehingga nilai = jumlah / harga.
+PriceLeg = Tuple[str, bool]
+
+class PortfolioValuation:
+    """
+    Penilaian portofolio inkremental dalam satu aset quote (default USDT).
+
+    Menyimpan indeks harga simbol -> harga dan jalur konversi per aset: pasangan langsung (ADAUSDT), pasangan terbalik
+    (USDTTRY), atau lewat aset jembatan (XYZBTC -> BTCUSDT). Saat saldo atau harga berubah, hanya aset yang terdampak
+    yang dihitung ulang; ringkasan hanya disusun ulang jika ada nilai yang berubah.
+    """
+
+    def __init__(self, quote_asset: str = "USDT", pegged_assets: Iterable[str] = (), bridge_assets: Iterable[str] = ()):
+        self.quote_asset = quote_asset
+        self.pegged_assets = set(pegged_assets) | {quote_asset}  # Dinilai 1:1 terhadap quote tanpa melihat harga.
+        self.bridge_assets = [asset for asset in bridge_assets if asset != quote_asset]
+        self.full_snapshot_at = 0.0
+        self._lock = threading.RLock()
+        self._prices: Dict[str, float] = {}
+        self._balances: Dict[str, Tuple[float, float]] = {}
+        self._paths: Dict[str, List[PriceLeg]] = {}
+        self._dependents: Dict[str, Set[str]] = {}  # simbol -> aset yang nilainya memakai harga simbol ini
+        self._values: Dict[str, float] = {}
+        self._dirty: Set[str] = set()
+        self._unpriced: Set[str] = set()
+        self._summary: Optional[Dict[str, Any]] = None
+
+    # --- Input ---
+    def update_balances(self, balances: List[Dict[str, Any]], complete: bool = True):
+        """
+        Menerapkan saldo dalam format field 'balances' GET /account. Dengan `complete`, aset yang tidak ada
+        di daftar dianggap sudah nol. Hanya aset yang free/locked-nya berubah yang ditandai untuk dinilai ulang.
+        """
+        with self._lock:
+            seen = set()
+            for balance in balances:
+                asset = balance['asset']
+                amounts = (float(balance['free']), float(balance['locked']))
+                if amounts[0] + amounts[1] <= 0:
+                    continue
+                seen.add(asset)
+                if self._balances.get(asset) != amounts:
+                    self._balances[asset] = amounts
+                    self._dirty.add(asset)
+            if complete:
+                for asset in set(self._balances) - seen:
+                    del self._balances[asset]
+                    self._dirty.add(asset)
+
+    def update_prices(self, prices: Dict[str, float]):
+        """Memperbarui indeks harga. Aset yang jalurnya melewati simbol yang berubah ditandai untuk dinilai ulang."""
+        with self._lock:
+            new_symbol = False
+            for symbol, price in prices.items():
+                old_price = self._prices.get(symbol)
+                if old_price == price:
+                    continue
+                new_symbol = new_symbol or old_price is None
+                self._prices[symbol] = price
+                self._dirty.update(self._dependents.get(symbol, ()))
+            if new_symbol:
+                # Simbol baru bisa membuka jalur untuk aset yang sebelumnya tidak bisa dinilai.
+                self._dirty.update(self._unpriced)
+
+    def mark_full_snapshot(self):
+        self.full_snapshot_at = time.time()
+
+    # --- Jalur harga ---
+    def _leg(self, from_asset: str, to_asset: str) -> Optional[PriceLeg]:
+        if f"{from_asset}{to_asset}" in self._prices:
+            return f"{from_asset}{to_asset}", False
+        if f"{to_asset}{from_asset}" in self._prices:
+            return f"{to_asset}{from_asset}", True
+        return None
+
+    def _resolve_path(self, asset: str) -> Optional[List[PriceLeg]]:
+        direct = self._leg(asset, self.quote_asset)
+        if direct:
+            return [direct]
+        for bridge in self.bridge_assets:
+            if bridge == asset:
+                continue
+            first, second = self._leg(asset, bridge), self._leg(bridge, self.quote_asset)
+            if first and second:
+                return [first, second]
+        return None
+
+    def _set_path(self, asset: str, path: Optional[List[PriceLeg]]):
+        for symbol, _ in self._paths.pop(asset, ()):
+            self._dependents.get(symbol, set()).discard(asset)
+        if path:
+            self._paths[asset] = path
+            for symbol, _ in path:
+                self._dependents.setdefault(symbol, set()).add(asset)
+
+    def _value(self, asset: str, amount: float) -> float:
+        if asset in self.pegged_assets:
+            return amount
+        path = self._paths.get(asset)
+        if path is None or any(symbol not in self._prices for symbol, _ in path):
+            path = self._resolve_path(asset)
+            self._set_path(asset, path)
+        if path is None:
+            self._unpriced.add(asset)
+            return 0.0
+        self._unpriced.discard(asset)
+        value = amount
+        for symbol, inverted in path:
+            price = self._prices[symbol]
+            if inverted:
+                value = value / price if price > 0 else 0.0
+            else:
+                value *= price
+        return value
+
+    def revalue(self) -> int:
+        """Menghitung ulang nilai aset yang ditandai berubah. Mengembalikan jumlah aset yang dihitung."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            for asset in dirty:
+                amounts = self._balances.get(asset)
+                if amounts is None:
+                    self._values.pop(asset, None)
+                    self._unpriced.discard(asset)
+                    self._set_path(asset, None)
+                else:
+                    self._values[asset] = self._value(asset, amounts[0] + amounts[1])
+            if dirty:
+                self._summary = None
+            return len(dirty)
+
+    # --- Output ---
+    def required_symbols(self) -> List[str]:
+        """Simbol pada jalur harga semua aset yang dipegang; cukup ini yang perlu diperbarui setiap penilaian."""
+        with self._lock:
+            return sorted({symbol for asset in self._balances for symbol, _ in self._paths.get(asset, ())})
+
+    def unpriced_assets(self) -> List[str]:
+        """Aset dengan saldo yang belum punya jalur harga ke aset quote."""
+        with self._lock:
+            return sorted(self._unpriced)
+
+    def summary(self, min_value: float = 0.01) -> Dict[str, Any]:
+        """Ringkasan akun (aset bernilai > `min_value`, urut dari yang terbesar). Disusun ulang hanya jika ada perubahan."""
+        with self._lock:
+            if self._summary is None:
+                held_assets = []
+                for asset, value in self._values.items():
+                    if value <= min_value:
+                        continue
+                    free, locked = self._balances[asset]
+                    held_assets.append({
+                        "asset": asset,
+                        "total_balance": free + locked,
+                        "free_balance": free,
+                        "locked_balance": locked,
+                        "value_in_usdt": round(value, 2),
+                    })
+                held_assets.sort(key=lambda x: x['value_in_usdt'], reverse=True)
+                total = sum(self._values[a['asset']] for a in held_assets)
+                self._summary = {"total_balance_usdt": round(total, 2), "held_assets": held_assets}
+            return {"total_balance_usdt": self._summary["total_balance_usdt"],
+                    "held_assets": [dict(asset) for asset in self._summary["held_assets"]]}
+
+shared_portfolio_valuation = PortfolioValuation(
+    quote_asset="USDT",
+    pegged_assets=config.ACCOUNT_PEGGED_ASSETS,
+    bridge_assets=config.ACCOUNT_VALUATION_BRIDGE_ASSETS,
+)
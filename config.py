@@ -29,4 +29,84 @@ TRAILING_TRIGGER_PERCENTAGE = float(os.getenv("TRAILING_TRIGGER_PERCENTAGE", 0.0
 
 # --- BARU: Konfigurasi Posisi Macet ---
 STUCK_TRADE_ENABLED = os.getenv("STUCK_TRADE_ENABLED", "False").lower() in ('true', '1', 't')
-STUCK_TRADE_DURATION_HOURS = int(os.getenv("STUCK_TRADE_DURATION_HOURS", 6))
\ No newline at end of file
+STUCK_TRADE_DURATION_HOURS = int(os.getenv("STUCK_TRADE_DURATION_HOURS", 6))
+
+# --- BARU: Konfigurasi Klien HTTP Binance (async) ---
+BINANCE_MAX_CONCURRENT_REQUESTS = int(os.getenv("BINANCE_MAX_CONCURRENT_REQUESTS", 10))
+BINANCE_REQUEST_TIMEOUT_SECONDS = float(os.getenv("BINANCE_REQUEST_TIMEOUT_SECONDS", 10))
+
+# --- BARU: Cache Aturan Trading (exchangeInfo) ---
+EXCHANGE_INFO_CACHE_FILE = os.getenv("EXCHANGE_INFO_CACHE_FILE", os.path.join("data", "exchange_info_cache.json"))
+EXCHANGE_INFO_TTL_SECONDS = int(os.getenv("EXCHANGE_INFO_TTL_SECONDS", 3600))
+
+# --- BARU: Konfigurasi Market Data WebSocket ---
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/ws")
+PRICE_CACHE_MAX_AGE_SECONDS = float(os.getenv("PRICE_CACHE_MAX_AGE_SECONDS", 5))
+
+# --- BARU: Konfigurasi Manajemen Posisi ---
+MANAGE_MAX_CONCURRENT_POSITIONS = int(os.getenv("MANAGE_MAX_CONCURRENT_POSITIONS", 10))
+
+# --- BARU: Konfigurasi Connection Pool MongoDB ---
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 20))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 1))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+MONGO_HEALTHCHECK_INTERVAL_SECONDS = float(os.getenv("MONGO_HEALTHCHECK_INTERVAL_SECONDS", 30))
+
+
+# --- BARU: Konfigurasi Dashboard ---
+DASHBOARD_MAX_RECORDS = int(os.getenv("DASHBOARD_MAX_RECORDS", 5000))
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", 25))
+
+# --- BARU: Konfigurasi Scheduler (autoloop/listen) ---
+SCHEDULER_MANAGE_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_MANAGE_INTERVAL_SECONDS", 15))
+SCHEDULER_STATUS_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_STATUS_INTERVAL_SECONDS", 60))
+SCHEDULER_DECIDE_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_DECIDE_INTERVAL_SECONDS", 60))
+SCHEDULER_EXECUTE_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_EXECUTE_INTERVAL_SECONDS", 60))
+SCHEDULER_JITTER_SECONDS = float(os.getenv("SCHEDULER_JITTER_SECONDS", 2))
+SCHEDULER_TASK_TIMEOUT_SECONDS = float(os.getenv("SCHEDULER_TASK_TIMEOUT_SECONDS", 120))
+
+# --- BARU: Konfigurasi Rate Limit Binance ---
+BINANCE_WEIGHT_LIMIT_PER_MINUTE = int(os.getenv("BINANCE_WEIGHT_LIMIT_PER_MINUTE", 6000))
+BINANCE_ORDER_RESERVED_WEIGHT = int(os.getenv("BINANCE_ORDER_RESERVED_WEIGHT", 600))
+BINANCE_ORDER_LIMIT_PER_10S = int(os.getenv("BINANCE_ORDER_LIMIT_PER_10S", 50))
+BINANCE_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("BINANCE_RATE_LIMIT_MAX_WAIT_SECONDS", 60))
+
+# --- BARU: Konfigurasi Request Bertanda Tangan ---
+BINANCE_RECV_WINDOW_MS = int(os.getenv("BINANCE_RECV_WINDOW_MS", 5000))
+BINANCE_TIME_SYNC_INTERVAL_SECONDS = float(os.getenv("BINANCE_TIME_SYNC_INTERVAL_SECONDS", 300))
+
+# --- BARU: Konfigurasi Metrik ---
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))
+METRICS_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("METRICS_SNAPSHOT_INTERVAL_SECONDS", 60))
+
+# --- BARU: Konfigurasi Logging ---
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # "json" atau "text"
+LOG_RATE_LIMIT_INTERVAL_SECONDS = float(os.getenv("LOG_RATE_LIMIT_INTERVAL_SECONDS", 60))
+LOG_RATE_LIMIT_BURST = int(os.getenv("LOG_RATE_LIMIT_BURST", 5))
+
+# --- BARU: Konfigurasi Backtest ---
+BACKTEST_KLINE_INTERVAL = os.getenv("BACKTEST_KLINE_INTERVAL", "1m")
+BACKTEST_FEE_RATE = float(os.getenv("BACKTEST_FEE_RATE", 0.001))
+BACKTEST_MAX_HOLD_HOURS = float(os.getenv("BACKTEST_MAX_HOLD_HOURS", 168))
+
+# --- BARU: Penyimpanan candle lokal ---
+KLINES_DIRECTORY = os.getenv("KLINES_DIRECTORY", os.path.join("data", "klines"))
+
+# --- BARU: Bursa Simulasi (tanpa jaringan) ---
+# "live" = API Binance asli, "simulated" = bursa tiruan di dalam proses (binance/simulated.py).
+BINANCE_MODE = os.getenv("BINANCE_MODE", "live").lower()
+SIMULATED_USDT_BALANCE = float(os.getenv("SIMULATED_USDT_BALANCE", 10000))
+SIMULATED_FEE_RATE = float(os.getenv("SIMULATED_FEE_RATE", 0.001))
+SIMULATED_LATENCY_MS = float(os.getenv("SIMULATED_LATENCY_MS", 0))
+# Jika diisi (ISO, mis. "2024-05-01T00:00"), harga diputar ulang dari KlineStore mulai waktu ini.
+SIMULATED_REPLAY_START = os.getenv("SIMULATED_REPLAY_START", "")
+SIMULATED_REPLAY_STEP_SECONDS = float(os.getenv("SIMULATED_REPLAY_STEP_SECONDS", 1.0))
+
+# --- BARU: Penilaian Portofolio ---
+# Aset yang dinilai 1:1 terhadap USDT, dan aset jembatan untuk koin tanpa pasangan USDT (mis. XYZBTC -> BTCUSDT).
+ACCOUNT_PEGGED_ASSETS = [a.strip() for a in os.getenv("ACCOUNT_PEGGED_ASSETS", "USDT,BUSD,USDC,DAI,TUSD").split(",") if a.strip()]
+ACCOUNT_VALUATION_BRIDGE_ASSETS = [a.strip() for a in os.getenv("ACCOUNT_VALUATION_BRIDGE_ASSETS", "BTC,ETH,BNB").split(",") if a.strip()]
+# Jarak minimum antar pengambilan semua ticker untuk mencari jalur harga aset yang belum bisa dinilai.
+ACCOUNT_PRICE_SNAPSHOT_TTL_SECONDS = float(os.getenv("ACCOUNT_PRICE_SNAPSHOT_TTL_SECONDS", 300))
\ No newline at end of file
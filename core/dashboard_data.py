@@ -0,0 +1,153 @@
+# Auto Trade Bot/core/dashboard_data.py
+import json
+import logging
+import os
+import threading
+from collections import Counter, deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from telegram.utils import EventLog
+
+logger = logging.getLogger(__name__)
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """Mengembalikan (mtime_ns, ukuran) file, atau None bila file belum ada."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class SnapshotFile:
+    """File JSON snapshot (misal account_status.json) yang hanya di-parse ulang saat mtime/ukurannya berubah."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = 0
+        self._stamp = None
+        self._data: Any = None
+
+    def load(self) -> Any:
+        stamp = _file_stamp(self.path)
+        if stamp is None:
+            return {"error": f"File tidak ditemukan: {os.path.basename(self.path)}."}
+        if stamp != self._stamp:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self._data = json.loads(content) if content else None
+            except json.JSONDecodeError:
+                self._data = {"error": f"Gagal mem-parsing JSON dari {os.path.basename(self.path)}."}
+            except Exception as e:
+                self._data = {"error": f"Terjadi kesalahan saat membaca {os.path.basename(self.path)}: {e}"}
+            self._stamp = stamp
+            self.version += 1
+        return self._data
+
+class LogTail:
+    """
+    Mengikuti EventLog secara inkremental: hanya record baru yang dibaca setiap kali index log berubah.
+    Menyimpan `max_records` record terakhir (total dan per grup) serta hitungan agregat sepanjang riwayat.
+    """
+
+    def __init__(self, log: EventLog, max_records: int, group_field: Optional[str] = None):
+        self.log = log
+        self.max_records = max_records
+        self.group_field = group_field
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.version = 0
+        self.counts: Counter = Counter()
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=self.max_records)
+        self.groups: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._stamp = None
+
+    @property
+    def total(self) -> int:
+        return self.offset
+
+    def refresh(self) -> bool:
+        """Membaca record baru bila index log berubah. Mengembalikan True jika ada data baru."""
+        stamp = _file_stamp(self.log.index_path)
+        if stamp == self._stamp:
+            return False
+        if stamp is None or self.log.next_offset < self.offset:
+            # Log dihapus atau dibuat ulang; mulai lagi dari awal.
+            self._reset()
+            if stamp is None:
+                return True
+
+        records, self.offset = self.log.read_from(self.offset)
+        self._stamp = stamp
+        if not records:
+            return False
+
+        self.records.extend(records)
+        if self.group_field:
+            for record in records:
+                key = record.get(self.group_field)
+                self.counts[key] += 1
+                self.groups.setdefault(key, deque(maxlen=self.max_records)).append(record)
+        self.version += 1
+        return True
+
+    def page(self, page: int, page_size: int, group: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Mengambil satu halaman record, terbaru lebih dulu."""
+        source = self.records if group is None else self.groups.get(group, ())
+        start = max(0, page) * page_size
+        return list(islice(reversed(source), start, start + page_size))
+
+    def available(self, group: Optional[str] = None) -> int:
+        """Jumlah record yang bisa ditampilkan (dibatasi `max_records`)."""
+        return len(self.records if group is None else self.groups.get(group, ()))
+
+class DashboardData:
+    """
+    Lapisan akses data untuk dashboard. Satu instance dibagi oleh semua sesi Streamlit,
+    sehingga setiap file hanya dibaca sekali per perubahan, bukan sekali per render.
+    """
+
+    def __init__(self, data_dir: str = "data", max_records: int = 5000):
+        self._lock = threading.Lock()
+        self.snapshots = {
+            "account_status": SnapshotFile(os.path.join(data_dir, "account_status.json")),
+            "open_orders_status": SnapshotFile(os.path.join(data_dir, "open_orders_status.json")),
+        }
+        self.logs = {
+            "new_signals": LogTail(EventLog("new_signals", directory=data_dir), max_records),
+            "trade_decisions": LogTail(EventLog("trade_decisions", directory=data_dir), max_records, group_field="decision"),
+            "trade_log": LogTail(EventLog("trade_log", directory=data_dir), max_records),
+            "parsed_messages": LogTail(EventLog("parsed_messages", directory=data_dir), max_records, group_field="message_type"),
+        }
+
+    def refresh(self):
+        """Memeriksa semua log; hanya log yang index-nya berubah yang dibaca."""
+        with self._lock:
+            for stream, tail in self.logs.items():
+                try:
+                    tail.refresh()
+                except Exception as e:
+                    logger.error("Error saat memuat log %s: %s", stream, e)
+
+    def snapshot(self, name: str) -> Any:
+        with self._lock:
+            return self.snapshots[name].load()
+
+    def counts(self, stream: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.logs[stream].counts)
+
+    def total(self, stream: str) -> int:
+        with self._lock:
+            return self.logs[stream].total
+
+    def available(self, stream: str, group: Optional[str] = None) -> int:
+        with self._lock:
+            return self.logs[stream].available(group)
+
+    def page(self, stream: str, page: int, page_size: int, group: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.logs[stream].page(page, page_size, group)
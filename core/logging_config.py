@@ -0,0 +1,139 @@
+# Auto Trade Bot/core/logging_config.py
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import config
+
+# Atribut bawaan LogRecord; atribut lain dianggap field konteks (misal symbol, order_list_id).
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+class JsonFormatter(logging.Formatter):
+    """Memformat setiap record sebagai satu baris JSON: waktu, level, logger, pesan, dan field konteks."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Format teks untuk terminal; field konteks ditampilkan sebagai key=value di akhir baris."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = " ".join(f"{k}={v}" for k, v in vars(record).items() if k not in _STANDARD_ATTRS and not k.startswith("_"))
+        return f"{line} [{context}]" if context else line
+
+class RateLimitFilter(logging.Filter):
+    """
+    Meredam pesan berulang: setiap kombinasi (logger, template pesan, symbol) hanya diloloskan
+    `burst` kali per `interval_seconds`. Jumlah yang diredam dilaporkan pada record berikutnya yang lolos.
+    Level ERROR ke atas tidak pernah diredam.
+    """
+
+    def __init__(self, interval_seconds: float, burst: int):
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._windows: Dict[Tuple[str, Any, Any], list] = {}  # key -> [awal window, jumlah lolos, jumlah diredam]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval_seconds <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.msg, getattr(record, "symbol", None))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval_seconds:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler yang menyimpan traceback di `exc_text` (bukan digabung ke pesan) agar tetap jadi field JSON terpisah."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class ContextLogger(logging.LoggerAdapter):
+    """LoggerAdapter yang menggabungkan field konteks tetap (misal symbol) dengan `extra` per panggilan."""
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return msg, kwargs
+
+def get_logger(name: str, **context) -> ContextLogger:
+    """Mengambil logger dengan field konteks, misal get_logger(__name__, symbol="BTCUSDT")."""
+    return ContextLogger(logging.getLogger(name), context)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(level: Optional[str] = None, log_format: Optional[str] = None):
+    """
+    Memasang logging non-blocking: semua logger menulis ke QueueHandler (hanya memasukkan record ke antrean),
+    sedangkan QueueListener di thread terpisah yang memformat dan menulis ke stdout.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if (log_format or config.LOG_FORMAT) == "json" else TextFormatter())
+
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(config.LOG_RATE_LIMIT_INTERVAL_SECONDS, config.LOG_RATE_LIMIT_BURST))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel((level or config.LOG_LEVEL).upper())
+    # Library pihak ketiga cukup di level WARNING agar tidak membanjiri log.
+    for noisy in ("telethon", "urllib3", "pymongo", "websockets", "aiohttp"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Menguras antrean log dan menghentikan thread penulis."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,268 @@
+# Auto Trade Bot/core/metrics.py
+import asyncio
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.serialization import atomic_write_bytes, dumps_json
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.4, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+class MetricsRegistry:
+    """
+    Registry metrik ringan (counter, gauge, histogram) untuk seluruh bot.
+    Pencatatan di jalur panas hanya berupa satu lock singkat + penambahan angka; format Prometheus
+    dan snapshot JSON baru disusun saat diminta.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauge_callbacks: Dict[str, Tuple[Callable[[], Any], str]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}  # [count per bucket..., +Inf, sum]
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        self._help[name] = (metric_type, help_text)
+
+    # --- Pencatatan ---
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def register_gauge(self, name: str, callback: Callable[[], Any], label: str = "name"):
+        """Gauge yang nilainya dibaca dari callback saat di-scrape (misal kedalaman antrean).
+        Callback boleh mengembalikan angka atau dict {nilai label: angka} untuk label `label`."""
+        self._gauge_callbacks[name] = (callback, label)
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0.0] * (len(self.buckets) + 2)
+            values[index] += 1
+            values[-1] += value
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator pencatat durasi untuk fungsi sinkron maupun coroutine."""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(name, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # --- Pembacaan ---
+    def _collect_gauges(self) -> Dict[str, Dict[LabelKey, float]]:
+        with self._lock:
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+        for name, (callback, label) in list(self._gauge_callbacks.items()):
+            try:
+                value = callback()
+            except Exception as e:
+                logger.error("Gagal membaca gauge %s: %s", name, e)
+                continue
+            if isinstance(value, dict):
+                gauges[name] = {((label, str(k)),): float(v) for k, v in value.items()}
+            elif value is not None:
+                gauges[name] = {(): float(value)}
+        return gauges
+
+    def histogram_summary(self, name: str) -> List[Tuple[Dict[str, str], Dict[str, float]]]:
+        """Ringkasan per set label: jumlah, rata-rata, dan batas atas bucket p50/p95/p99 (ms; None = di atas bucket terbesar)."""
+        with self._lock:
+            series = {key: list(values) for key, values in self._histograms.get(name, {}).items()}
+        summaries = []
+        for key, values in series.items():
+            counts, total_sum = values[:-1], values[-1]
+            count = sum(counts)
+            summaries.append((dict(key), {
+                "count": int(count),
+                "mean_ms": round(total_sum / count * 1000, 2) if count else 0.0,
+                "p50_ms": self._quantile_ms(counts, 0.50),
+                "p95_ms": self._quantile_ms(counts, 0.95),
+                "p99_ms": self._quantile_ms(counts, 0.99),
+            }))
+        return summaries
+
+    def _quantile_ms(self, counts: List[float], q: float) -> Optional[float]:
+        """Batas atas bucket kuantil dalam ms, atau None jika jatuh di bucket overflow (+Inf tidak valid di JSON)."""
+        rank, seen = q * sum(counts), 0.0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[i] * 1000 if i < len(self.buckets) else None
+        return None
+
+    def render_prometheus(self) -> str:
+        """Menyusun semua metrik dalam format teks eksposisi Prometheus."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(values) for key, values in series.items()} for name, series in self._histograms.items()}
+        gauges = self._collect_gauges()
+
+        lines: List[str] = []
+        def header(name: str, default_type: str):
+            metric_type, help_text = self._help.get(name, (default_type, name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        for name, series in sorted(counters.items()):
+            header(name, "counter")
+            lines.extend(f"{name}{_format_labels(key)} {value:g}" for key, value in series.items())
+        for name, series in sorted(gauges.items()):
+            header(name, "gauge")
+            lines.extend(f"{name}{_format_labels(key)} {value:g}" for key, value in series.items())
+        for name, series in sorted(histograms.items()):
+            header(name, "histogram")
+            for key, values in series.items():
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, values):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative:g}")
+                cumulative += values[len(self.buckets)]
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {cumulative:g}")
+                lines.append(f"{name}_sum{_format_labels(key)} {values[-1]:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {cumulative:g}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Snapshot JSON: counter & gauge per label, histogram sebagai ringkasan kuantil."""
+        def flatten(series: Dict[LabelKey, float]) -> List[Dict[str, Any]]:
+            return [{"labels": dict(key), "value": value} for key, value in series.items()]
+
+        with self._lock:
+            counters = {name: flatten(series) for name, series in self._counters.items()}
+            histogram_names = list(self._histograms)
+        return {
+            "timestamp": time.time(),
+            "counters": counters,
+            "gauges": {name: flatten(series) for name, series in self._collect_gauges().items()},
+            "histograms": {name: [{"labels": labels, **summary} for labels, summary in self.histogram_summary(name)] for name in histogram_names},
+        }
+
+metrics = MetricsRegistry()
+
+metrics.describe("routine_duration_seconds", "histogram", "Durasi setiap rutinitas pipeline (fetch/decide/execute/manage).")
+metrics.describe("binance_request_duration_seconds", "histogram", "Latensi request Binance per endpoint.")
+metrics.describe("mongo_operation_duration_seconds", "histogram", "Latensi operasi MongoDB per koleksi.")
+metrics.describe("telegram_messages_parsed_total", "counter", "Jumlah pesan Telegram yang di-parse per tipe.")
+metrics.describe("trade_decisions_total", "counter", "Jumlah keputusan trading per hasil (BUY/SKIP/FAIL).")
+metrics.describe("listener_queue_depth", "gauge", "Jumlah pesan yang menunggu di antrean listener.")
+metrics.describe("event_log_backlog", "gauge", "Record log yang belum diproses oleh konsumennya.")
+metrics.describe("binance_used_weight", "gauge", "Bobot request Binance yang terpakai pada menit berjalan.")
+
+# --- Ekspor: endpoint HTTP & snapshot berkala ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = metrics
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = dumps_json(self.registry.snapshot()), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = self.registry.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Jangan membanjiri stdout dengan log akses setiap scrape.
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Menjalankan endpoint /metrics (Prometheus) dan /metrics.json di thread daemon."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.error("Gagal menjalankan server metrik di port %s: %s", port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Endpoint metrik tersedia di http://%s:%s/metrics", host, port)
+    return server
+
+def write_snapshot(file_name: str = "metrics_snapshot.json", directory: str = "data"):
+    """Menulis snapshot metrik ke file JSON secara atomik."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        atomic_write_bytes(os.path.join(directory, file_name), dumps_json(metrics.snapshot()))
+    except OSError as e:
+        logger.error("Gagal menulis snapshot metrik: %s", e)
+
+def start_snapshot_writer(interval_seconds: float) -> threading.Event:
+    """Menulis snapshot metrik setiap `interval_seconds` di thread daemon. Set event yang dikembalikan untuk berhenti."""
+    stop_event = threading.Event()
+
+    def loop():
+        while not stop_event.wait(interval_seconds):
+            write_snapshot()
+        write_snapshot()
+
+    threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+    return stop_event
+
+def start_exporters(port: int, snapshot_interval_seconds: float) -> Callable[[], None]:
+    """Menyalakan endpoint HTTP (jika port > 0) dan snapshot berkala (jika interval > 0). Mengembalikan fungsi stop."""
+    server = start_metrics_server(port) if port > 0 else None
+    snapshot_stop = start_snapshot_writer(snapshot_interval_seconds) if snapshot_interval_seconds > 0 else None
+
+    def stop():
+        if server:
+            server.shutdown()
+            server.server_close()
+        if snapshot_stop:
+            snapshot_stop.set()
+    return stop
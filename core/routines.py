@@ -1,302 +1,630 @@
 # Auto Trade Bot/core/routines.py
-import sys
+import logging
 import time
-import json
-import os
 import asyncio
+import functools
+from dataclasses import asdict
 import config
 from datetime import datetime, timezone
+from typing import Callable, Dict, List, Any, Optional
 
 from telegram.client import TelegramClientWrapper
 from telegram.parser import TelegramMessageParser
-from telegram.utils import JsonWriter
-from binance.client import BinanceClient
+from telegram.utils import JsonWriter, EventLog
+from binance.client import BinanceClient, can_trade, create_client, is_simulated
+from binance.async_client import AsyncBinanceClient, create_async_client
+from binance.market_data import shared_market_stream
+from binance.user_stream import shared_account_state, start_user_data_stream
 from binance.strategy import TradingStrategy
 from binance.account import AccountManager
 from binance.trader import Trader
-from db.mongo_client import MongoManager
+from binance.klines_store import KlineDownloader, shared_kline_store
+from backtest.engine import BacktestEngine, BacktestParams
+from backtest import sweep
+from db.mongo_client import get_shared_mongo_manager
+from core.scheduler import Scheduler
+from core.metrics import metrics, start_exporters
+from core.logging_config import get_logger
+from binance.rate_limiter import shared_rate_limiter
 
-def _load_json_file(file_name: str, directory: str = "data"):
-    file_path = os.path.join(directory, file_name)
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
+logger = logging.getLogger(__name__)
+
+# --- BARU: Log append-only untuk setiap tahap pipeline ---
+# Tahap berikutnya membaca log lewat cursor masing-masing, sehingga setiap record diproses tepat sekali.
+parsed_messages_log = EventLog("parsed_messages")
+new_signals_log = EventLog("new_signals")
+trade_decisions_log = EventLog("trade_decisions")
+trade_log = EventLog("trade_log")
+
+# --- BARU: Instrumentasi pipeline ---
+def _count_parsed_messages(parsed_data: List[Dict[str, Any]]):
+    for message in parsed_data:
+        metrics.inc("telegram_messages_parsed_total", type=message.get("message_type"))
+
+def _count_decisions(decisions: List[Dict[str, Any]]):
+    for decision in decisions:
+        metrics.inc("trade_decisions_total", decision=decision.get("decision"))
 
+def _register_pipeline_gauges(queue: Optional[asyncio.Queue] = None):
+    """Gauge yang dibaca saat scrape: bobot request terpakai, backlog log per konsumen, dan antrean listener."""
+    metrics.register_gauge("binance_used_weight", lambda: shared_rate_limiter.used_weight)
+    metrics.register_gauge("event_log_backlog", lambda: {
+        "new_signals": new_signals_log.backlog("decide"),
+        "trade_decisions": trade_decisions_log.backlog("execute"),
+    }, label="stream")
+    if queue is not None:
+        metrics.register_gauge("listener_queue_depth", queue.qsize)
+
+async def _fetch_missed_messages(client_wrapper: TelegramClientWrapper, last_message_id: int, message_limit: int) -> list:
+    """
+    Mengambil paling banyak `message_limit` pesan terbaru setelah high-water mark (urut dari yang terbaru).
+    Jika celahnya lebih besar, pesan yang lebih lama dilewati agar sinyal basi tidak dieksekusi seolah baru.
+    """
+    messages = await client_wrapper.fetch_messages_since(config.TARGET_CHAT_ID, min_id=last_message_id, max_messages=message_limit + 1)
+    if len(messages) > message_limit:
+        logger.warning("Lebih dari %s pesan baru setelah message_id %s; hanya %s pesan terbaru yang diproses, sisanya dilewati.",
+                       message_limit, last_message_id, message_limit)
+        messages = messages[:message_limit]
+    return messages
+
+@metrics.timed("routine_duration_seconds", routine="fetch")
 async def run_fetch_routine(message_limit: int = 50):
-    print(f"\n--- [1] Memulai Rutinitas Fetch Telegram (Limit: {message_limit} pesan) ---")
+    logger.info("--- [1] Memulai Rutinitas Fetch Telegram (Limit: %s pesan) ---", message_limit)
     client_wrapper = TelegramClientWrapper(config.SESSION_NAME, config.API_ID, config.API_HASH, config.PHONE_NUMBER)
     parser = TelegramMessageParser()
-    mongo_manager = MongoManager(config.MONGO_URI, config.MONGO_DB_NAME)
+    mongo_manager = get_shared_mongo_manager()
     parsed_data = []
 
     try:
         await client_wrapper.connect()
-        messages = await client_wrapper.fetch_historical_messages(config.TARGET_CHAT_ID, limit=message_limit)
+        last_message_id = await asyncio.to_thread(mongo_manager.get_last_message_id, config.TARGET_CHAT_ID)
+        if last_message_id:
+            logger.info("Mengambil pesan setelah message_id %s...", last_message_id)
+            messages = await _fetch_missed_messages(client_wrapper, last_message_id, message_limit)
+        else:
+            messages = await client_wrapper.fetch_historical_messages(config.TARGET_CHAT_ID, limit=message_limit)
         if not messages: 
-            print("Tidak ada pesan baru yang diambil.")
+            logger.info("Tidak ada pesan baru yang diambil.")
             return []
         
         parsed_data = [parser.parse_message(msg).to_dict() for msg in messages]
-        JsonWriter("parsed_messages.json").write(parsed_data)
+        _count_parsed_messages(parsed_data)
+        parsed_messages_log.append(parsed_data)
         
         new_signals = [m for m in parsed_data if m.get("message_type") == "NewSignal"]
-        JsonWriter("new_signals.json").write(new_signals)
+        new_signals_log.append(new_signals)
         
         if new_signals:
-            mongo_manager.save_new_signals(new_signals)
+            await asyncio.to_thread(mongo_manager.save_new_signals, new_signals)
 
-        print("--- Rutinitas Fetch Telegram Selesai ---")
+        await asyncio.to_thread(mongo_manager.update_last_message_id, config.TARGET_CHAT_ID, max(msg.id for msg in messages))
+        logger.info("--- Rutinitas Fetch Telegram Selesai ---")
     finally:
         if client_wrapper.client.is_connected(): await client_wrapper.disconnect()
-        mongo_manager.close_connection()
         
     return parsed_data
 
-def run_decide_routine(parsed_data=None):
-    print("\n--- [2] Memulai Rutinitas Keputusan Trading ---")
-    client = BinanceClient()
+@metrics.timed("routine_duration_seconds", routine="decide")
+def run_decide_routine():
+    logger.info("--- [2] Memulai Rutinitas Keputusan Trading ---")
+    client = create_client()
     strategy = TradingStrategy(client)
-    new_signals = _load_json_file("new_signals.json")
+    new_signals, next_offset = new_signals_log.read_new("decide")
     if not new_signals:
-        print("Tidak ada sinyal baru untuk dievaluasi.")
+        logger.info("Tidak ada sinyal baru untuk dievaluasi.")
         return []
 
-    all_decisions = [strategy.evaluate_new_signal(signal).to_dict() for signal in new_signals]
-    JsonWriter("trade_decisions.json").write(all_decisions)
-    print(f"Berhasil membuat {len(all_decisions)} keputusan trading.")
-    print("--- Rutinitas Keputusan Trading Selesai ---")
+    shared_market_stream.watch("signals", [s.get("coin_pair") for s in new_signals])
+    all_decisions = [decision.to_dict() for decision in strategy.evaluate_signals(new_signals)]
+    _count_decisions(all_decisions)
+    trade_decisions_log.append(all_decisions)
+    new_signals_log.commit_cursor("decide", next_offset)
+    logger.info("Berhasil membuat %s keputusan trading.", len(all_decisions))
+    logger.info("--- Rutinitas Keputusan Trading Selesai ---")
     return all_decisions
 
-def run_execute_routine(decisions_data=None):
-    print("\n--- [3] Memulai Rutinitas Eksekusi Trading ---")
-    if not config.BINANCE_API_KEY or not config.BINANCE_API_SECRET: return
+@metrics.timed("routine_duration_seconds", routine="execute")
+def run_execute_routine():
+    logger.info("--- [3] Memulai Rutinitas Eksekusi Trading ---")
+    if not can_trade(): return
 
-    client = BinanceClient(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
-    manager = AccountManager(client)
-    trader = Trader(client, config.USDT_AMOUNT_PER_TRADE)
+    decisions, next_offset = trade_decisions_log.read_new("execute")
+    if not decisions: return
+
+    client = create_client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+    manager = AccountManager(client, shared_account_state)
+    trader = Trader(client, config.USDT_AMOUNT_PER_TRADE, shared_account_state)
     account_summary = manager.get_account_summary()
     if not account_summary: return
 
-    decisions = _load_json_file("trade_decisions.json")
-    if not decisions: return
-
     buy_decisions = [d for d in decisions if d.get('decision') == 'BUY']
     if not buy_decisions:
-        print("Tidak ditemukan keputusan 'BUY'. Tidak ada yang dieksekusi.")
+        logger.info("Tidak ditemukan keputusan 'BUY'. Tidak ada yang dieksekusi.")
+        trade_decisions_log.commit_cursor("execute", next_offset)
         return
     
-    print(f"Ditemukan {len(buy_decisions)} keputusan 'BUY' untuk dieksekusi.")
-    trade_logs = []
-    for decision in buy_decisions:
-        result = trader.execute_trade(decision, account_summary)
-        trade_logs.append({"decision_details": decision, "execution_result": result})
-        if result.get('status') == 'SUCCESS':
-            time.sleep(1)
-            refreshed_summary = manager.get_account_summary()
-            if refreshed_summary: account_summary = refreshed_summary
-    if trade_logs: JsonWriter("trade_log.json").write(trade_logs)
-    print("--- Rutinitas Eksekusi Trading Selesai ---")
+    logger.info("Ditemukan %d keputusan 'BUY' untuk dieksekusi.", len(buy_decisions))
+    client.warm_up()
+    # Record yang dibaca selalu berurutan sampai next_offset, jadi offset tiap keputusan bisa dihitung mundur.
+    first_offset = next_offset - len(decisions)
+    for offset, decision in enumerate(decisions, start=first_offset):
+        if decision.get('decision') != 'BUY':
+            continue
+        try:
+            result = trader.execute_trade(decision, account_summary)
+            if result.get('status') == 'SUCCESS':
+                # Dengan user data stream aktif, saldo sudah diperbarui oleh event; tidak perlu jeda.
+                if not shared_account_state.is_live:
+                    time.sleep(1)
+                refreshed_summary = manager.get_account_summary()
+                if refreshed_summary: account_summary = refreshed_summary
+        except Exception as e:
+            logger.exception("Error saat mengeksekusi keputusan: %s", e, extra={"symbol": decision.get('coin_pair')})
+            result = {"status": "ERROR", "reason": f"Exception saat eksekusi: {e}"}
+        # Catat & majukan cursor per keputusan, agar BUY yang sudah terisi tidak diulang jika rutinitas terhenti di tengah.
+        trade_log.append([{"decision_details": decision, "execution_result": result}])
+        trade_decisions_log.commit_cursor("execute", offset + 1)
+    trade_decisions_log.commit_cursor("execute", next_offset)
+    logger.info("--- Rutinitas Eksekusi Trading Selesai ---")
 
 def run_status_routine():
-    print("\n--- Memulai Rutinitas Pengecekan Status ---")
-    if not config.BINANCE_API_KEY or not config.BINANCE_API_SECRET: return
+    logger.debug("--- Memulai Rutinitas Pengecekan Status ---")
+    if not can_trade(): return
 
-    client = BinanceClient(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
-    print("\n[1/2] Memeriksa Saldo Aset...")
+    client = create_client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+    logger.debug("[1/2] Memeriksa Saldo Aset...")
     manager = AccountManager(client)
     summary = manager.get_account_summary()
     if summary: 
         JsonWriter("account_status.json").write(summary)
-        print(f"Total Estimasi Nilai Akun: ${summary.get('total_balance_usdt', 0)}")
+        logger.info("Total Estimasi Nilai Akun: $%s", summary.get('total_balance_usdt', 0))
     
-    print("\n[2/2] Memeriksa Transaksi Berjalan (Open Orders)...")
+    logger.debug("[2/2] Memeriksa Transaksi Berjalan (Open Orders)...")
     open_orders = client.get_open_orders()
     if not open_orders:
-        print("Tidak ada transaksi berjalan (order aktif) yang ditemukan.")
+        logger.info("Tidak ada transaksi berjalan (order aktif) yang ditemukan.")
     else:
         processed = [{"symbol": o.get('symbol'), "type": o.get('type'), "side": o.get('side'), "quantity": o.get('origQty'), "price": o.get('price'), "stopPrice": o.get('stopPrice')} for o in open_orders]
         JsonWriter("open_orders_status.json").write(processed)
         for order in processed:
-            if order['type'] == 'LIMIT_MAKER': print(f"  - TAKE PROFIT | {order['symbol']:<12} | Target: {order['price']}")
-            elif order['type'] == 'STOP_LOSS_LIMIT': print(f"  - STOP LOSS   | {order['symbol']:<12} | Pemicu: {order['stopPrice']}")
-    print("\n--- Rutinitas Pengecekan Status Selesai ---")
+            if order['type'] == 'LIMIT_MAKER': logger.info("  - TAKE PROFIT | %-12s | Target: %s", order['symbol'], order['price'], extra={"symbol": order['symbol']})
+            elif order['type'] == 'STOP_LOSS_LIMIT': logger.info("  - STOP LOSS   | %-12s | Pemicu: %s", order['symbol'], order['stopPrice'], extra={"symbol": order['symbol']})
+    latency = client.latency.snapshot()
+    if latency:
+        JsonWriter("binance_latency.json").write(latency)
+    logger.debug("--- Rutinitas Pengecekan Status Selesai ---")
+
+# --- BARU: Backtest strategi terhadap data historis ---
+def _load_backtest_signals(signal_source: str) -> List[Dict[str, Any]]:
+    """
+    'mongo': koleksi new_signals (hanya sinyal terbaru per pair).
+    'log'  : seluruh riwayat sinyal di log new_signals, tanpa duplikat message_id.
+    """
+    if signal_source == "mongo":
+        return get_shared_mongo_manager().get_all_signals()
+    signals: Dict[Any, Dict[str, Any]] = {}
+    offset = 0
+    while True:
+        records, offset = new_signals_log.read_from(offset, limit=10000)
+        if not records:
+            break
+        for record in records:
+            signals[record.get("message_id") or id(record)] = record
+    return list(signals.values())
+
+def run_backtest_routine(signal_source: str = "mongo", offline: bool = False, **overrides) -> Dict[str, Any]:
+    """
+    Memutar ulang sinyal tersimpan terhadap candle historis dan menyimpan hasilnya ke backtest_results.json.
+    Dengan `offline=True`, hanya candle yang sudah ada di store lokal yang dipakai (tanpa request ke Binance).
+    """
+    logger.info("--- Memulai Backtest (sumber sinyal: %s) ---", signal_source)
+    signals = _load_backtest_signals(signal_source)
+    if not signals:
+        logger.info("Tidak ada sinyal untuk di-backtest.")
+        return {}
+
+    params = BacktestParams.from_config(**overrides)
+    # Candle diambil dari store lokal; rentang yang belum ada diunduh sekali lalu dipakai ulang di run berikutnya.
+    downloader = None if offline else KlineDownloader(BinanceClient(), shared_kline_store)
+    engine = BacktestEngine(shared_kline_store.candle_source(params.interval, downloader), params)
+    result = engine.run(signals)
+    summary = result.summary()
+    JsonWriter("backtest_results.json").write({
+        "params": asdict(params),
+        "summary": summary,
+        "trades": [trade.to_dict() for trade in result.trades],
+    })
+    logger.info("Backtest selesai: %d sinyal, %d trade tertutup, win rate %.1f%%, total PnL %.2f USDT.",
+                summary["signals"], summary["closed_trades"], summary["win_rate"] * 100, summary["total_pnl_usdt"])
+    return summary
+
+def run_sweep_routine(signal_source: str = "mongo", search: str = "grid", samples: int = 100, space_file: Optional[str] = None,
+                      rank_by: str = "total_pnl_usdt", workers: Optional[int] = None, offline: bool = False) -> List[Dict[str, Any]]:
+    """Menjalankan backtest untuk banyak kombinasi parameter secara paralel dan menyimpan tabel peringkat ke sweep_results.csv/json."""
+    space = sweep.load_space(space_file) if space_file else sweep.DEFAULT_SPACE
+    candidates = sweep.grid_search(space) if search == "grid" else sweep.random_search(space, samples)
+    logger.info("--- Memulai Parameter Sweep (%s, %d kandidat, sumber sinyal: %s) ---", search, len(candidates), signal_source)
+    signals = _load_backtest_signals(signal_source)
+    if not signals or not candidates:
+        logger.info("Tidak ada sinyal atau kandidat parameter untuk di-sweep.")
+        return []
+
+    if not offline:
+        # Unduh semua candle sekali di proses utama; worker hanya membaca store lokal.
+        params = BacktestParams.from_config()
+        max_hold_hours = max([c.get("max_hold_hours", params.max_hold_hours) for c in candidates])
+        for interval in sorted({c.get("interval", params.interval) for c in candidates}):
+            sweep.prefetch_candles(signals, shared_kline_store, KlineDownloader(BinanceClient(), shared_kline_store), interval, max_hold_hours)
+
+    rows = sweep.run_sweep(signals, candidates, shared_kline_store, rank_by=rank_by, workers=workers)
+    sweep.write_results(rows)
+    for row in rows[:5]:
+        logger.info("#%d %s -> PnL %.2f USDT, win rate %.1f%%, %d trade",
+                    row["rank"], {k: row[k] for k in candidates[0]}, row["total_pnl_usdt"], row["win_rate"] * 100, row["closed_trades"])
+    return rows
 
 # --- BARU: Rutinitas untuk Trailing Stop Loss ---
-async def run_manage_positions_routine():
-    """Memeriksa semua posisi OCO yang terbuka dan menerapkan strategi manajemen."""
-    print("\n--- [4] Memulai Rutinitas Manajemen Posisi ---")
+@metrics.timed("routine_duration_seconds", routine="manage")
+async def run_manage_positions_routine(client: Optional[AsyncBinanceClient] = None,
+                                      signal_lookup: Optional[Callable[[List[str]], Dict[str, Dict[str, Any]]]] = None):
+    """
+    Memeriksa semua posisi OCO yang terbuka dan menerapkan strategi manajemen.
+    `client` adalah klien async berumur panjang milik listen/autoloop (pool keep-alive dipakai ulang setiap tick);
+    tanpa itu, klien sementara dibuat dan ditutup di akhir. `signal_lookup` (daftar simbol -> sinyal per simbol)
+    menggantikan query MongoDB, misalnya untuk uji beban.
+    """
+    logger.debug("--- [4] Memulai Rutinitas Manajemen Posisi ---")
     
-    if not config.BINANCE_API_KEY or not config.BINANCE_API_SECRET:
-        print("API Key/Secret Binance tidak ditemukan.")
+    if not can_trade():
+        logger.info("API Key/Secret Binance tidak ditemukan.")
         return
 
-    client = BinanceClient(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
-    mongo = MongoManager(config.MONGO_URI, config.MONGO_DB_NAME)
-    
-    open_orders = client.get_open_orders()
+    signal_lookup = signal_lookup or get_shared_mongo_manager().get_signals_by_pairs
+    if client is not None:
+        await _manage_open_positions(client, signal_lookup)
+    else:
+        async with _create_manage_client() as client:
+            await _manage_open_positions(client, signal_lookup)
+    logger.debug("--- Rutinitas Manajemen Posisi Selesai ---")
+
+def _create_manage_client() -> AsyncBinanceClient:
+    return create_async_client(
+        config.BINANCE_API_KEY, config.BINANCE_API_SECRET,
+        max_concurrency=config.BINANCE_MAX_CONCURRENT_REQUESTS,
+        timeout_seconds=config.BINANCE_REQUEST_TIMEOUT_SECONDS
+    )
+
+async def _wait_for_oco_cancelled(order_list_id: int):
+    """Menunggu pembatalan OCO terkonfirmasi lewat event listStatus; tanpa stream, jeda tetap 2 detik."""
+    if shared_account_state.is_live:
+        if await asyncio.to_thread(shared_account_state.wait_for_order_list_done, order_list_id, 5.0):
+            return
+    await asyncio.sleep(2)
+
+async def _manage_open_positions(client: AsyncBinanceClient, signal_lookup: Callable[[List[str]], Dict[str, Dict[str, Any]]]):
+    """Memeriksa semua OCO aktif secara paralel (satu task per posisi, dibatasi semaphore)."""
+    if shared_account_state.is_live:
+        open_orders = shared_account_state.get_open_orders()
+    else:
+        open_orders = await client.get_open_orders()
     if not open_orders:
-        print("Tidak ada order terbuka yang ditemukan untuk dikelola.")
+        logger.debug("Tidak ada order terbuka yang ditemukan untuk dikelola.")
         return
 
-    oco_orders = {}
+    # Kelompokkan kaki-kaki OCO berdasarkan orderListId dalam satu kali iterasi.
+    oco_groups: Dict[int, List[Dict[str, Any]]] = {}
     for order in open_orders:
-        if order.get('orderListId', -1) != -1:
-            oco_orders[order['orderListId']] = order
+        order_list_id = order.get('orderListId', -1)
+        if order_list_id != -1:
+            oco_groups.setdefault(order_list_id, []).append(order)
     
-    if not oco_orders:
-        print("Tidak ada order OCO aktif yang ditemukan.")
+    if not oco_groups:
+        logger.debug("Tidak ada order OCO aktif yang ditemukan.")
         return
         
-    print(f"Ditemukan {len(oco_orders)} OCO order aktif. Memeriksa setiap posisi...")
+    logger.info("Ditemukan %d OCO order aktif. Memeriksa setiap posisi...", len(oco_groups))
+    symbols = sorted({orders[0]['symbol'] for orders in oco_groups.values()})
+    shared_market_stream.watch("positions", symbols)
 
-    for order_list_id, order_sample in oco_orders.items():
-        symbol = order_sample['symbol']
-        print(f"\n- Memeriksa {symbol} (OrderListId: {order_list_id})")
+    # Satu query $in untuk semua sinyal dan satu snapshot harga untuk semua simbol.
+    # Query MongoDB bersifat sinkron; jalankan di thread agar event loop (listener & task scheduler lain) tidak terblokir.
+    signals_by_pair = await asyncio.to_thread(signal_lookup, symbols)
+    current_prices = await client.get_price_map(symbols)
 
-        # 1. Ambil data umum
-        signal_data = mongo.get_signal_by_pair(symbol)
-        if not signal_data:
-            print(f"  Peringatan: Tidak ditemukan data sinyal untuk {symbol} di DB. Melewatkan.")
-            continue
-            
-        current_price = client.get_current_price(symbol)
-        if current_price is None:
-            print(f"  Gagal mendapatkan harga terkini untuk {symbol}. Melewatkan.")
-            continue
+    semaphore = asyncio.Semaphore(config.MANAGE_MAX_CONCURRENT_POSITIONS)
 
-        sl_order = next((o for o in open_orders if o['orderListId'] == order_list_id and o['type'] == 'STOP_LOSS_LIMIT'), None)
-        if not sl_order:
-            print(f"  Tidak dapat menemukan order STOP_LOSS_LIMIT untuk {symbol}. Melewatkan.")
-            continue
-        
-        current_sl_price = float(sl_order['stopPrice'])
-        quantity = sl_order['origQty']
-        
-        # --- BARU: Logika untuk Posisi Macet ---
-        if config.STUCK_TRADE_ENABLED:
-            order_time_ms = order_sample.get('time', 0)
-            order_datetime = datetime.fromtimestamp(order_time_ms / 1000, tz=timezone.utc)
-            now_utc = datetime.now(timezone.utc)
-            elapsed_hours = (now_utc - order_datetime).total_seconds() / 3600
-
-            print(f"  Usia order: {elapsed_hours:.2f} jam.")
-
-            # Cek jika trade sudah terlalu lama DAN belum mencapai TP1
-            if elapsed_hours >= config.STUCK_TRADE_DURATION_HOURS:
-                tp1_price = signal_data.get('targets', [{}])[0].get('price')
-                if tp1_price and current_price < tp1_price:
-                    print(f"  >> TINDAKAN: Posisi {symbol} dianggap macet (terbuka > {config.STUCK_TRADE_DURATION_HOURS} jam & di bawah TP1). Menutup posisi...")
-                    
-                    # A. Batalkan OCO
-                    cancel_result = client.cancel_oco_order(symbol, order_list_id)
-                    if not cancel_result:
-                        print(f"  >> KRITIS: Gagal membatalkan OCO untuk posisi macet {symbol}. Intervensi manual diperlukan.")
-                        continue # Lanjut ke order berikutnya
-                    
-                    print("  Sukses membatalkan OCO. Menunggu 2 detik...")
-                    await asyncio.sleep(2)
-                    
-                    # B. Jual di harga pasar
-                    sell_result = client.place_market_sell_order(symbol, float(quantity))
-                    if not sell_result:
-                        print(f"  >> SANGAT KRITIS: Gagal menjual {symbol} setelah OCO dibatalkan. Aset tidak terproteksi!")
-                    else:
-                        print(f"  >> SUKSES: Posisi macet {symbol} berhasil ditutup.")
-                    
-                    continue # Selesai dengan order ini, lanjut ke berikutnya
-                else:
-                    print(f"  Posisi sudah berjalan lama, namun harga saat ini ({current_price}) sudah di atas TP1 ({tp1_price}). Tidak dianggap macet.")
-
-        # --- Logika Trailing Stop Loss (Hanya berjalan jika tidak ditutup sebagai posisi macet) ---
-        if config.TRAILING_ENABLED:
-            print(f"  Memeriksa trailing SL. Harga: ${current_price:.4f}, SL: ${current_sl_price:.4f}")
-            new_sl_price = 0
+    async def _worker(order_list_id: int, orders: List[Dict[str, Any]]):
+        symbol = orders[0]['symbol']
+        async with semaphore:
             try:
-                for target in signal_data.get('targets', []):
-                    if target['level'] < config.MIN_TRAILING_TP_LEVEL:
-                        continue
-                    
-                    tp_price = target['price']
-                    trigger_price = tp_price * (1 + config.TRAILING_TRIGGER_PERCENTAGE)
-                    
-                    if current_price >= trigger_price and tp_price > current_sl_price:
-                        print(f"  Kondisi trailing TERPENUHI pada TP{target['level']} (Harga: ${tp_price:.4f})")
-                        new_sl_price = max(new_sl_price, tp_price)
+                await _manage_single_position(client, order_list_id, orders, signals_by_pair.get(symbol), current_prices.get(symbol))
             except Exception as e:
-                print(f"  Error saat memproses target untuk {symbol}: {e}")
-                continue
+                logger.exception("Error saat mengelola posisi: %s", e, extra={"symbol": symbol, "order_list_id": order_list_id})
+
+    await asyncio.gather(*(_worker(order_list_id, orders) for order_list_id, orders in oco_groups.items()))
+
+async def _manage_single_position(client: AsyncBinanceClient, order_list_id: int, orders: List[Dict[str, Any]],
+                                  signal_data: Optional[Dict[str, Any]], current_price: Optional[float]):
+    """Menutup posisi macet atau menggeser stop loss (trailing) untuk satu OCO."""
+    symbol = orders[0]['symbol']
 
-            if new_sl_price > current_sl_price:
-                print(f"  >> TINDAKAN: Memindahkan SL untuk {symbol} dari ${current_sl_price:.4f} ke ${new_sl_price:.4f}")
-                final_tp_price = signal_data['targets'][-1]['price']
+    log = get_logger(__name__, symbol=symbol, order_list_id=order_list_id)
 
-                cancel_result = client.cancel_oco_order(symbol, order_list_id)
+    log.debug("Memeriksa posisi")
+    if not signal_data:
+        log.warning("Tidak ditemukan data sinyal di DB. Melewatkan.")
+        return
+
+    if current_price is None:
+        log.warning("Gagal mendapatkan harga terkini. Melewatkan.")
+        return
+
+    sl_order = next((o for o in orders if o['type'] == 'STOP_LOSS_LIMIT'), None)
+    if not sl_order:
+        log.warning("Tidak dapat menemukan order STOP_LOSS_LIMIT. Melewatkan.")
+        return
+    
+    current_sl_price = float(sl_order['stopPrice'])
+    quantity = sl_order['origQty']
+    
+    # --- Logika untuk Posisi Macet ---
+    if config.STUCK_TRADE_ENABLED:
+        order_time_ms = orders[0].get('time', 0)
+        order_datetime = datetime.fromtimestamp(order_time_ms / 1000, tz=timezone.utc)
+        now_utc = datetime.now(timezone.utc)
+        elapsed_hours = (now_utc - order_datetime).total_seconds() / 3600
+
+        log.debug("Usia order: %.2f jam.", elapsed_hours)
+
+        # Cek jika trade sudah terlalu lama DAN belum mencapai TP1
+        if elapsed_hours >= config.STUCK_TRADE_DURATION_HOURS:
+            tp1_price = signal_data.get('targets', [{}])[0].get('price')
+            if tp1_price and current_price < tp1_price:
+                log.info("TINDAKAN: Posisi dianggap macet (terbuka > %s jam & di bawah TP1). Menutup posisi...", config.STUCK_TRADE_DURATION_HOURS)
+                
+                # A. Batalkan OCO
+                cancel_result = await client.cancel_oco_order(symbol, order_list_id)
                 if not cancel_result:
-                    print(f"  >> KRITIS: Gagal membatalkan OCO lama untuk {symbol} saat trailing.")
-                    continue
+                    log.critical("Gagal membatalkan OCO untuk posisi macet. Intervensi manual diperlukan.")
+                    return
+                
+                log.info("Sukses membatalkan OCO. Menunggu konfirmasi pembatalan...")
+                await _wait_for_oco_cancelled(order_list_id)
                 
-                print("  Sukses membatalkan OCO lama. Menunggu 2 detik...")
-                await asyncio.sleep(2)
-
-                print(f"  Menempatkan OCO baru: TP=${final_tp_price:.4f}, SL=${new_sl_price:.4f}")
-                new_oco_result = client.place_oco_sell_order(
-                    symbol=symbol,
-                    quantity=quantity,
-                    take_profit_price=final_tp_price,
-                    stop_loss_price=new_sl_price
-                )
-                if not new_oco_result:
-                    print(f"  >> SANGAT KRITIS: Aset {symbol} tidak terproteksi setelah trailing!")
+                # B. Jual di harga pasar
+                sell_result = await client.place_market_sell_order(symbol, float(quantity))
+                if not sell_result:
+                    log.critical("Gagal menjual setelah OCO dibatalkan. Aset tidak terproteksi!")
                 else:
-                    print(f"  >> SUKSES: Trailing SL untuk {symbol} berhasil diterapkan.")
+                    log.info("SUKSES: Posisi macet berhasil ditutup.")
+                return
             else:
-                print("  Tidak ada tindakan trailing yang diperlukan.")
-        
-    mongo.close_connection()
-    print("\n--- Rutinitas Manajemen Posisi Selesai ---")
+                log.debug("Posisi sudah berjalan lama, namun harga saat ini (%s) sudah di atas TP1 (%s). Tidak dianggap macet.", current_price, tp1_price)
 
-async def run_autoloop_routine(duration_minutes: int, message_limit: int, cycle_delay_seconds: int):
-    """Menjalankan siklus fetch-decide-execute-manage secara berulang."""
-    # ... (Isi fungsi ini sama seperti sebelumnya, pastikan memanggil run_manage_positions_routine)
-    end_time = None
-    if duration_minutes > 0:
-        print(f"--- Memulai Mode Autoloop selama {duration_minutes} menit ---")
-        end_time = time.time() + duration_minutes * 60
-    else:
-        print("--- Memulai Mode Autoloop (Berjalan Selamanya, tekan CTRL+C untuk berhenti) ---")
-    
-    print(f"(Setiap siklus akan mengambil {message_limit} pesan, dengan jeda {cycle_delay_seconds} detik)")
+    # --- Logika Trailing Stop Loss (Hanya berjalan jika tidak ditutup sebagai posisi macet) ---
+    if config.TRAILING_ENABLED:
+        log.debug("Memeriksa trailing SL. Harga: $%.4f, SL: $%.4f", current_price, current_sl_price)
+        new_sl_price = 0
+        try:
+            for target in signal_data.get('targets', []):
+                if target['level'] < config.MIN_TRAILING_TP_LEVEL:
+                    continue
+                
+                tp_price = target['price']
+                trigger_price = tp_price * (1 + config.TRAILING_TRIGGER_PERCENTAGE)
+                
+                if current_price >= trigger_price and tp_price > current_sl_price:
+                    log.info("Kondisi trailing TERPENUHI pada TP%s (Harga: $%.4f)", target['level'], tp_price)
+                    new_sl_price = max(new_sl_price, tp_price)
+        except Exception as e:
+            log.error("Error saat memproses target: %s", e)
+            return
 
-    cycle_count = 0
-    while True:
-        if end_time and time.time() >= end_time:
-            break
+        if new_sl_price > current_sl_price:
+            log.info("TINDAKAN: Memindahkan SL dari $%.4f ke $%.4f", current_sl_price, new_sl_price)
+            final_tp_price = signal_data['targets'][-1]['price']
 
-        cycle_count += 1
-        sisa_waktu_str = f"~{int((end_time - time.time()) / 60)} menit" if end_time else "selamanya"
-        print(f"\n{'='*15} Memulai Siklus #{cycle_count} (Sisa waktu: {sisa_waktu_str}) {'='*15}")
-        
-        try:
-            parsed_data = await run_fetch_routine(message_limit=message_limit)
-            decisions = run_decide_routine(parsed_data=parsed_data)
-            run_execute_routine(decisions_data=decisions)
+            cancel_result = await client.cancel_oco_order(symbol, order_list_id)
+            if not cancel_result:
+                log.critical("Gagal membatalkan OCO lama saat trailing.")
+                return
             
-            # Panggil rutinitas manajemen di setiap siklus
-            await run_manage_positions_routine()
+            log.info("Sukses membatalkan OCO lama. Menunggu konfirmasi pembatalan...")
+            await _wait_for_oco_cancelled(order_list_id)
 
-        except Exception as e:
-            print(f"Terjadi error pada siklus ini: {e}. Melanjutkan ke siklus berikutnya.")
-        
-        if end_time and time.time() >= end_time:
-            break
-        
-        print(f"\nSiklus selesai. Menunggu {cycle_delay_seconds} detik sebelum siklus berikutnya...")
+            log.info("Menempatkan OCO baru: TP=$%.4f, SL=$%.4f", final_tp_price, new_sl_price)
+            new_oco_result = await client.place_oco_sell_order(
+                symbol=symbol,
+                quantity=quantity,
+                take_profit_price=final_tp_price,
+                stop_loss_price=new_sl_price
+            )
+            if not new_oco_result:
+                log.critical("Aset tidak terproteksi setelah trailing!")
+            else:
+                log.info("SUKSES: Trailing SL berhasil diterapkan.")
+        else:
+            log.debug("Tidak ada tindakan trailing yang diperlukan.")
+
+# --- BARU: Mode Listener (event-driven) ---
+async def _consume_message_queue(queue: asyncio.Queue):
+    """Mengonsumsi pesan ter-parse dari antrean: simpan sinyal, buat keputusan, lalu eksekusi."""
+    client = create_client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+    strategy = TradingStrategy(client)
+    manager = AccountManager(client, shared_account_state)
+    trader = Trader(client, config.USDT_AMOUNT_PER_TRADE, shared_account_state)
+    mongo = get_shared_mongo_manager()
+    trading_enabled = can_trade()
+    if trading_enabled:
+        # Siapkan koneksi & offset jam sebelum sinyal pertama tiba.
+        await asyncio.to_thread(client.warm_up)
+
+    async def _process(message: Dict[str, Any]) -> bool:
+        """Memproses satu pesan. Mengembalikan True jika pesan selesai ditangani dan boleh dicatat di high-water mark."""
+        if message.get("message_type") != "NewSignal":
+            return True
+
+        logger.info(">> Sinyal baru diterima: %s (message_id: %s)", message.get('coin_pair'), message.get('message_id'), extra={"symbol": message.get('coin_pair')})
+        shared_market_stream.watch("signals", [message.get("coin_pair")])
+        signal_offset = new_signals_log.append([message])
+        await asyncio.to_thread(mongo.save_new_signals, [message])
+
+        # Panggilan Binance bersifat sinkron, jalankan di thread agar listener tetap responsif.
+        decision = (await asyncio.to_thread(strategy.evaluate_new_signal, message)).to_dict()
+        _count_decisions([decision])
+        decision_offset = trade_decisions_log.append([decision])
+        # Sinyal sudah diputuskan di sini. Cursor hanya dimajukan jika tidak ada record lebih lama yang tertunda
+        # (misal hasil `fetch` sebelumnya); jika ada, cursor dibiarkan agar record itu tetap diproses rutinitas
+        # decide/execute. BUY ganda untuk sinyal ini kemudian tertahan oleh pengecekan order aktif di Trader.
+        new_signals_log.advance_cursor("decide", signal_offset, signal_offset + 1)
+        logger.info("   Keputusan: %s - %s", decision['decision'], decision['reason'], extra={"symbol": message.get('coin_pair')})
+
+        if decision['decision'] != 'BUY' or not trading_enabled:
+            trade_decisions_log.advance_cursor("execute", decision_offset, decision_offset + 1)
+            return True
+
+        account_summary = await asyncio.to_thread(manager.get_account_summary)
+        if not account_summary:
+            return False
+        result = await asyncio.to_thread(trader.execute_trade, decision, account_summary)
+        trade_log.append([{"decision_details": decision, "execution_result": result}])
+        trade_decisions_log.advance_cursor("execute", decision_offset, decision_offset + 1)
+        logger.info("   Hasil eksekusi: %s - %s", result.get('status'), result.get('reason'), extra={"symbol": message.get('coin_pair')})
+        return True
+
+    while True:
+        message = await queue.get()
         try:
-            time.sleep(cycle_delay_seconds)
-        except KeyboardInterrupt:
-            print("\nCTRL+C terdeteksi. Menghentikan autoloop...")
-            break
-    
-    print("\n--- Mode Autoloop Dihentikan ---")
\ No newline at end of file
+            # High-water mark baru dimajukan setelah pesan berhasil ditangani, sehingga pesan yang gagal
+            # di tahap decide/execute tidak ditandai selesai.
+            if await _process(message):
+                await asyncio.to_thread(mongo.update_last_message_id, config.TARGET_CHAT_ID, message.get("message_id"))
+        except Exception as e:
+            logger.error("Error saat memproses pesan dari antrean: %s", e)
+        finally:
+            queue.task_done()
+
+def _start_streams():
+    """
+    Memulai stream harga & akun. Dalam mode simulasi tidak ada websocket: harga datang dari bursa simulasi
+    (opsional diputar ulang dari KlineStore) dan event akun langsung diterapkan ke AccountState.
+    """
+    if is_simulated():
+        if config.SIMULATED_REPLAY_START:
+            from binance.simulated import shared_simulated_exchange
+            start_ms = int(datetime.fromisoformat(config.SIMULATED_REPLAY_START).replace(tzinfo=timezone.utc).timestamp() * 1000)
+            shared_simulated_exchange.start_replay(start_ms, config.SIMULATED_REPLAY_STEP_SECONDS)
+    else:
+        shared_market_stream.start_in_thread()
+    return start_user_data_stream()
+
+def _add_position_tasks(scheduler: Scheduler, manage_interval_seconds: float, manage_client: AsyncBinanceClient):
+    """Mendaftarkan manajemen posisi dan pengecekan status ke scheduler dengan interval masing-masing."""
+    scheduler.add(
+        "manage", functools.partial(run_manage_positions_routine, client=manage_client), manage_interval_seconds,
+        jitter_seconds=config.SCHEDULER_JITTER_SECONDS, timeout_seconds=config.SCHEDULER_TASK_TIMEOUT_SECONDS
+    )
+    scheduler.add(
+        "status", run_status_routine, config.SCHEDULER_STATUS_INTERVAL_SECONDS,
+        jitter_seconds=config.SCHEDULER_JITTER_SECONDS, timeout_seconds=config.SCHEDULER_TASK_TIMEOUT_SECONDS
+    )
+
+async def run_listen_routine(message_limit: int = 50, manage_interval_seconds: Optional[float] = None):
+    """
+    Menjaga satu koneksi Telegram tetap terbuka dan memproses setiap pesan baru secara langsung.
+    Pesan di-parse saat tiba lalu dimasukkan ke antrean asyncio yang dikonsumsi tahap decide/execute.
+    Saat mulai, paling banyak `message_limit` pesan terbaru yang terlewat sejak high-water mark disusulkan.
+    Manajemen posisi berjalan setiap SCHEDULER_MANAGE_INTERVAL_SECONDS (sama seperti autoloop) kecuali
+    `manage_interval_seconds` diberikan; nilai <= 0 mematikannya.
+    """
+    logger.info("--- Memulai Mode Listener Telegram (tekan CTRL+C untuk berhenti) ---")
+    client_wrapper = TelegramClientWrapper(config.SESSION_NAME, config.API_ID, config.API_HASH, config.PHONE_NUMBER)
+    parser = TelegramMessageParser()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    queued_ids = set()
+
+    async def on_new_message(message_obj):
+        # Pesan yang sama bisa datang dua kali (susulan saat start dan catch-up Telethon setelah reconnect).
+        if message_obj.id in queued_ids:
+            return
+        queued_ids.add(message_obj.id)
+        message = parser.parse_message(message_obj).to_dict()
+        _count_parsed_messages([message])
+        queue.put_nowait(message)
+
+    background_tasks = [asyncio.create_task(_consume_message_queue(queue))]
+    scheduler = Scheduler()
+    # Satu klien async untuk semua tick manajemen posisi, agar pool koneksi keep-alive tidak dibangun ulang setiap tick.
+    manage_client = _create_manage_client()
+    if manage_interval_seconds is None:
+        manage_interval_seconds = config.SCHEDULER_MANAGE_INTERVAL_SECONDS
+    if manage_interval_seconds > 0:
+        logger.info("(Manajemen posisi dijalankan setiap %s detik)", manage_interval_seconds)
+        _add_position_tasks(scheduler, manage_interval_seconds, manage_client)
+        background_tasks.append(asyncio.create_task(scheduler.run()))
+
+    _register_pipeline_gauges(queue)
+    stop_exporters = start_exporters(config.METRICS_PORT, config.METRICS_SNAPSHOT_INTERVAL_SECONDS)
+    user_stream = _start_streams()
+    try:
+        await client_wrapper.connect()
+        # Susul pesan yang terlewat selama bot mati/terputus sebelum berlangganan pesan baru.
+        last_message_id = await asyncio.to_thread(get_shared_mongo_manager().get_last_message_id, config.TARGET_CHAT_ID)
+        if last_message_id:
+            missed = await _fetch_missed_messages(client_wrapper, last_message_id, message_limit)
+            if missed:
+                logger.info("Menyusul %d pesan setelah message_id %s...", len(missed), last_message_id)
+            for message_obj in reversed(missed):  # Hasil fetch diurutkan dari yang terbaru.
+                await on_new_message(message_obj)
+        await client_wrapper.listen_new_messages(config.TARGET_CHAT_ID, on_new_message)
+        await client_wrapper.run_until_disconnected()
+    finally:
+        scheduler.stop()
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        shared_market_stream.stop()
+        if user_stream: user_stream.stop()
+        if client_wrapper.client.is_connected(): await client_wrapper.disconnect()
+        await manage_client.close()
+        stop_exporters()
+        logger.info("--- Mode Listener Dihentikan ---")
+
+async def run_autoloop_routine(duration_minutes: int, message_limit: int, cycle_delay_seconds: int):
+    """
+    Menjalankan setiap rutinitas sebagai task berkala dengan intervalnya sendiri melalui Scheduler.
+    Fetch berjalan setiap `cycle_delay_seconds` dan langsung membangunkan decide -> execute bila ada data baru,
+    sementara manajemen posisi dan status berjalan lebih sering tanpa menunggu siklus fetch.
+    """
+    if duration_minutes > 0:
+        logger.info("--- Memulai Mode Autoloop selama %s menit ---", duration_minutes)
+    else:
+        logger.info("--- Memulai Mode Autoloop (Berjalan Selamanya, tekan CTRL+C untuk berhenti) ---")
+    logger.info("(Setiap fetch mengambil hingga %s pesan, dengan jeda %s detik)", message_limit, cycle_delay_seconds)
+
+    timeout = config.SCHEDULER_TASK_TIMEOUT_SECONDS
+    jitter = config.SCHEDULER_JITTER_SECONDS
+    scheduler = Scheduler()
+    scheduler.add("fetch", functools.partial(run_fetch_routine, message_limit=message_limit), cycle_delay_seconds,
+                  jitter_seconds=jitter, timeout_seconds=timeout, triggers=["decide"])
+    scheduler.add("decide", run_decide_routine, config.SCHEDULER_DECIDE_INTERVAL_SECONDS,
+                  jitter_seconds=jitter, timeout_seconds=timeout, triggers=["execute"])
+    scheduler.add("execute", run_execute_routine, config.SCHEDULER_EXECUTE_INTERVAL_SECONDS,
+                  jitter_seconds=jitter, timeout_seconds=timeout)
+    manage_client = _create_manage_client()
+    _add_position_tasks(scheduler, config.SCHEDULER_MANAGE_INTERVAL_SECONDS, manage_client)
+
+    _register_pipeline_gauges()
+    stop_exporters = start_exporters(config.METRICS_PORT, config.METRICS_SNAPSHOT_INTERVAL_SECONDS)
+    user_stream = _start_streams()
+    try:
+        await scheduler.run(duration_seconds=duration_minutes * 60 if duration_minutes > 0 else None)
+    except asyncio.CancelledError:
+        logger.info("CTRL+C terdeteksi. Menghentikan autoloop...")
+    finally:
+        shared_market_stream.stop()
+        if user_stream: user_stream.stop()
+        await manage_client.close()
+        stop_exporters()
+        logger.info("--- Mode Autoloop Dihentikan ---")
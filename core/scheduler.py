@@ -0,0 +1,144 @@
+# Auto Trade Bot/core/scheduler.py
+import asyncio
+import inspect
+import logging
+import random
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ScheduledTask:
+    """Satu rutinitas berkala beserta jadwalnya."""
+    name: str
+    func: Callable[[], Any]  # Fungsi tanpa argumen; boleh coroutine function atau fungsi sinkron biasa.
+    interval_seconds: float
+    jitter_seconds: float = 0.0
+    timeout_seconds: Optional[float] = None
+    run_immediately: bool = True
+    triggers: List[str] = field(default_factory=list)  # Task yang dibangunkan bila run ini menghasilkan data.
+    run_count: int = 0
+    skipped_count: int = 0
+    last_duration: Optional[float] = None
+
+class Scheduler:
+    """
+    Menjalankan setiap rutinitas sebagai task asyncio dengan intervalnya sendiri.
+    - Jitter acak ditambahkan ke setiap jeda agar rutinitas tidak selalu bertabrakan.
+    - Satu task tidak pernah berjalan tumpang-tindih dengan dirinya sendiri (run yang masih berjalan membuat tick berikutnya dilewati).
+    - Setiap run dibatasi `timeout_seconds`; fungsi sinkron dijalankan di thread agar event loop tetap responsif.
+    - `stop()` (atau SIGTERM) menghentikan semua task dengan rapi.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, ScheduledTask] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def add(self, name: str, func: Callable[[], Any], interval_seconds: float, jitter_seconds: float = 0.0,
+            timeout_seconds: Optional[float] = None, run_immediately: bool = True, triggers: Optional[List[str]] = None):
+        self._tasks[name] = ScheduledTask(
+            name=name, func=func, interval_seconds=interval_seconds, jitter_seconds=jitter_seconds,
+            timeout_seconds=timeout_seconds, run_immediately=run_immediately, triggers=triggers or []
+        )
+
+    def trigger(self, name: str):
+        """Membangunkan task lebih awal tanpa menunggu intervalnya habis."""
+        if name in self._wakeups:
+            self._wakeups[name].set()
+
+    def stop(self):
+        if self._stop_event:
+            self._stop_event.set()
+
+    async def _run_once(self, task: ScheduledTask) -> Any:
+        inflight = self._inflight.get(task.name)
+        if inflight and not inflight.done():
+            # Run sebelumnya melewati deadline tetapi thread-nya masih bekerja; jangan jalankan paralel.
+            task.skipped_count += 1
+            logger.warning("[Scheduler] '%s' masih berjalan dari run sebelumnya, tick ini dilewati.", task.name)
+            return None
+
+        if inspect.iscoroutinefunction(task.func):
+            future = asyncio.ensure_future(task.func())
+        else:
+            future = asyncio.ensure_future(asyncio.to_thread(task.func))
+        self._inflight[task.name] = future
+
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(task.func):
+                # Coroutine dibatalkan saat melewati deadline.
+                return await asyncio.wait_for(future, task.timeout_seconds)
+            # Thread tidak bisa dibatalkan; shield agar future tetap dipantau untuk proteksi tumpang-tindih.
+            return await asyncio.wait_for(asyncio.shield(future), task.timeout_seconds)
+        finally:
+            task.run_count += 1
+            task.last_duration = time.perf_counter() - started
+
+    def _next_delay(self, task: ScheduledTask, elapsed: float) -> float:
+        return max(0.0, task.interval_seconds - elapsed) + random.uniform(0, task.jitter_seconds)
+
+    async def _sleep_until_next(self, task: ScheduledTask, delay: float):
+        wakeup = self._wakeups[task.name]
+        stop_waiter = asyncio.ensure_future(self._stop_event.wait())
+        wake_waiter = asyncio.ensure_future(wakeup.wait())
+        try:
+            await asyncio.wait({stop_waiter, wake_waiter}, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_waiter.cancel()
+            wake_waiter.cancel()
+        wakeup.clear()
+
+    async def _task_loop(self, task: ScheduledTask):
+        if not task.run_immediately:
+            await self._sleep_until_next(task, self._next_delay(task, 0.0))
+
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                result = await self._run_once(task)
+                if result:
+                    for name in task.triggers:
+                        self.trigger(name)
+            except asyncio.TimeoutError:
+                logger.warning("[Scheduler] '%s' melewati batas waktu %s detik.", task.name, task.timeout_seconds)
+            except Exception as e:
+                logger.exception("[Scheduler] Terjadi error pada '%s': %s. Melanjutkan ke jadwal berikutnya.", task.name, e)
+            await self._sleep_until_next(task, self._next_delay(task, time.monotonic() - started))
+
+    async def run(self, duration_seconds: Optional[float] = None):
+        """Menjalankan semua task sampai `stop()` dipanggil, durasi habis, atau task utama dibatalkan (CTRL+C)."""
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._wakeups = {name: asyncio.Event() for name in self._tasks}
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+        except (NotImplementedError, RuntimeError):
+            pass  # Tidak didukung di Windows atau bukan di main thread.
+
+        for task in self._tasks.values():
+            jitter = f" (+jitter {task.jitter_seconds}s)" if task.jitter_seconds else ""
+            logger.info("[Scheduler] '%s' setiap %s detik%s.", task.name, task.interval_seconds, jitter)
+        loop_tasks = [asyncio.create_task(self._task_loop(task), name=f"scheduler:{task.name}") for task in self._tasks.values()]
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), duration_seconds)
+        except asyncio.TimeoutError:
+            logger.info("[Scheduler] Durasi berjalan telah habis.")
+        finally:
+            self._stop_event.set()
+            for loop_task in loop_tasks:
+                loop_task.cancel()
+            await asyncio.gather(*loop_tasks, return_exceptions=True)
+            for name, future in self._inflight.items():
+                if not future.done():
+                    logger.info("[Scheduler] Menunggu '%s' yang masih berjalan selesai...", name)
+            await asyncio.gather(*(f for f in self._inflight.values() if not f.done()), return_exceptions=True)
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except (NotImplementedError, RuntimeError):
+                pass
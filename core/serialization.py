@@ -0,0 +1,24 @@
+# Auto Trade Bot/core/serialization.py
+import json
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson bersifat opsional; jatuh ke modul json standar.
+    orjson = None
+
+def dumps_json(data: Any) -> bytes:
+    """Meng-encode data ke JSON ringkas (bytes). Memakai orjson jika terpasang karena jauh lebih cepat."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def atomic_write_bytes(file_path: str, payload: bytes):
+    """Menulis file secara atomik: tulis ke file sementara lalu rename, sehingga pembaca tidak pernah melihat file setengah jadi."""
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
@@ -1,10 +1,11 @@
 # Auto Trade Bot/dashboard.py (Versi Perbaikan)
 import streamlit as st
-import json
 import pandas as pd
+import config
 from pathlib import Path
 from datetime import datetime
 from streamlit_autorefresh import st_autorefresh
+from core.dashboard_data import DashboardData
 
 # --- Konfigurasi Halaman Streamlit ---
 st.set_page_config(
@@ -14,41 +15,43 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- Fungsi Helper untuk Memuat Data ---
-def load_json_data(file_path: Path):
-    """Memuat data dari file JSON dengan penanganan error."""
-    if file_path.exists():
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if not content:
-                    return None
-                return json.loads(content)
-        except json.JSONDecodeError:
-            return {"error": f"Gagal mem-parsing JSON dari {file_path.name}."}
-        except Exception as e:
-            return {"error": f"Terjadi kesalahan saat membaca {file_path.name}: {e}"}
-    return {"error": f"File tidak ditemukan: {file_path.name}."}
-
 # --- Path ke File Data (DIperbarui) ---
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"  # Menentukan subfolder 'data'
 
-ACCOUNT_STATUS_FILE = DATA_DIR / "account_status.json"
-TRADE_DECISIONS_FILE = DATA_DIR / "trade_decisions.json"
-NEW_SIGNALS_FILE = DATA_DIR / "new_signals.json"
-SIGNAL_UPDATES_FILE = DATA_DIR / "signal_updates.json"
-MARKET_ALERTS_FILE = DATA_DIR / "market_alerts.json"
-PARSED_MESSAGES_FILE = DATA_DIR / "parsed_messages.json"
-
+# Snapshot ditulis ulang utuh, sedangkan riwayat pipeline disimpan di log append-only (data/<stream>/).
 ALL_JSON_FILES = {
-    "Status Akun": ACCOUNT_STATUS_FILE,
-    "Keputusan Trade": TRADE_DECISIONS_FILE,
-    "Sinyal Baru": NEW_SIGNALS_FILE,
-    "Pembaruan Sinyal": SIGNAL_UPDATES_FILE,
-    "Peringatan Pasar": MARKET_ALERTS_FILE,
-    "Semua Pesan Ter-parse": PARSED_MESSAGES_FILE,
+    "Status Akun": "account_status",
+    "Transaksi Berjalan": "open_orders_status",
 }
+ALL_LOG_STREAMS = {
+    "Keputusan Trade": "trade_decisions",
+    "Sinyal Baru": "new_signals",
+    "Log Eksekusi": "trade_log",
+    "Semua Pesan Ter-parse": "parsed_messages",
+}
+
+# --- BARU: Lapisan Data dengan Cache ---
+@st.cache_resource
+def get_dashboard_data() -> DashboardData:
+    """Satu lapisan data untuk semua sesi; file hanya dibaca ulang saat isinya berubah."""
+    return DashboardData(str(DATA_DIR), config.DASHBOARD_MAX_RECORDS)
+
+def render_paginated_table(stream: str, key: str, group: str = None, columns: list = None):
+    """Menampilkan record log per halaman (terbaru lebih dulu) alih-alih seluruh isi file."""
+    available = data.available(stream, group)
+    if not available:
+        st.info(f"Log {stream} masih kosong.")
+        return
+    page_size = config.DASHBOARD_PAGE_SIZE
+    page_count = (available + page_size - 1) // page_size
+    page = st.number_input(f"Halaman (dari {page_count})", min_value=1, max_value=page_count, value=1, key=key) - 1
+    rows = data.page(stream, page, page_size, group)
+    df = pd.json_normalize(rows)
+    if columns:
+        df = df[[c for c in columns if c in df.columns]]
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.caption(f"Menampilkan {len(rows)} dari {available} record terbaru (total riwayat: {data.total(stream)}).")
 
 # --- Sidebar dan Auto-Refresh ---
 with st.sidebar:
@@ -70,11 +73,12 @@ st.title("🤖 Auto Trade Bot Dashboard")
 st.markdown(f"**Data terakhir diperbarui pada:** `{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}`")
 
 # --- Memuat Semua Data ---
-account_status = load_json_data(ACCOUNT_STATUS_FILE)
-trade_decisions = load_json_data(TRADE_DECISIONS_FILE)
-new_signals = load_json_data(NEW_SIGNALS_FILE)
-signal_updates = load_json_data(SIGNAL_UPDATES_FILE)
-market_alerts = load_json_data(MARKET_ALERTS_FILE)
+# Hanya record baru yang dibaca; agregat diperbarui sekali per perubahan data, bukan per render.
+data = get_dashboard_data()
+data.refresh()
+account_status = data.snapshot("account_status")
+decision_counts = data.counts("trade_decisions")
+message_counts = data.counts("parsed_messages")
 
 # ==============================================================================
 # TAMPILAN UTAMA
@@ -115,45 +119,39 @@ st.markdown("---")
 # --- Analisis Keputusan Trading ---
 st.header("🧠 Analisis & Keputusan Trading")
 
-if trade_decisions and "error" not in trade_decisions and isinstance(trade_decisions, list):
-    buy_count = sum(1 for d in trade_decisions if d.get('decision') == 'BUY')
-    skip_count = sum(1 for d in trade_decisions if d.get('decision') == 'SKIP')
-    fail_count = sum(1 for d in trade_decisions if d.get('decision') == 'FAIL')
-
+if data.total("trade_decisions"):
     col1, col2, col3 = st.columns(3)
-    col1.metric("Keputusan Beli (BUY)", buy_count, "Sinyal akan dieksekusi")
-    col2.metric("Keputusan Lewati (SKIP)", skip_count, "Harga tidak sesuai", delta_color="off")
-    col3.metric("Keputusan Gagal (FAIL)", fail_count, "Error saat evaluasi", delta_color="inverse")
+    col1.metric("Keputusan Beli (BUY)", decision_counts.get('BUY', 0), "Sinyal akan dieksekusi")
+    col2.metric("Keputusan Lewati (SKIP)", decision_counts.get('SKIP', 0), "Harga tidak sesuai", delta_color="off")
+    col3.metric("Keputusan Gagal (FAIL)", decision_counts.get('FAIL', 0), "Error saat evaluasi", delta_color="inverse")
 
     with st.expander("Lihat Detail Setiap Keputusan"):
-        for decision in trade_decisions:
-            emoji = "✅" if decision['decision'] == 'BUY' else ("⏭️" if decision['decision'] == 'SKIP' else "❌")
-            with st.container(border=True):
-                 st.subheader(f"{emoji} {decision['decision']}: {decision['coin_pair']}")
-                 st.markdown(f"> **Alasan:** `{decision['reason']}`")
-                 if decision.get('current_price') is not None:
-                    st.text(f"Harga Saat Ini: {decision['current_price']} | Harga Masuk Sinyal: {decision['entry_price']}")
-                 if decision['decision'] == 'BUY':
-                    st.json(decision)
+        render_paginated_table(
+            "trade_decisions", key="decisions_page",
+            columns=["decision", "coin_pair", "reason", "current_price", "entry_price"]
+        )
 else:
-    error_message = trade_decisions.get("error", "Data keputusan trading tidak tersedia.") if isinstance(trade_decisions, dict) else "Data tidak valid."
-    st.error(f"Gagal memuat keputusan trading: **{error_message}**")
+    st.error("Gagal memuat keputusan trading: **Data keputusan trading tidak tersedia.**")
 
 st.markdown("---")
 
 # --- Sinyal Terbaru dari Telegram ---
 st.header("🔔 Sinyal & Peringatan Terbaru dari Telegram")
 
+new_signal_count = data.total("new_signals")
+signal_update_count = message_counts.get("SignalUpdate", 0)
+market_alert_count = message_counts.get("MarketAlert", 0)
+
 tab1, tab2, tab3 = st.tabs([
-    f"Sinyal Baru ({len(new_signals or []) if isinstance(new_signals, list) else 0})",
-    f"Pembaruan Sinyal ({len(signal_updates or []) if isinstance(signal_updates, list) else 0})",
-    f"Peringatan Pasar ({len(market_alerts or []) if isinstance(market_alerts, list) else 0})"
+    f"Sinyal Baru ({new_signal_count})",
+    f"Pembaruan Sinyal ({signal_update_count})",
+    f"Peringatan Pasar ({market_alert_count})"
 ])
 
 with tab1:
-    if new_signals and "error" not in new_signals and isinstance(new_signals, list):
-        st.subheader(f"Ditemukan {len(new_signals)} sinyal baru.")
-        for signal in new_signals[:5]:
+    if new_signal_count:
+        st.subheader(f"Ditemukan {new_signal_count} sinyal baru.")
+        for signal in data.page("new_signals", 0, 5):
             with st.container(border=True):
                 st.markdown(f"**Pair:** `{signal.get('coin_pair')}` | **Risiko:** `{signal.get('risk_level')}`")
                 st.markdown(f"**Harga Masuk:** `{signal.get('entry_price')}`")
@@ -163,9 +161,9 @@ with tab1:
         st.warning("Tidak ada data sinyal baru atau file tidak dapat dibaca.")
 
 with tab2:
-    if signal_updates and "error" not in signal_updates and isinstance(signal_updates, list):
-        st.subheader(f"Ditemukan {len(signal_updates)} pembaruan sinyal.")
-        for update in signal_updates[:5]:
+    if signal_update_count:
+        st.subheader(f"Ditemukan {signal_update_count} pembaruan sinyal.")
+        for update in data.page("parsed_messages", 0, 5, group="SignalUpdate"):
              with st.container(border=True):
                 color = "green" if update.get('update_type') == 'TARGET_HIT' else "red"
                 st.markdown(f"**Pair:** `{update.get('coin_pair')}` | <span style='color:{color};'>{update.get('update_type')}</span>", unsafe_allow_html=True)
@@ -175,9 +173,9 @@ with tab2:
          st.warning("Tidak ada data pembaruan sinyal atau file tidak dapat dibaca.")
 
 with tab3:
-    if market_alerts and "error" not in market_alerts and isinstance(market_alerts, list):
-        st.subheader(f"Ditemukan {len(market_alerts)} peringatan pasar.")
-        for alert in market_alerts[:5]:
+    if market_alert_count:
+        st.subheader(f"Ditemukan {market_alert_count} peringatan pasar.")
+        for alert in data.page("parsed_messages", 0, 5, group="MarketAlert"):
              with st.container(border=True):
                 st.markdown(f"**Koin:** `{alert.get('coin')}` | **Perubahan:** `{alert.get('price_change_percentage')}%` dalam `{alert.get('timeframe_minutes')}` menit")
                 with st.expander("Lihat data JSON lengkap"):
@@ -189,14 +187,15 @@ st.markdown("---")
 
 # --- Penampil File JSON Mentah ---
 st.header("📄 Penampil File JSON Mentah")
-selected_file_name = st.selectbox("Pilih file JSON untuk ditampilkan:", options=list(ALL_JSON_FILES.keys()))
+selected_file_name = st.selectbox("Pilih file JSON untuk ditampilkan:", options=list(ALL_JSON_FILES.keys()) + list(ALL_LOG_STREAMS.keys()))
 
-if selected_file_name:
-    file_path = ALL_JSON_FILES[selected_file_name]
-    raw_data = load_json_data(file_path)
+if selected_file_name in ALL_LOG_STREAMS:
+    render_paginated_table(ALL_LOG_STREAMS[selected_file_name], key=f"raw_page_{ALL_LOG_STREAMS[selected_file_name]}")
+elif selected_file_name:
+    raw_data = data.snapshot(ALL_JSON_FILES[selected_file_name])
     if raw_data is None:
-        st.info(f"File {file_path.name} kosong.")
-    elif "error" in raw_data:
+        st.info(f"File {ALL_JSON_FILES[selected_file_name]}.json kosong.")
+    elif isinstance(raw_data, dict) and "error" in raw_data:
         st.error(raw_data['error'])
     else:
-        st.json(raw_data)
\ No newline at end of file
+        st.json(raw_data)
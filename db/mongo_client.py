@@ -1,21 +1,54 @@
 # Auto Trade Bot/db/mongo_client.py
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
-from typing import List, Dict, Any, Optional
+import logging
+import time
+from pymongo import MongoClient, ReplaceOne
+from pymongo.errors import ConnectionFailure, BulkWriteError
+from typing import List, Dict, Any, Optional, Tuple
+
+import config
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 class MongoManager:
-    """Mengelola koneksi dan operasi ke database MongoDB."""
+    """
+    Mengelola koneksi dan operasi ke database MongoDB.
+    MongoClient memiliki connection pool sendiri, sehingga satu instance cukup dipakai bersama
+    oleh semua rutinitas; kesehatan koneksi diperiksa secara lazy (ping) dan hasilnya di-cache.
+    """
 
-    def __init__(self, uri: str, db_name: str):
-        try:
-            self.client = MongoClient(uri, serverSelectionTimeoutMS=10000)
-            self.client.admin.command('ping')
-            self.db = self.client[db_name]
-            print("Berhasil terhubung ke MongoDB.")
-        except ConnectionFailure as e:
-            print(f"Gagal terhubung ke MongoDB: {e}")
-            self.client = None
-            self.db = None
+    def __init__(self, uri: str, db_name: str, max_pool_size: int = 20, min_pool_size: int = 1,
+                 max_idle_time_ms: int = 300000, server_selection_timeout_ms: int = 10000,
+                 healthcheck_interval_seconds: float = 30.0):
+        # MongoClient tidak membuka koneksi secara sinkron; handshake terjadi di background oleh pool.
+        self.client = MongoClient(
+            uri,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            maxIdleTimeMS=max_idle_time_ms,
+            serverSelectionTimeoutMS=server_selection_timeout_ms,
+        )
+        self._database = self.client[db_name]
+        self.healthcheck_interval_seconds = healthcheck_interval_seconds
+        self._healthy: Optional[bool] = None
+        self._checked_at = 0.0
+
+    @property
+    def db(self):
+        """Database jika koneksi sehat, atau None. Ping hanya dilakukan sekali per interval health check."""
+        if self.client is None:
+            return None
+        if self._healthy is None or time.monotonic() - self._checked_at > self.healthcheck_interval_seconds:
+            try:
+                self.client.admin.command('ping')
+                if not self._healthy:
+                    logger.info("Berhasil terhubung ke MongoDB.")
+                self._healthy = True
+            except ConnectionFailure as e:
+                logger.error("Gagal terhubung ke MongoDB: %s", e)
+                self._healthy = False
+            self._checked_at = time.monotonic()
+        return self._database if self._healthy else None
     
     # --- BARU: Fungsi untuk mengambil satu sinyal ---
     def get_signal_by_pair(self, coin_pair: str) -> Optional[Dict[str, Any]]:
@@ -23,44 +56,122 @@ class MongoManager:
         if self.db is None:
             return None
         
-        return self.db.new_signals.find_one({'_id': coin_pair})
+        with metrics.timer("mongo_operation_duration_seconds", collection="new_signals", operation="find_one"):
+            return self.db.new_signals.find_one({'_id': coin_pair})
+
+    def get_signals_by_pairs(self, coin_pairs: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Mengambil banyak sinyal sekaligus dengan satu query $in. Mengembalikan dict coin_pair -> sinyal."""
+        if self.db is None or not coin_pairs:
+            return {}
+
+        with metrics.timer("mongo_operation_duration_seconds", collection="new_signals", operation="find"):
+            return {doc['_id']: doc for doc in self.db.new_signals.find({'_id': {'$in': list(coin_pairs)}})}
+
+    def get_all_signals(self) -> List[Dict[str, Any]]:
+        """Mengambil semua sinyal di koleksi 'new_signals' (satu sinyal terbaru per coin_pair), untuk backtest."""
+        if self.db is None:
+            return []
+
+        with metrics.timer("mongo_operation_duration_seconds", collection="new_signals", operation="find"):
+            return list(self.db.new_signals.find({}).sort('timestamp', 1))
+
+    def bulk_upsert(self, collection_name: str, documents: List[Dict[str, Any]], key_field: str) -> Tuple[int, int]:
+        """
+        Upsert banyak dokumen dalam satu bulk_write tanpa urutan (unordered), memakai `key_field` sebagai _id.
+        Mengembalikan (jumlah upserted, jumlah modified) dari hasil bulk.
+        """
+        operations = [ReplaceOne({'_id': doc[key_field]}, {**doc, '_id': doc[key_field]}, upsert=True)
+                      for doc in documents if doc.get(key_field)]
+        if self.db is None or not operations:
+            return 0, 0
+
+        try:
+            with metrics.timer("mongo_operation_duration_seconds", collection=collection_name, operation="bulk_write"):
+                result = self.db[collection_name].bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Dengan ordered=False operasi lain tetap dijalankan; laporkan yang berhasil.
+            details = e.details
+            logger.error("Sebagian operasi bulk ke '%s' gagal: %s error.", collection_name, len(details.get('writeErrors', [])))
+            return details.get('nUpserted', 0), details.get('nModified', 0)
+        return result.upserted_count, result.modified_count
+
+    @staticmethod
+    def _collapse_latest_by_pair(signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Menyisakan satu sinyal terbaru (berdasarkan timestamp lalu message_id) per coin_pair."""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for signal in signals:
+            coin_pair = signal.get("coin_pair")
+            if not coin_pair:
+                continue
+            sort_key = (signal.get("timestamp") or "", signal.get("message_id") or 0)
+            current = latest.get(coin_pair)
+            if current is None or sort_key >= (current.get("timestamp") or "", current.get("message_id") or 0):
+                latest[coin_pair] = signal
+        return list(latest.values())
 
     def save_new_signals(self, signals: List[Dict[str, Any]]):
         """
         Menyimpan atau memperbarui sinyal baru ke koleksi 'new_signals'.
-        Menggunakan 'coin_pair' sebagai _id untuk operasi upsert.
+        Menggunakan 'coin_pair' sebagai _id; hanya sinyal terbaru per pair yang dikirim dalam satu bulk_write.
         """
         if self.db is None or not signals:
             if not signals:
-                print("Tidak ada sinyal baru untuk disimpan ke MongoDB.")
+                logger.info("Tidak ada sinyal baru untuk disimpan ke MongoDB.")
             elif self.db is None:
-                print("Tidak dapat menyimpan sinyal karena koneksi DB tidak ada.")
+                logger.warning("Tidak dapat menyimpan sinyal karena koneksi DB tidak ada.")
             return
 
-        collection = self.db.new_signals
+        latest_signals = self._collapse_latest_by_pair(signals)
+        upserted_count, modified_count = self.bulk_upsert("new_signals", latest_signals, "coin_pair")
         
-        upserted_count = 0
-        modified_count = 0
+        logger.info("Proses penyimpanan MongoDB selesai. Sinyal Baru: %s, Sinyal Diperbarui: %s.", upserted_count, modified_count)
 
-        for signal in signals:
-            coin_pair = signal.get("coin_pair")
-            if not coin_pair:
-                continue
+    # --- BARU: High-water mark untuk fetch inkremental ---
+    def get_last_message_id(self, chat_id: int) -> Optional[int]:
+        """Mengambil message_id terakhir yang sudah diproses untuk chat tertentu."""
+        if self.db is None:
+            return None
 
-            signal['_id'] = coin_pair
-            filter_query = {'_id': coin_pair}
-            result = collection.replace_one(filter_query, signal, upsert=True)
-            
-            if result.upserted_id:
-                upserted_count += 1
-            elif result.modified_count > 0:
-                modified_count += 1
-        
-        print(f"Proses penyimpanan MongoDB selesai. Sinyal Baru: {upserted_count}, Sinyal Diperbarui: {modified_count}.")
+        with metrics.timer("mongo_operation_duration_seconds", collection="fetch_state", operation="find_one"):
+            state = self.db.fetch_state.find_one({'_id': chat_id})
+        return state.get('last_message_id') if state else None
+
+    def update_last_message_id(self, chat_id: int, message_id: int):
+        """Menyimpan message_id terakhir yang diproses. Nilai tidak pernah mundur ($max)."""
+        if self.db is None or message_id is None:
+            return
 
+        with metrics.timer("mongo_operation_duration_seconds", collection="fetch_state", operation="update_one"):
+            self.db.fetch_state.update_one({'_id': chat_id}, {'$max': {'last_message_id': message_id}}, upsert=True)
 
     def close_connection(self):
         """Menutup koneksi ke database."""
         if self.client:
             self.client.close()
-            print("Koneksi MongoDB ditutup.")
\ No newline at end of file
+            self.client = None
+            logger.info("Koneksi MongoDB ditutup.")
+
+
+# --- BARU: Satu handle Mongo untuk seluruh proses ---
+_shared_manager: Optional[MongoManager] = None
+
+def get_shared_mongo_manager() -> MongoManager:
+    """Mengembalikan MongoManager bersama; dibuat sekali saat pertama kali dipakai."""
+    global _shared_manager
+    if _shared_manager is None:
+        _shared_manager = MongoManager(
+            config.MONGO_URI, config.MONGO_DB_NAME,
+            max_pool_size=config.MONGO_MAX_POOL_SIZE,
+            min_pool_size=config.MONGO_MIN_POOL_SIZE,
+            max_idle_time_ms=config.MONGO_MAX_IDLE_TIME_MS,
+            server_selection_timeout_ms=config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            healthcheck_interval_seconds=config.MONGO_HEALTHCHECK_INTERVAL_SECONDS,
+        )
+    return _shared_manager
+
+def close_shared_mongo_manager():
+    """Menutup MongoManager bersama. Dipanggil sekali saat aplikasi berhenti."""
+    global _shared_manager
+    if _shared_manager is not None:
+        _shared_manager.close_connection()
+        _shared_manager = None
\ No newline at end of file
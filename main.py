@@ -1,6 +1,7 @@
 # Auto Trade Bot/main.py
 import argparse
 import asyncio
+import logging
 import os
 from core.routines import (
     run_fetch_routine,
@@ -8,8 +9,16 @@ from core.routines import (
     run_execute_routine,
     run_status_routine,
     run_autoloop_routine,
-    run_manage_positions_routine # --- BARU: import fungsi manage
+    run_manage_positions_routine, # --- BARU: import fungsi manage
+    run_listen_routine,
+    run_backtest_routine,
+    run_sweep_routine
 )
+from db.mongo_client import close_shared_mongo_manager
+from core.metrics import write_snapshot
+from core.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
 
 async def main():
     """Fungsi utama untuk mengontrol alur kerja bot melalui argumen baris perintah."""
@@ -20,7 +29,7 @@ async def main():
 
     parser.add_argument(
         'action',
-        choices=['fetch', 'decide', 'execute', 'status', 'run-all', 'autoloop', 'manage'],
+        choices=['fetch', 'decide', 'execute', 'status', 'run-all', 'autoloop', 'manage', 'listen', 'backtest', 'sweep'],
         help="""Pilih aksi yang ingin dijalankan:
 'fetch'    : Mengambil pesan baru dari Telegram.
 'decide'   : Membuat keputusan trading dari sinyal yang ada.
@@ -28,40 +37,68 @@ async def main():
 'status'   : Memeriksa status akun Binance dan transaksi berjalan.
 'manage'   : Menjalankan rutinitas manajemen posisi (trailing SL) satu kali.
 'run-all'  : Menjalankan 'fetch' > 'decide' > 'execute' satu kali.
-'autoloop' : Menjalankan bot secara otomatis dalam siklus berulang.
+'autoloop' : Menjalankan setiap rutinitas secara otomatis dengan jadwalnya masing-masing.
+'listen'   : Menjaga koneksi Telegram tetap terbuka dan memproses sinyal saat tiba.
+'backtest' : Memutar ulang sinyal tersimpan terhadap candle historis Binance.
+'sweep'    : Mencari parameter trailing/posisi macet terbaik dengan banyak backtest paralel.
 """
     )
     # Argumen Tambahan untuk Kustomisasi
-    parser.add_argument('-l', '--limit', type=int, default=50, help="Jumlah pesan yang di-fetch dari Telegram (default: 50).")
+    parser.add_argument('-l', '--limit', type=int, default=50, help="Jumlah pesan yang di-fetch dari Telegram, juga batas pesan susulan setelah bot mati (default: 50).")
     parser.add_argument('-d', '--duration', type=int, default=0, help="Durasi (menit) untuk mode 'autoloop'. Set 0 atau tidak diset untuk berjalan selamanya (default: selamanya).")
-    parser.add_argument('--delay', type=int, default=300, help="Jeda waktu (detik) antar siklus di mode 'autoloop' (default: 300).")
+    parser.add_argument('--delay', type=int, default=300, help="Interval (detik) fetch Telegram di mode 'autoloop' (default: 300). Interval manajemen posisi diatur lewat SCHEDULER_MANAGE_INTERVAL_SECONDS.")
+    parser.add_argument('--signals', choices=['mongo', 'log'], default='mongo', help="Sumber sinyal untuk 'backtest': koleksi MongoDB (terbaru per pair) atau seluruh riwayat log (default: mongo).")
+    parser.add_argument('--offline', action='store_true', help="Untuk 'backtest': hanya memakai candle yang sudah tersimpan di KLINES_DIRECTORY.")
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid', help="Metode pencarian untuk 'sweep' (default: grid).")
+    parser.add_argument('--samples', type=int, default=100, help="Jumlah kandidat untuk '--search random' (default: 100).")
+    parser.add_argument('--space', default=None, help="File JSON ruang parameter untuk 'sweep' (default: ruang bawaan di backtest/sweep.py).")
+    parser.add_argument('--rank-by', choices=['total_pnl_usdt', 'avg_return_pct', 'win_rate', 'profit_factor'], default='total_pnl_usdt', help="Metrik peringkat untuk 'sweep'.")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses untuk 'sweep' (default: semua core).")
+    parser.add_argument('--log-level', default=None, help="Level log (DEBUG/INFO/WARNING/ERROR). Default dari LOG_LEVEL di .env.")
     
     args = parser.parse_args()
+    setup_logging(level=args.log_level)
     
     os.makedirs("data", exist_ok=True)
 
-    if args.action == 'fetch':
-        await run_fetch_routine(message_limit=args.limit)
-    elif args.action == 'decide':
-        run_decide_routine()
-    elif args.action == 'execute':
-        run_execute_routine()
-    elif args.action == 'status':
-        run_status_routine()
-    elif args.action == 'manage':
-        await run_manage_positions_routine()
-    elif args.action == 'run-all':
-        print("=== Memulai Alur Kerja Lengkap (run-all) ===")
-        parsed_data = await run_fetch_routine(message_limit=args.limit)
-        decisions = run_decide_routine(parsed_data=parsed_data)
-        run_execute_routine(decisions_data=decisions)
-        print("\n=== Alur Kerja Lengkap Selesai ===")
-    elif args.action == 'autoloop':
-        await run_autoloop_routine(
-            duration_minutes=args.duration,
-            message_limit=args.limit,
-            cycle_delay_seconds=args.delay
-        )
+    try:
+        if args.action == 'fetch':
+            await run_fetch_routine(message_limit=args.limit)
+        elif args.action == 'decide':
+            run_decide_routine()
+        elif args.action == 'execute':
+            run_execute_routine()
+        elif args.action == 'status':
+            run_status_routine()
+        elif args.action == 'manage':
+            await run_manage_positions_routine()
+        elif args.action == 'run-all':
+            logger.info("=== Memulai Alur Kerja Lengkap (run-all) ===")
+            # Setiap tahap membaca lanjutan dari log append-only tahap sebelumnya (lewat cursor masing-masing).
+            await run_fetch_routine(message_limit=args.limit)
+            run_decide_routine()
+            run_execute_routine()
+            logger.info("=== Alur Kerja Lengkap Selesai ===")
+        elif args.action == 'autoloop':
+            await run_autoloop_routine(
+                duration_minutes=args.duration,
+                message_limit=args.limit,
+                cycle_delay_seconds=args.delay
+            )
+        elif args.action == 'listen':
+            await run_listen_routine(message_limit=args.limit)
+        elif args.action == 'backtest':
+            run_backtest_routine(signal_source=args.signals, offline=args.offline)
+        elif args.action == 'sweep':
+            run_sweep_routine(
+                signal_source=args.signals, search=args.search, samples=args.samples, space_file=args.space,
+                rank_by=args.rank_by, workers=args.workers, offline=args.offline
+            )
+    finally:
+        # Koneksi Mongo dipakai bersama oleh semua rutinitas dan hanya ditutup saat aplikasi berhenti.
+        close_shared_mongo_manager()
+        # Simpan metrik terakhir agar aksi sekali jalan (fetch/decide/...) juga meninggalkan jejak waktu.
+        write_snapshot()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -2,6 +2,6 @@
 # Auto Trade Bot/run_bot.sh
 set -e
 
-echo "--- Starting Bot Cycle ---"
+echo "--- Starting Bot Listener ---"
 
-python main.py autoloop --duration 0 --delay 600 --limit 20
\ No newline at end of file
+python main.py listen
@@ -1,25 +1,30 @@
 # telegram/client.py
-from telethon import TelegramClient
+import logging
+from typing import Optional
+from telethon import TelegramClient, events
 from telethon.tl.types import PeerChannel
 from telethon.errors import ChatAdminRequiredError, ChannelPrivateError, UserNotParticipantError
 
+logger = logging.getLogger(__name__)
+
 class TelegramClientWrapper:
     """Wrapper untuk klien Telethon untuk menangani koneksi dan pengambilan pesan."""
 
     def __init__(self, session_name: str, api_id: int, api_hash: str, phone_number: str):
-        self.client = TelegramClient(session_name, api_id, api_hash, system_version="4.16.30-vxCUSTOM")
+        # catch_up: setelah koneksi pulih, Telethon mengambil update yang terlewat selama terputus.
+        self.client = TelegramClient(session_name, api_id, api_hash, system_version="4.16.30-vxCUSTOM", catch_up=True)
         self.phone_number = phone_number
 
     async def connect(self):
         """Menghubungkan ke Telegram dan menangani otorisasi."""
         await self.client.connect()
         if not await self.client.is_user_authorized():
-            print("Pengguna belum terotorisasi. Mengirim kode...")
+            logger.info("Pengguna belum terotorisasi. Mengirim kode...")
             await self.client.send_code_request(self.phone_number)
             try:
                 await self.client.sign_in(self.phone_number, input('Masukkan kode OTP: '))
             except Exception as e:
-                print(f"Gagal sign in: {e}")
+                logger.error("Gagal sign in: %s", e)
                 await self.client.disconnect()
                 raise
 
@@ -27,14 +32,52 @@ class TelegramClientWrapper:
         """Memutuskan koneksi klien."""
         await self.client.disconnect()
 
+    async def _resolve_entity(self, chat_id: int):
+        """Mengubah chat_id menjadi entity Telethon (channel memakai ID negatif)."""
+        return await self.client.get_entity(PeerChannel(abs(chat_id))) if chat_id < 0 else await self.client.get_entity(chat_id)
+
     async def fetch_historical_messages(self, chat_id: int, limit: int = 10):
         """Mengambil pesan historis dari chat tertentu."""
         try:
-            entity = await self.client.get_entity(PeerChannel(abs(chat_id))) if chat_id < 0 else await self.client.get_entity(chat_id)
+            entity = await self._resolve_entity(chat_id)
             messages = await self.client.get_messages(entity, limit=limit)
             return messages
         except (ChatAdminRequiredError, ChannelPrivateError, UserNotParticipantError) as e:
-            print(f"Tidak dapat mengakses chat {chat_id}. Masalah izin atau channel pribadi: {e}")
+            logger.warning("Tidak dapat mengakses chat %s. Masalah izin atau channel pribadi: %s", chat_id, e)
+        except Exception as e:
+            logger.error("Error saat mengambil pesan historis dari %s: %s", chat_id, e)
+        return []
+
+    # --- BARU: Fetch inkremental berdasarkan high-water mark ---
+    async def fetch_messages_since(self, chat_id: int, min_id: int, max_messages: Optional[int] = None):
+        """
+        Mengambil pesan yang lebih baru dari `min_id`, paling banyak `max_messages` pesan terbaru
+        (None = semua; Telethon melakukan paging otomatis). Hasil diurutkan dari yang terbaru,
+        sama seperti fetch_historical_messages.
+        """
+        try:
+            entity = await self._resolve_entity(chat_id)
+            return [msg async for msg in self.client.iter_messages(entity, limit=max_messages, min_id=min_id)]
+        except (ChatAdminRequiredError, ChannelPrivateError, UserNotParticipantError) as e:
+            logger.warning("Tidak dapat mengakses chat %s. Masalah izin atau channel pribadi: %s", chat_id, e)
         except Exception as e:
-            print(f"Error saat mengambil pesan historis dari {chat_id}: {e}")
-        return []
\ No newline at end of file
+            logger.error("Error saat mengambil pesan baru dari %s: %s", chat_id, e)
+        return []
+
+    # --- BARU: Mode listener (koneksi persisten) ---
+    async def listen_new_messages(self, chat_id: int, callback):
+        """
+        Mendaftarkan callback async yang dipanggil untuk setiap pesan baru di chat tertentu.
+        Koneksi harus sudah dibuka lewat connect() dan tetap terbuka selama listener berjalan.
+        """
+        entity = await self._resolve_entity(chat_id)
+
+        async def _handler(event):
+            await callback(event.message)
+
+        self.client.add_event_handler(_handler, events.NewMessage(chats=entity))
+        logger.info("Listener aktif untuk chat %s. Menunggu pesan baru...", chat_id)
+
+    async def run_until_disconnected(self):
+        """Menjaga koneksi tetap hidup sampai klien diputus."""
+        await self.client.run_until_disconnected()
@@ -1,9 +1,14 @@
 # telegram/models.py
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import List, Optional, Any, Dict
 from datetime import datetime
 
-@dataclass
+from core.serialization import dumps_json
+
+# Semua model memakai slots=True (tanpa __dict__ per instance) dan serializer manual:
+# to_dict() membangun dict secara langsung tanpa deep copy rekursif seperti dataclasses.asdict.
+
+@dataclass(slots=True)
 class BaseMessage:
     """Kelas dasar untuk semua tipe pesan."""
     raw_text: str
@@ -11,27 +16,43 @@ class BaseMessage:
     sender_id: Optional[int] = None
     message_id: Optional[int] = None
 
-    def to_dict(self):
+    def _base_dict(self) -> Dict[str, Any]:
+        return {
+            "raw_text": self.raw_text,
+            "timestamp": self.timestamp.isoformat(),
+            "sender_id": self.sender_id,
+            "message_id": self.message_id,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
         """Mengonversi dataclass menjadi dictionary."""
-        d = asdict(self)
-        d['timestamp'] = self.timestamp.isoformat()
-        return d
+        return self._base_dict()
+
+    def to_json_bytes(self) -> bytes:
+        """Mengonversi pesan menjadi JSON (bytes) memakai encoder tercepat yang tersedia."""
+        return dumps_json(self.to_dict())
 
-@dataclass
+@dataclass(slots=True)
 class TargetInfo:
     level: int
     price: float
     percentage_change: Optional[float] = None
     status: Optional[str] = None
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {"level": self.level, "price": self.price, "percentage_change": self.percentage_change, "status": self.status}
+
+@dataclass(slots=True)
 class StopLossInfo:
     level: int
     price: float
     percentage_change: Optional[float] = None
     status: Optional[str] = None
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {"level": self.level, "price": self.price, "percentage_change": self.percentage_change, "status": self.status}
+
+@dataclass(slots=True)
 class SignalUpdate(BaseMessage):
     """Mewakili pembaruan pada sinyal yang ada."""
     coin_pair: str = ""
@@ -40,7 +61,16 @@ class SignalUpdate(BaseMessage):
     update_type: str = ""
     message_type: str = "SignalUpdate"
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        d["coin_pair"] = self.coin_pair
+        d["targets_hit"] = [t.to_dict() for t in self.targets_hit]
+        d["stop_losses_triggered"] = [sl.to_dict() for sl in self.stop_losses_triggered]
+        d["update_type"] = self.update_type
+        d["message_type"] = self.message_type
+        return d
+
+@dataclass(slots=True)
 class NewSignal(BaseMessage):
     """Mewakili sinyal trading baru."""
     coin_pair: str = ""
@@ -53,7 +83,20 @@ class NewSignal(BaseMessage):
     data_analysis_link: Optional[str] = None
     message_type: str = "NewSignal"
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        d["coin_pair"] = self.coin_pair
+        d["risk_rank"] = self.risk_rank
+        d["risk_level"] = self.risk_level
+        d["entry_price"] = self.entry_price
+        d["targets"] = [t.to_dict() for t in self.targets]
+        d["stop_losses"] = [sl.to_dict() for sl in self.stop_losses]
+        d["social_media_link"] = self.social_media_link
+        d["data_analysis_link"] = self.data_analysis_link
+        d["message_type"] = self.message_type
+        return d
+
+@dataclass(slots=True)
 class MarketAlert(BaseMessage):
     """Mewakili pesan peringatan pasar."""
     coin: str = ""
@@ -62,7 +105,16 @@ class MarketAlert(BaseMessage):
     alert_message: str = ""
     message_type: str = "MarketAlert"
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        d["coin"] = self.coin
+        d["price_change_percentage"] = self.price_change_percentage
+        d["timeframe_minutes"] = self.timeframe_minutes
+        d["alert_message"] = self.alert_message
+        d["message_type"] = self.message_type
+        return d
+
+@dataclass(slots=True)
 class DailyRecap(BaseMessage):
     """Mewakili rangkuman harian sinyal trading."""
     date_range: Optional[str] = None
@@ -74,7 +126,19 @@ class DailyRecap(BaseMessage):
     total_stop_losses: Optional[int] = None
     message_type: str = "DailyRecap"
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        d["date_range"] = self.date_range
+        d["targets_hit"] = {key: list(coins) for key, coins in self.targets_hit.items()}
+        d["running_signals"] = list(self.running_signals)
+        d["stop_losses_hit"] = list(self.stop_losses_hit)
+        d["total_signals"] = self.total_signals
+        d["total_take_profits"] = self.total_take_profits
+        d["total_stop_losses"] = self.total_stop_losses
+        d["message_type"] = self.message_type
+        return d
+
+@dataclass(slots=True)
 class UnstructuredMessage(BaseMessage):
     """Mewakili pesan yang tidak cocok dengan model lain."""
     content: str = ""
@@ -83,4 +147,11 @@ class UnstructuredMessage(BaseMessage):
 
     def __post_init__(self):
         if not self.content:
-            self.content = self.raw_text
\ No newline at end of file
+            self.content = self.raw_text
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        d["content"] = self.content
+        d["original_sender"] = self.original_sender
+        d["message_type"] = self.message_type
+        return d
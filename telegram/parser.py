@@ -1,16 +1,59 @@
 # telegram/parser.py
 import re
 from datetime import datetime
-from typing import Any, List, Tuple
+from typing import Any, List, Tuple, Callable, Dict, Optional
 
 from .models import (
     SignalUpdate, NewSignal, MarketAlert, UnstructuredMessage,
     TargetInfo, StopLossInfo, BaseMessage, DailyRecap
 )
 
+# --- Pola regex dikompilasi sekali saat modul dimuat ---
+# Karakter pemisah baris yang sama dengan str.splitlines(), agar baris pertama bisa diambil tanpa memecah seluruh teks.
+_LINE_BREAK_RE = re.compile(r"[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+_SOURCE_RE = re.compile(r"Source:\s*(.*)", re.IGNORECASE)
+
+_RECAP_DATE_RANGE_RE = re.compile(r'(\d{2}/\d{2}-\d{2}/\d{2})')
+_RECAP_TARGET_RE = re.compile(r"✅ Hitted target ([1-4]):\s*(.*)")
+_RECAP_RUNNING_RE = re.compile(r"➡️ Running:\s*(.*)")
+_RECAP_STOP_LOSS_RE = re.compile(r"🛑 Hitted stop loss:\s*(.*)")
+_RECAP_LINE_PREFIXES = ("✅", "➡️", "🛑")
+_RECAP_TOTAL_SIGNALS_RE = re.compile(r"Total Signals:\s*(\d+)")
+_RECAP_TOTAL_TP_RE = re.compile(r"Hitted Take-Profits:\s*(\d+)")
+_RECAP_TOTAL_SL_RE = re.compile(r"Hitted Stop-Losses:\s*(\d+)")
+
+_NEW_SIGNAL_ALERT_HEADER = "🆕 NEW SIGNAL 🆕"
+_NEW_SIGNAL_ALERT_RE = re.compile(r"(?:❗❗❗|⚡⚡⚡)\s*([A-Z]+)\s*price\s*(?:amplitude is|decreased)\s*([+-]?[\d.]+)%\s*in the last\s*(\d+)\s*minutes")
+
+_NEW_SIGNAL_HEADER_RE = re.compile(r"🆕\s*NEW SIGNAL:\s*([A-Z0-9]+USDT)\s*🆕")
+_NEW_SIGNAL_RANK_RE = re.compile(r"Volume\(24H\) Ranked:\s*(\S+)")
+_NEW_SIGNAL_RISK_RE = re.compile(r"Risk Level:\s*(?:🟢|⚠️)\s*(\w+)")
+_NEW_SIGNAL_ENTRY_RE = re.compile(r"Entry:\s*([\d.]+)")
+_NEW_SIGNAL_TARGET_RE = re.compile(r"Target\s+(\d+)\s+([\d.]+)\s+([+-]?[\d.]+)%")
+_NEW_SIGNAL_STOP_LOSS_RE = re.compile(r"Stop Loss\s+(\d+)\s+([\d.]+)\s+([+-]?[\d.]+)%")
+
+_UPDATE_HEADER_RE = re.compile(r"^(✅|🔴)\s*SIGNAL UPDATE:\s*([A-Z0-9]+USDT)\s*(✅|🔴)")
+_UPDATE_TARGET_RE = re.compile(r"🎯\s*Target\s*(\d+)\s*\((\d+\.?\d*)\)\s*HIT!")
+_UPDATE_STOP_LOSS_RE = re.compile(r"⚠️\s*Stop Loss\s*(\d+)\s*\((\d+\.?\d*)\)\s*TRIGGERED!")
+
+_MARKET_ALERT_RE = re.compile(r"⚡⚡⚡\s*([A-Z]+)\s*price\s*(?:increased|decreased)\s*([+-]?[\d.]+)%\s*in the last\s*(\d+)\s*minutes")
+
+def _split_coins(value: str) -> List[str]:
+    return [coin.strip() for coin in value.split(',')]
+
 class TelegramMessageParser:
     """Menganalisis objek pesan Telethon dan mengembalikannya sebagai model data terstruktur."""
 
+    def __init__(self):
+        # Tabel dispatch berdasarkan karakter pertama baris pertama: hanya parser yang mungkin cocok yang dicoba.
+        # Pesan DAILY RECAP dicek lebih dulu karena penandanya bisa berada di mana saja pada baris pertama.
+        self._dispatch: Dict[str, Tuple[Callable, ...]] = {
+            "🆕": (self._try_parse_new_signal_alert, self._try_parse_new_signal),
+            "✅": (self._try_parse_signal_update,),
+            "🔴": (self._try_parse_signal_update,),
+            "⚡": (self._try_parse_market_alert,),
+        }
+
     def _extract_common_attributes(self, message_obj: Any) -> dict:
         return {
             "timestamp": getattr(message_obj, 'date', datetime.now()),
@@ -31,101 +74,98 @@ class TelegramMessageParser:
 
         common_attrs = self._extract_common_attributes(message_obj)
         text = common_attrs["raw_text"]
-        lines = text.splitlines()
-        first_line = lines[0].strip() if lines else ""
-
-        parsers = [
-            self._try_parse_daily_recap,
-            self._try_parse_new_signal_alert,
-            self._try_parse_new_signal,
-            self._try_parse_signal_update,
-            self._try_parse_market_alert
-        ]
-        for parser_func in parsers:
-            if parsed_message := parser_func(first_line, text, lines, common_attrs):
+        line_break = _LINE_BREAK_RE.search(text)
+        first_line = (text[:line_break.start()] if line_break else text).strip()
+
+        if "DAILY RECAP" in first_line:
+            return self._parse_daily_recap(first_line, text, common_attrs)
+
+        for parser_func in self._dispatch.get(first_line[:1], ()):
+            if parsed_message := parser_func(first_line, text, common_attrs):
                 return parsed_message
 
-        source_match = re.search(r"Source:\s*(.*)", text, re.IGNORECASE)
+        source_match = _SOURCE_RE.search(text)
         source = source_match.group(1).strip() if source_match else None
         return UnstructuredMessage(**common_attrs, content=text, original_sender=source)
 
-    # --- METODE HELPER YANG HILANG DITAMBAHKAN KEMBALI ---
+    # --- METODE HELPER ---
     def _parse_targets_and_sl_from_update(self, lines: List[str]) -> Tuple[List[TargetInfo], List[StopLossInfo]]:
         """Mem-parsing target dan stop-loss dari pesan pembaruan sinyal."""
         targets, stop_losses = [], []
-        target_pattern = re.compile(r"🎯\s*Target\s*(\d+)\s*\((\d+\.?\d*)\)\s*HIT!")
-        sl_pattern = re.compile(r"⚠️\s*Stop Loss\s*(\d+)\s*\((\d+\.?\d*)\)\s*TRIGGERED!")
         for line in lines:
-            if t_match := target_pattern.search(line):
+            if "HIT!" in line and (t_match := _UPDATE_TARGET_RE.search(line)):
                 targets.append(TargetInfo(level=int(t_match.group(1)), price=float(t_match.group(2)), status="HIT"))
-            if sl_match := sl_pattern.search(line):
+            if "TRIGGERED!" in line and (sl_match := _UPDATE_STOP_LOSS_RE.search(line)):
                 stop_losses.append(StopLossInfo(level=int(sl_match.group(1)), price=float(sl_match.group(2)), status="TRIGGERED"))
         return targets, stop_losses
 
     def _parse_targets_and_sl_from_new_signal(self, lines: List[str]) -> Tuple[List[TargetInfo], List[StopLossInfo]]:
         """Mem-parsing target dan stop-loss dari pesan sinyal baru."""
         targets, stop_losses = [], []
-        target_pattern = re.compile(r"Target\s+(\d+)\s+([\d.]+)\s+([+-]?[\d.]+)%")
-        sl_pattern = re.compile(r"Stop Loss\s+(\d+)\s+([\d.]+)\s+([+-]?[\d.]+)%")
         for line in lines:
-            if t_match := target_pattern.search(line):
+            if "Target" in line and (t_match := _NEW_SIGNAL_TARGET_RE.search(line)):
                 targets.append(TargetInfo(level=int(t_match.group(1)), price=float(t_match.group(2)), percentage_change=float(t_match.group(3))))
-            elif sl_match := sl_pattern.search(line):
+            elif "Stop Loss" in line and (sl_match := _NEW_SIGNAL_STOP_LOSS_RE.search(line)):
                 stop_losses.append(StopLossInfo(level=int(sl_match.group(1)), price=float(sl_match.group(2)), percentage_change=float(sl_match.group(3))))
         return targets, stop_losses
 
-    # --- FUNGSI PARSER UTAMA ---
-    def _try_parse_daily_recap(self, first_line, text, lines, common_attrs):
-        if "DAILY RECAP" in first_line:
-            date_range_match = re.search(r'(\d{2}/\d{2}-\d{2}/\d{2})', first_line)
-            recap = DailyRecap(**common_attrs, date_range=date_range_match.group(1) if date_range_match else None)
-            patterns = {
-                "target_1": r"✅ Hitted target 1:\s*(.*)", "target_2": r"✅ Hitted target 2:\s*(.*)",
-                "target_3": r"✅ Hitted target 3:\s*(.*)", "target_4": r"✅ Hitted target 4:\s*(.*)",
-            }
-            for line in lines:
-                for key, pattern in patterns.items():
-                    if match := re.match(pattern, line.strip()):
-                        recap.targets_hit[key] = [coin.strip() for coin in match.group(1).split(',')]
-                        break
-                if match := re.match(r"➡️ Running:\s*(.*)", line.strip()):
-                    recap.running_signals = [coin.strip() for coin in match.group(1).split(',')]
-                elif match := re.match(r"🛑 Hitted stop loss:\s*(.*)", line.strip()):
-                    recap.stop_losses_hit = [coin.strip() for coin in match.group(1).split(',')]
-            if total_match := re.search(r"Total Signals:\s*(\d+)", text): recap.total_signals = int(total_match.group(1))
-            if tp_match := re.search(r"Hitted Take-Profits:\s*(\d+)", text): recap.total_take_profits = int(tp_match.group(1))
-            if sl_match := re.search(r"Hitted Stop-Losses:\s*(\d+)", text): recap.total_stop_losses = int(sl_match.group(1))
-            return recap
+    @staticmethod
+    def _find_section_bounds(lines: List[str]) -> Optional[Tuple[int, int]]:
+        """Mencari bagian target/SL (antara pemisah '---' kedua dan ketiga); berhenti setelah pemisah ketiga."""
+        indices = []
+        for i, line in enumerate(lines):
+            if "---" in line:
+                indices.append(i)
+                if len(indices) == 3:
+                    return indices[1] + 1, indices[2]
         return None
 
-    def _try_parse_new_signal_alert(self, first_line, text, lines, common_attrs):
-        if first_line == "🆕 NEW SIGNAL 🆕":
-            pattern = re.compile(r"(?:❗❗❗|⚡⚡⚡)\s*([A-Z]+)\s*price\s*(?:amplitude is|decreased)\s*([+-]?[\d.]+)%\s*in the last\s*(\d+)\s*minutes")
-            if match := pattern.search(text):
+    # --- FUNGSI PARSER UTAMA ---
+    def _parse_daily_recap(self, first_line, text, common_attrs):
+        date_range_match = _RECAP_DATE_RANGE_RE.search(first_line)
+        recap = DailyRecap(**common_attrs, date_range=date_range_match.group(1) if date_range_match else None)
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped.startswith(_RECAP_LINE_PREFIXES):
+                continue
+            if match := _RECAP_TARGET_RE.match(stripped):
+                recap.targets_hit[f"target_{match.group(1)}"] = _split_coins(match.group(2))
+            if match := _RECAP_RUNNING_RE.match(stripped):
+                recap.running_signals = _split_coins(match.group(1))
+            elif match := _RECAP_STOP_LOSS_RE.match(stripped):
+                recap.stop_losses_hit = _split_coins(match.group(1))
+        if total_match := _RECAP_TOTAL_SIGNALS_RE.search(text): recap.total_signals = int(total_match.group(1))
+        if tp_match := _RECAP_TOTAL_TP_RE.search(text): recap.total_take_profits = int(tp_match.group(1))
+        if sl_match := _RECAP_TOTAL_SL_RE.search(text): recap.total_stop_losses = int(sl_match.group(1))
+        return recap
+
+    def _try_parse_new_signal_alert(self, first_line, text, common_attrs):
+        if first_line == _NEW_SIGNAL_ALERT_HEADER:
+            if match := _NEW_SIGNAL_ALERT_RE.search(text):
                 return MarketAlert(**common_attrs, coin=match.group(1), price_change_percentage=float(match.group(2)), timeframe_minutes=int(match.group(3)), alert_message=text.strip())
         return None
 
-    def _try_parse_new_signal(self, first_line, text, lines, common_attrs):
-        if match := re.match(r"🆕\s*NEW SIGNAL:\s*([A-Z0-9]+USDT)\s*🆕", first_line):
-            risk_rank = (re.search(r"Volume\(24H\) Ranked:\s*(\S+)", text) or [None, None])[1]
-            risk_level = (re.search(r"Risk Level:\s*(?:🟢|⚠️)\s*(\w+)", text) or [None, None])[1]
-            entry_price = float((re.search(r"Entry:\s*([\d.]+)", text) or [None, 0])[1])
+    def _try_parse_new_signal(self, first_line, text, common_attrs):
+        if match := _NEW_SIGNAL_HEADER_RE.match(first_line):
+            risk_rank = (_NEW_SIGNAL_RANK_RE.search(text) or [None, None])[1]
+            risk_level = (_NEW_SIGNAL_RISK_RE.search(text) or [None, None])[1]
+            entry_price = float((_NEW_SIGNAL_ENTRY_RE.search(text) or [None, 0])[1])
             signal = NewSignal(**common_attrs, coin_pair=match.group(1), risk_rank=risk_rank, risk_level=risk_level, entry_price=entry_price)
+            lines = text.splitlines()
             try:
-                indices = [i for i, line in enumerate(lines) if "---" in line]
-                if len(indices) >= 3:
-                    signal.targets, signal.stop_losses = self._parse_targets_and_sl_from_new_signal(lines[indices[1] + 1:indices[2]])
+                if bounds := self._find_section_bounds(lines):
+                    signal.targets, signal.stop_losses = self._parse_targets_and_sl_from_new_signal(lines[bounds[0]:bounds[1]])
             except (ValueError, IndexError): pass
             return signal
         return None
 
-    def _try_parse_signal_update(self, first_line, text, lines, common_attrs):
-        if match := re.match(r"^(✅|🔴)\s*SIGNAL UPDATE:\s*([A-Z0-9]+USDT)\s*(✅|🔴)", first_line):
-            targets_hit, sl_triggered = self._parse_targets_and_sl_from_update(lines)
+    def _try_parse_signal_update(self, first_line, text, common_attrs):
+        if match := _UPDATE_HEADER_RE.match(first_line):
+            targets_hit, sl_triggered = self._parse_targets_and_sl_from_update(text.splitlines())
             return SignalUpdate(**common_attrs, coin_pair=match.group(2), targets_hit=targets_hit, stop_losses_triggered=sl_triggered, update_type="TARGET_HIT" if targets_hit else "STOP_LOSS_TRIGGERED")
         return None
 
-    def _try_parse_market_alert(self, first_line, text, lines, common_attrs):
-        if match := re.match(r"⚡⚡⚡\s*([A-Z]+)\s*price\s*(?:increased|decreased)\s*([+-]?[\d.]+)%\s*in the last\s*(\d+)\s*minutes", first_line):
-            return MarketAlert(**common_attrs, coin=match.group(1), price_change_percentage=float(match.group(3)), timeframe_minutes=int(match.group(4)), alert_message="\n".join(lines).strip())
-        return None
\ No newline at end of file
+    def _try_parse_market_alert(self, first_line, text, common_attrs):
+        if match := _MARKET_ALERT_RE.match(first_line):
+            return MarketAlert(**common_attrs, coin=match.group(1), price_change_percentage=float(match.group(2)), timeframe_minutes=int(match.group(3)), alert_message="\n".join(text.splitlines()).strip())
+        return None
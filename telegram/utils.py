@@ -1,7 +1,16 @@
 # Auto Trade Bot/telegram/utils.py
+import bisect
 import json
+import logging
 import os
-from typing import List, Dict, Any
+import struct
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from core.serialization import atomic_write_bytes, dumps_json
+
+logger = logging.getLogger(__name__)
 
 class JsonWriter:
     """Menangani penulisan data ke file JSON di dalam direktori tertentu."""
@@ -21,15 +30,178 @@ class JsonWriter:
         try:
             os.makedirs(self.directory, exist_ok=True)
         except OSError as e:
-            print(f"Error saat membuat direktori {self.directory}: {e}")
+            logger.error("Error saat membuat direktori %s: %s", self.directory, e)
 
     def write(self, data: any):
         """Menulis data (list atau dict) ke file JSON."""
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            atomic_write_bytes(self.file_path, dumps_json(data))
             
             item_count = len(data) if isinstance(data, list) else 1
-            print(f"Berhasil menulis {item_count} item ke {self.file_path}")
-        except IOError as e:
-            print(f"Error saat menulis ke file {self.file_path}: {e}")
\ No newline at end of file
+            logger.debug("Berhasil menulis %d item ke %s", item_count, self.file_path)
+        except (OSError, TypeError) as e:
+            # TypeError: data tidak bisa di-serialisasi (misal skalar NumPy dari backtest).
+            logger.error("Error saat menulis ke file %s: %r", self.file_path, e)
+
+
+# --- BARU: Log append-only (JSON Lines) per stream ---
+class EventLog:
+    """
+    Log append-only berformat JSON Lines untuk satu stream (misal 'new_signals').
+
+    Setiap stream disimpan di `data/<stream>/` sebagai segmen `.jsonl` yang dirotasi per hari atau per ukuran.
+    Setiap segmen punya file `.idx` berisi posisi byte tiap record, sehingga pembaca bisa melompat
+    langsung ke offset tertentu tanpa mem-parsing seluruh riwayat. `index.json` (ditulis atomik)
+    mencatat segmen, jumlah record yang sudah di-commit, dan cursor milik setiap konsumen.
+    Pembaca hanya membaca sampai batas yang tercatat di index, jadi record setengah tertulis tidak pernah terlihat.
+    """
+    _POSITION = struct.Struct("<Q")
+    # Satu lock per direktori stream: index.json di-read-modify-write oleh penulis dan konsumen dari thread berbeda.
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, stream: str, directory: str = "data", max_segment_bytes: int = 16 * 1024 * 1024):
+        self.stream = stream
+        self.directory = os.path.join(directory, stream)
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.max_segment_bytes = max_segment_bytes
+        with EventLog._locks_guard:
+            self._lock = EventLog._locks.setdefault(os.path.abspath(self.directory), threading.Lock())
+
+    # --- Index ---
+    def _load_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"segments": [], "next_offset": 0, "cursors": {}}
+
+    def _save_index(self, index: Dict[str, Any]):
+        atomic_write_bytes(self.index_path, json.dumps(index, separators=(',', ':')).encode('utf-8'))
+
+    @property
+    def next_offset(self) -> int:
+        """Offset yang akan dipakai record berikutnya (= jumlah record yang sudah di-commit)."""
+        return self._load_index()["next_offset"]
+
+    def _segment_path(self, segment: Dict[str, Any], suffix: str = ".jsonl") -> str:
+        return os.path.join(self.directory, segment["name"] + suffix)
+
+    def _writable_segment(self, index: Dict[str, Any]) -> Dict[str, Any]:
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        segments = index["segments"]
+        if segments and segments[-1]["day"] == day and segments[-1]["bytes"] < self.max_segment_bytes:
+            return segments[-1]
+        sequence = sum(1 for seg in segments if seg["day"] == day)
+        segment = {"name": f"{day}-{sequence:04d}", "day": day, "first_offset": index["next_offset"], "count": 0, "bytes": 0}
+        segments.append(segment)
+        return segment
+
+    # --- Menulis ---
+    def append(self, records: List[Dict[str, Any]]) -> int:
+        """Menambahkan record ke akhir log. Mengembalikan offset record pertama yang ditulis."""
+        with self._lock:
+            index = self._load_index()
+            first_offset = index["next_offset"]
+            if not records:
+                return first_offset
+            os.makedirs(self.directory, exist_ok=True)
+
+            segment = self._writable_segment(index)
+            lines = [dumps_json(record) + b"\n" for record in records]
+            positions, position = [], segment["bytes"]
+            for line in lines:
+                positions.append(position)
+                position += len(line)
+
+            try:
+                for path, committed_size, payload in (
+                    (self._segment_path(segment), segment["bytes"], b"".join(lines)),
+                    (self._segment_path(segment, ".idx"), segment["count"] * self._POSITION.size, b"".join(self._POSITION.pack(p) for p in positions)),
+                ):
+                    with open(path, 'ab') as f:
+                        # Buang sisa tulisan yang gagal di-commit sebelumnya (misal proses mati di tengah jalan).
+                        f.truncate(committed_size)
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError as e:
+                logger.error("Error saat menulis ke log %s: %s", self.stream, e)
+                return first_offset
+
+            segment["count"] += len(records)
+            segment["bytes"] = position
+            index["next_offset"] = first_offset + len(records)
+            self._save_index(index)
+            logger.debug("Berhasil menambahkan %d record ke log %s.", len(records), self.stream)
+            return first_offset
+
+    # --- Membaca ---
+    def read_from(self, offset: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Membaca record mulai dari `offset`. Mengembalikan (records, offset berikutnya)."""
+        index = self._load_index()
+        segments = index["segments"]
+        end_offset = index["next_offset"] if limit is None else min(index["next_offset"], offset + limit)
+        records: List[Dict[str, Any]] = []
+        offset = max(offset, segments[0]["first_offset"] if segments else 0)
+
+        position = bisect.bisect_right([seg["first_offset"] for seg in segments], offset) - 1
+        while offset < end_offset and 0 <= position < len(segments):
+            segment = segments[position]
+            local_start = offset - segment["first_offset"]
+            local_end = min(segment["count"], end_offset - segment["first_offset"])
+            if local_start < local_end:
+                with open(self._segment_path(segment, ".idx"), 'rb') as idx_file:
+                    idx_file.seek(local_start * self._POSITION.size)
+                    start_byte = self._POSITION.unpack(idx_file.read(self._POSITION.size))[0]
+                end_byte = segment["bytes"]
+                if local_end < segment["count"]:
+                    with open(self._segment_path(segment, ".idx"), 'rb') as idx_file:
+                        idx_file.seek(local_end * self._POSITION.size)
+                        end_byte = self._POSITION.unpack(idx_file.read(self._POSITION.size))[0]
+                with open(self._segment_path(segment), 'rb') as f:
+                    f.seek(start_byte)
+                    chunk = f.read(end_byte - start_byte)
+                records.extend(json.loads(line) for line in chunk.splitlines() if line)
+                offset = segment["first_offset"] + local_end
+            position += 1
+        return records, offset
+
+    def read_last(self, count: int) -> List[Dict[str, Any]]:
+        """Membaca `count` record terakhir."""
+        next_offset = self.next_offset
+        records, _ = self.read_from(max(0, next_offset - count))
+        return records
+
+    # --- Cursor konsumen ---
+    def get_cursor(self, consumer: str) -> int:
+        return self._load_index()["cursors"].get(consumer, 0)
+
+    def commit_cursor(self, consumer: str, offset: int):
+        """Menyimpan posisi baca konsumen setelah record selesai diproses."""
+        with self._lock:
+            index = self._load_index()
+            index["cursors"][consumer] = offset
+            self._save_index(index)
+
+    def advance_cursor(self, consumer: str, expected: int, offset: int) -> bool:
+        """
+        Memajukan cursor ke `offset` hanya jika posisinya saat ini tepat `expected` (tidak ada record tertunda
+        sebelumnya). Mengembalikan False jika cursor tidak diubah, sehingga record itu tetap milik pembaca cursor.
+        """
+        with self._lock:
+            index = self._load_index()
+            if index["cursors"].get(consumer, 0) != expected:
+                return False
+            index["cursors"][consumer] = offset
+            self._save_index(index)
+            return True
+
+    def backlog(self, consumer: str) -> int:
+        """Jumlah record yang belum diproses oleh `consumer`."""
+        index = self._load_index()
+        return index["next_offset"] - index["cursors"].get(consumer, 0)
+
+    def read_new(self, consumer: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Membaca record yang belum diproses oleh `consumer`. Panggil commit_cursor setelah selesai."""
+        return self.read_from(self.get_cursor(consumer))